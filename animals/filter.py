@@ -6,6 +6,24 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from inference.kimi import chat_with_kimi
+from pipeline.classify import DEFAULT_BATCH_SIZE
+from pipeline.filtering import run_filter, journal_path, finish_filter, DEFAULT_WORKERS
+
+
+# Shared by the single-name and batched checks
+FILTER_QUESTION = "the name of an actual living animal species"
+
+FILTER_CRITERIA = """Do NOT count:
+- Dinosaurs or extinct species
+- Dog breeds (like "Beagle", "Poodle")
+- Cat breeds (like "Persian", "Siamese")
+- Horse breeds (like "Arabian Horse", "Mustang")
+- Bird breeds
+- Specific domesticated animal breeds
+
+DO count:
+- Wild animal species (like "tiger", "elephant", "eagle")
+- General animal categories (like "cat", "dog", "horse" without breed specification)"""
 
 
 def is_actual_animal(name):
@@ -17,21 +35,12 @@ def is_actual_animal(name):
         name (str): The name to check
 
     Returns:
-        bool: True if it's an actual animal, False otherwise
+        bool: True if it's an actual animal, False otherwise, None if
+        the check failed (it is retried on the next run)
     """
-    prompt = f"""Is "{name}" the name of an actual living animal species?
+    prompt = f"""Is "{name}" {FILTER_QUESTION}?
 Answer with just "yes" or "no".
-Do NOT count:
-- Dinosaurs or extinct species
-- Dog breeds (like "Beagle", "Poodle")
-- Cat breeds (like "Persian", "Siamese")
-- Horse breeds (like "Arabian Horse", "Mustang")
-- Bird breeds
-- Specific domesticated animal breeds
-
-DO count:
-- Wild animal species (like "tiger", "elephant", "eagle")
-- General animal categories (like "cat", "dog", "horse" without breed specification)
+{FILTER_CRITERIA}
 
 Answer:"""
 
@@ -41,16 +50,18 @@ Answer:"""
         return "yes" in answer
     except Exception as e:
         print(f"Error checking '{name}': {e}")
-        return False
+        return None
 
 
-def filter_animals_list(input_file, output_file=None):
+def filter_animals_list(input_file, output_file=None, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS):
     """
     Filter the animals list to only include actual animals.
 
     Args:
         input_file (str): Path to the input JSON file
         output_file (str): Path to save filtered results (optional)
+        batch_size (int): Names per classification request (1 to check names one at a time)
+        workers (int): Number of classification requests in flight at once
 
     Returns:
         list: List of actual animals
@@ -63,10 +74,17 @@ def filter_animals_list(input_file, output_file=None):
 
     print(f"Filtering {len(animal_names)} entries...")
 
+    # Verdicts are journaled as they arrive so an interrupted run can resume
+    journal_file = journal_path(input_file, output_file)
+    verdicts = dict(run_filter(animal_names, FILTER_QUESTION, FILTER_CRITERIA, is_actual_animal, journal_file,
+                               batch_size=batch_size, workers=workers))
+
     for i, name in enumerate(animal_names):
         print(f"Checking [{i+1}/{len(animal_names)}]: {name}...", end=" ")
 
-        if is_actual_animal(name):
+        if verdicts[name] is None:
+            print(" Not checked (retried on the next run)")
+        elif verdicts[name]:
             actual_animals.append(name)
             print(" Animal")
         else:
@@ -80,6 +98,8 @@ def filter_animals_list(input_file, output_file=None):
             json.dump(actual_animals, f, indent=4, ensure_ascii=False)
         print(f"Saved to {output_file}")
 
+    finish_filter(journal_file, verdicts)
+
     return actual_animals
 
 
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory and time of json.load vs. the streaming dataset reader.
+
+Builds a large dataset by repeating a real one (--scale times) in a temp
+directory, then reads every entry in a fresh subprocess per method so
+each peak RSS is measured in isolation:
+- json.load        (total/combine.py load_dataset before the streaming reader)
+- iter_dataset     (pipeline.dataset_reader, list layout)
+- iter_dataset     on the same data in the legacy {"<key>": [...]} layout
+
+Peak RSS is reported above the interpreter's own baseline.
+
+Usage:
+    python benchmarks/bench_dataset_reader.py [--dataset FILE] [--scale 10]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import resource
+import tempfile
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path to import from pipeline
+sys.path.append(REPO_ROOT)
+
+from pipeline.dataset_reader import iter_dataset
+
+LEGACY_KEY = "items"
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(method, path):
+    """Read every entry of `path` with `method` and print the measurements as JSON."""
+    start = time.perf_counter()
+    count = 0
+    code_chars = 0
+    if method == "json.load":
+        with open(path, 'r') as f:
+            for entry in json.load(f):
+                count += 1
+                code_chars += len(entry.get("openscad_code", ""))
+    elif method == "iter_dataset":
+        for entry in iter_dataset(path):
+            count += 1
+            code_chars += len(entry.get("openscad_code", ""))
+    elif method == "iter_dataset-legacy":
+        for entry in iter_dataset(path, legacy_key=LEGACY_KEY):
+            count += 1
+            code_chars += len(entry.get("openscad_code", ""))
+    print(json.dumps({"seconds": time.perf_counter() - start, "entries": count,
+                      "code_chars": code_chars, "peak_rss_mb": peak_rss_mb()}))
+
+
+def measure(method, path):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", method, path],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark json.load vs. the streaming dataset reader")
+    parser.add_argument("--dataset", default=os.path.join(REPO_ROOT, "mythical_creature_openscad_dataset.json"),
+                        help="Dataset to repeat")
+    parser.add_argument("--scale", type=int, default=10, help="Times to repeat the dataset")
+    parser.add_argument("--child", nargs=2, metavar=("METHOD", "FILE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return 0
+
+    with open(args.dataset, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    if isinstance(entries, dict):
+        entries = next(value for value in entries.values() if isinstance(value, list))
+
+    workdir = tempfile.mkdtemp(prefix="bench_reader_")
+    try:
+        list_file = os.path.join(workdir, "list.json")
+        legacy_file = os.path.join(workdir, "legacy.json")
+        with open(list_file, 'w', encoding='utf-8') as f:
+            json.dump(entries * args.scale, f, indent=2)
+        with open(legacy_file, 'w', encoding='utf-8') as f:
+            json.dump({LEGACY_KEY: entries * args.scale}, f, indent=2)
+        del entries
+
+        size_mb = os.path.getsize(list_file) / 1e6
+        baseline = measure("none", list_file)["peak_rss_mb"]
+        print(f"Dataset: {os.path.basename(args.dataset)} x{args.scale} = {size_mb:.1f} MB")
+        print(f"Interpreter baseline RSS: {baseline:.1f} MB\n")
+        print(f"{'method':<22}{'entries':>9}{'seconds':>10}{'peak RSS (MB)':>16}")
+
+        expected = None
+        for method, path in (("json.load", list_file), ("iter_dataset", list_file),
+                             ("iter_dataset-legacy", legacy_file)):
+            result = measure(method, path)
+            summary = (result["entries"], result["code_chars"])
+            if expected is None:
+                expected = summary
+            elif summary != expected:
+                print(f"  {method} read different data: {summary} != {expected}")
+            print(f"{method:<22}{result['entries']:>9}{result['seconds']:>10.2f}"
+                  f"{result['peak_rss_mb'] - baseline:>16.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
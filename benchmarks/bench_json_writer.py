@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark Synthetic-Objects.json serialization throughput.
+
+Loads every item of every category dataset (as combine.py does with
+--no-validate) and writes them to a temp file with:
+- the old per-item json.dumps(indent=2) + split/re-indent loop
+- pipeline.json_writer.JsonArrayWriter with each available codec,
+  in the indented and the compact layout
+
+The indented json-codec output is checked to be byte-identical to the old
+loop, and every output is checked to parse back to the same items.
+
+Usage:
+    python benchmarks/bench_json_writer.py [--runs 3]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path to import from pipeline
+sys.path.append(REPO_ROOT)
+
+from pipeline.categories import CATEGORIES
+from pipeline.dataset_reader import iter_dataset
+from pipeline.json_writer import JsonArrayWriter, orjson
+
+
+def load_items():
+    """Collect {"name", "category", "code"} for every dataset entry."""
+    items = []
+    for name, category in CATEGORIES.items():
+        path = os.path.join(REPO_ROOT, category.dataset_file)
+        if not os.path.exists(path):
+            continue
+        for entry in iter_dataset(path, legacy_key=category.legacy_key):
+            if category.name_key in entry and "openscad_code" in entry:
+                items.append({"name": entry[category.name_key], "category": name,
+                              "code": entry["openscad_code"]})
+    return items
+
+
+def write_old(items, path):
+    """The loop combine.py used before JsonArrayWriter."""
+    with open(path, 'w') as output_file:
+        output_file.write('[\n')
+        first_item = True
+        for item_data in items:
+            if not first_item:
+                output_file.write(',\n')
+            first_item = False
+            json_str = json.dumps(item_data, indent=2)
+            indented_json = '\n'.join('  ' + line for line in json_str.split('\n'))
+            output_file.write(indented_json)
+        output_file.write('\n]\n')
+
+
+def write_new(items, path, codec, compact):
+    with JsonArrayWriter(path, compact=compact, codec=codec) as writer:
+        for item in items:
+            writer.write(item)
+
+
+def best_of(fn, runs):
+    """Return the fastest of `runs` timings of fn() in seconds."""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Synthetic-Objects.json serialization")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per method (best is reported)")
+    args = parser.parse_args()
+
+    items = load_items()
+    code_mb = sum(len(item["code"]) for item in items) / 1e6
+    print(f"Items: {len(items)} ({code_mb:.1f} MB of code)\n")
+
+    workdir = tempfile.mkdtemp(prefix="bench_writer_")
+    try:
+        old_path = os.path.join(workdir, "old.json")
+        methods = [("old json.dumps + re-indent", lambda path: write_old(items, path))]
+        codecs = ["json"] + (["orjson"] if orjson is not None else [])
+        for codec in codecs:
+            for compact in (False, True):
+                label = f"JsonArrayWriter {codec}{' compact' if compact else ''}"
+                methods.append((label, lambda path, c=codec, k=compact: write_new(items, path, c, k)))
+
+        print(f"{'method':<34}{'seconds':>9}{'MB/s':>9}{'items/s':>10}  output")
+        baseline = None
+        for i, (label, write) in enumerate(methods):
+            path = old_path if i == 0 else os.path.join(workdir, f"out{i}.json")
+            seconds = best_of(lambda: write(path), args.runs)
+            size_mb = os.path.getsize(path) / 1e6
+            baseline = baseline or seconds
+
+            with open(path, 'rb') as f:
+                data = f.read()
+            checks = []
+            if json.loads(data) != items:
+                checks.append("DATA MISMATCH")
+            if i > 0 and label == "JsonArrayWriter json":
+                with open(old_path, 'rb') as f:
+                    checks.append("byte-identical" if f.read() == data else "bytes differ")
+            print(f"{label:<34}{seconds:>9.3f}{size_mb / seconds:>9.1f}{len(items) / seconds:>10.0f}"
+                  f"  {size_mb:.1f} MB, {baseline / seconds:.1f}x {' '.join(checks)}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-call overhead of inference.kimi against a local mock endpoint.
+
+Compares the old behavior (a new openai.OpenAI client for every prompt)
+with the shared, pooled client returned by inference.kimi.get_client(),
+and with a response-cache hit.
+
+Usage:
+    python benchmarks/bench_kimi_client.py [--calls 200]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path to import from inference
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MOCK_RESPONSE = {
+    "id": "chatcmpl-mock",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "moonshotai/Kimi-K2-Instruct",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "cube([10, 10, 10]);"},
+            "finish_reason": "stop"
+        }
+    ],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+}
+
+
+class MockChatHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible /chat/completions handler with keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        body = json.dumps(MOCK_RESPONSE).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server():
+    """
+    Start the mock endpoint on a free local port.
+
+    Returns:
+        tuple: (server, base_url)
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockChatHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def time_calls(fn, calls):
+    """
+    Time `calls` sequential invocations of fn.
+
+    Returns:
+        float: Mean seconds per call
+    """
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Kimi client per-call overhead")
+    parser.add_argument("--calls", type=int, default=200, help="Number of calls per mode")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server()
+    os.environ["KIMI_BASE_URL"] = base_url
+    os.environ.setdefault("RIFT_API_KEY", "mock-key")
+
+    import openai
+    from inference import kimi
+
+    def old_per_call_client():
+        client = openai.OpenAI(api_key="mock-key", base_url=base_url)
+        client.chat.completions.create(
+            model=kimi.KIMI_MODEL,
+            messages=[{"role": "user", "content": "cube"}],
+            stream=False
+        )
+
+    def shared_client():
+        kimi.chat_with_kimi("cube", stream=False, use_cache=False)
+
+    def cache_hit():
+        kimi.chat_with_kimi("cube", stream=False)
+
+    cache_dir = tempfile.mkdtemp(prefix="kimi_cache_bench_")
+    kimi.configure_cache(path=cache_dir)
+
+    print(f"Mock endpoint: {base_url}")
+    print(f"Calls per mode: {args.calls}")
+    print("-" * 60)
+
+    old_mean = time_calls(old_per_call_client, args.calls)
+    print(f"Per-call client (baseline): {old_mean * 1000:.2f} ms/call")
+
+    new_mean = time_calls(shared_client, args.calls)
+    print(f"Shared pooled client:       {new_mean * 1000:.2f} ms/call")
+
+    hit_mean = time_calls(cache_hit, args.calls)
+    print(f"Response cache hit:         {hit_mean * 1e6:.1f} us/call")
+
+    print("-" * 60)
+    print(f"Overhead saved: {(old_mean - new_mean) * 1000:.2f} ms/call ({old_mean / new_mean:.1f}x)")
+    print(f"Cache stats: {kimi.cache_stats()}")
+
+    kimi.close_client()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
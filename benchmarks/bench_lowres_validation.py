@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark mesh validation per category with and without the low-res override.
+
+Takes the first N items with code from every category dataset and runs
+the stl (or png) validation tier on each, once at full resolution and
+once with lowres=True ($fn/$fa/$fs overridden and clamped). Reports
+items/s per category, the speedup, and how often the two modes disagree
+on whether an item is valid.
+
+The render cache is bypassed so every item is really evaluated.
+Requires openscad on PATH (and Xvfb for --tier png).
+
+Usage:
+    python benchmarks/bench_lowres_validation.py [--per-category 20] [--tier stl] [--timeout 60]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+
+# Bypass the render cache before it is configured
+os.environ["RENDER_CACHE_MODE"] = "bypass"
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path to import from pipeline
+sys.path.append(REPO_ROOT)
+
+from pipeline.categories import CATEGORIES
+from pipeline.dataset_reader import iter_dataset
+from pipeline import validation
+
+
+def sample_codes(category, count):
+    """First `count` non-empty code strings of a category's dataset."""
+    path = os.path.join(REPO_ROOT, category.dataset_file)
+    codes = []
+    if not os.path.exists(path):
+        return codes
+    for entry in iter_dataset(path, legacy_key=category.legacy_key):
+        code = entry.get("openscad_code")
+        if code:
+            codes.append(code)
+            if len(codes) >= count:
+                break
+    return codes
+
+
+def time_validation(codes, tier, timeout, lowres):
+    """
+    Validate every code string.
+
+    Returns:
+        tuple: (seconds, list of ok flags)
+    """
+    start = time.perf_counter()
+    results = [validation.validate(code, tier, escalate=False, timeout=timeout, lowres=lowres)["ok"]
+               for code in codes]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark low-res validation per category")
+    parser.add_argument("--per-category", type=int, default=20, help="Items sampled per category")
+    parser.add_argument("--tier", choices=(validation.MESH, validation.PNG), default=validation.MESH,
+                        help="Tier to benchmark")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds per item")
+    parser.add_argument("categories", nargs="*", help="Categories to benchmark (default: all)")
+    args = parser.parse_args()
+
+    if not shutil.which("openscad"):
+        print("Missing on PATH: openscad")
+        return 1
+
+    names = args.categories or list(CATEGORIES)
+    print(f"Tier {args.tier}, {args.per_category} items per category, timeout {args.timeout:g}s\n")
+    print(f"{'category':<22}{'items':>6}{'full items/s':>14}{'low-res items/s':>17}{'speedup':>9}{'disagree':>10}")
+
+    totals = {"items": 0, "full": 0.0, "lowres": 0.0, "disagree": 0}
+    for name in names:
+        codes = sample_codes(CATEGORIES[name], args.per_category)
+        if not codes:
+            continue
+        full_seconds, full_ok = time_validation(codes, args.tier, args.timeout, lowres=False)
+        low_seconds, low_ok = time_validation(codes, args.tier, args.timeout, lowres=True)
+        disagree = sum(a != b for a, b in zip(full_ok, low_ok))
+        print(f"{name:<22}{len(codes):>6}{len(codes) / full_seconds:>14.2f}{len(codes) / low_seconds:>17.2f}"
+              f"{full_seconds / low_seconds:>8.1f}x{disagree:>10}")
+        totals["items"] += len(codes)
+        totals["full"] += full_seconds
+        totals["lowres"] += low_seconds
+        totals["disagree"] += disagree
+
+    if totals["items"]:
+        print(f"{'total':<22}{totals['items']:>6}{totals['items'] / totals['full']:>14.2f}"
+              f"{totals['items'] / totals['lowres']:>17.2f}{totals['full'] / totals['lowres']:>8.1f}x"
+              f"{totals['disagree']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
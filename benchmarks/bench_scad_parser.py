@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-process OpenSCAD parser over the whole corpus.
+
+Parses every item of every category dataset with
+pipeline.scad_parser.check_syntax and reports throughput (items/s, MB/s,
+median and 99th percentile latency) and the number of items rejected per
+category. Rejections of items whose dataset entry says renders=true are
+listed separately: those flags come from older, weaker checks, so each one
+is either a syntax error they missed or a parser bug worth a look.
+
+Usage:
+    python benchmarks/bench_scad_parser.py [--show 5] [categories ...]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path to import from pipeline
+sys.path.append(REPO_ROOT)
+
+from pipeline.categories import CATEGORIES
+from pipeline.dataset_reader import iter_dataset
+from pipeline.scad_parser import check_syntax
+
+
+def percentile(values, fraction):
+    """Value at `fraction` (0-1) of the sorted values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-process OpenSCAD parser")
+    parser.add_argument("--show", type=int, default=3, help="Rejections to print per category")
+    parser.add_argument("categories", nargs="*", help="Categories to benchmark (default: all)")
+    args = parser.parse_args()
+
+    print(f"{'category':<22}{'items':>7}{'MB':>7}{'items/s':>10}{'rejected':>10}{'of renders=true':>17}")
+    latencies = []
+    totals = {"items": 0, "chars": 0, "seconds": 0.0, "rejected": 0, "flagged": 0}
+    examples = []
+    for name in args.categories or list(CATEGORIES):
+        category = CATEGORIES[name]
+        path = os.path.join(REPO_ROOT, category.dataset_file)
+        if not os.path.exists(path):
+            continue
+        items = chars = rejected = flagged = 0
+        seconds = 0.0
+        shown = 0
+        for entry in iter_dataset(path, legacy_key=category.legacy_key):
+            code = entry.get("openscad_code")
+            if not code:
+                continue
+            start = time.perf_counter()
+            error = check_syntax(code)
+            elapsed = time.perf_counter() - start
+            latencies.append(elapsed)
+            seconds += elapsed
+            items += 1
+            chars += len(code)
+            if error is not None:
+                rejected += 1
+                if entry.get("renders"):
+                    flagged += 1
+                if shown < args.show:
+                    examples.append(f"  {name}/{entry.get(category.name_key)}: {error}")
+                    shown += 1
+        if not items:
+            continue
+        print(f"{name:<22}{items:>7}{chars / 1e6:>7.1f}{items / seconds:>10.0f}{rejected:>10}{flagged:>17}")
+        totals["items"] += items
+        totals["chars"] += chars
+        totals["seconds"] += seconds
+        totals["rejected"] += rejected
+        totals["flagged"] += flagged
+
+    if not totals["items"]:
+        print("No datasets found")
+        return 1
+    print(f"{'total':<22}{totals['items']:>7}{totals['chars'] / 1e6:>7.1f}"
+          f"{totals['items'] / totals['seconds']:>10.0f}{totals['rejected']:>10}{totals['flagged']:>17}")
+    print(f"\n{totals['chars'] / 1e6 / totals['seconds']:.2f} MB/s, "
+          f"median {percentile(latencies, 0.5) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms, "
+          f"{totals['seconds']:.1f}s total")
+    if examples:
+        print("\nRejections:")
+        print("\n".join(examples))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
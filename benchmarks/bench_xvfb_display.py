@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-item display startup: `xvfb-run -a` vs. a persistent Xvfb.
+
+Renders the same small model N times to PNG, once wrapping every call in
+`xvfb-run -a openscad ...` (what combine.py and render.sh used to do) and
+once through pipeline.displays.run_with_display against a persistent
+display. The per-item difference is the X server startup/teardown saved.
+
+Requires Xvfb, xvfb-run and openscad on PATH.
+
+Usage:
+    python benchmarks/bench_xvfb_display.py [--items 20] [--code FILE]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import subprocess
+
+# Add parent directory to path to import from pipeline
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.displays import DisplayPool, run_with_display, get_display_pool
+
+SAMPLE_CODE = """
+difference() {
+    cube([40, 40, 20], center=true);
+    cylinder(h=30, r=12, center=true);
+}
+"""
+
+
+def time_renders(render, scad_file, png_file, items):
+    """
+    Time `items` renders.
+
+    Returns:
+        tuple: (seconds per item, number of successful renders)
+    """
+    ok = 0
+    start = time.perf_counter()
+    for _ in range(items):
+        result = render(['openscad', '--imgsize=100,100', '-o', png_file, scad_file])
+        ok += result.returncode == 0
+    return (time.perf_counter() - start) / items, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark xvfb-run per item vs. a persistent Xvfb display")
+    parser.add_argument("--items", type=int, default=20, help="Renders per mode")
+    parser.add_argument("--code", help="OpenSCAD file to render (default: a small built-in model)")
+    args = parser.parse_args()
+
+    missing = [tool for tool in ("Xvfb", "xvfb-run", "openscad") if not shutil.which(tool)]
+    if missing:
+        print(f"Missing on PATH: {', '.join(missing)}")
+        return 1
+
+    workdir = tempfile.mkdtemp(prefix="bench_xvfb_")
+    try:
+        scad_file = os.path.join(workdir, "model.scad")
+        png_file = os.path.join(workdir, "model.png")
+        if args.code:
+            shutil.copy(args.code, scad_file)
+        else:
+            with open(scad_file, 'w', encoding='utf-8') as f:
+                f.write(SAMPLE_CODE)
+
+        # Display startup on its own
+        pool = DisplayPool(1)
+        start = time.perf_counter()
+        with pool.acquire():
+            pass
+        startup = time.perf_counter() - start
+        pool.close()
+
+        def per_call(cmd):
+            return subprocess.run(['xvfb-run', '-a'] + cmd, capture_output=True, text=True, timeout=60)
+
+        def persistent(cmd):
+            return run_with_display(cmd, capture_output=True, text=True, timeout=60)
+
+        os.environ["OPENSCAD_DISPLAY_BACKEND"] = "xvfb"
+        os.environ["OPENSCAD_DISPLAYS"] = "1"
+        # Warm up OpenSCAD and start the persistent display outside the timed loop
+        persistent(['openscad', '--imgsize=100,100', '-o', png_file, scad_file])
+
+        old, old_ok = time_renders(per_call, scad_file, png_file, args.items)
+        new, new_ok = time_renders(persistent, scad_file, png_file, args.items)
+
+        print(f"Xvfb startup (one-off):        {startup * 1000:8.1f} ms")
+        print(f"xvfb-run -a per item:          {old * 1000:8.1f} ms/item ({old_ok}/{args.items} ok)")
+        print(f"persistent display per item:   {new * 1000:8.1f} ms/item ({new_ok}/{args.items} ok)")
+        print(f"saved per item:                {(old - new) * 1000:8.1f} ms ({old / new:.2f}x)")
+        print(f"display restarts: {get_display_pool().stats()['restarts']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
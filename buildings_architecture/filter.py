@@ -6,22 +6,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from inference.kimi import chat_with_kimi
+from pipeline.classify import DEFAULT_BATCH_SIZE
+from pipeline.filtering import run_filter, journal_path, finish_filter, DEFAULT_WORKERS
 
 
-def is_actual_building(name):
-    """
-    Use AI to determine if a name represents an actual building or architectural structure
-    (not a vehicle, animal, or other non-building).
-
-    Args:
-        name (str): The name to check
+# Shared by the single-name and batched checks
+FILTER_QUESTION = "the name of an actual building or architectural structure"
 
-    Returns:
-        bool: True if it's an actual building, False otherwise
-    """
-    prompt = f"""Is "{name}" the name of an actual building or architectural structure?
-Answer with just "yes" or "no".
-Do NOT count:
+FILTER_CRITERIA = """Do NOT count:
 - Vehicles (like "car", "boat", "plane", "train")
 - Animals (like "cat", "dog", "bird", "fish")
 - Food items (like "apple", "bread", "milk")
@@ -37,7 +29,24 @@ DO count:
 - Religious buildings (like "church", "temple", "mosque")
 - Historical buildings (like "castle", "palace", "cathedral")
 - Modern buildings (like "skyscraper", "tower", "arena")
-- Infrastructure (like "bridge", "tunnel", "lighthouse")
+- Infrastructure (like "bridge", "tunnel", "lighthouse")"""
+
+
+def is_actual_building(name):
+    """
+    Use AI to determine if a name represents an actual building or architectural structure
+    (not a vehicle, animal, or other non-building).
+
+    Args:
+        name (str): The name to check
+
+    Returns:
+        bool: True if it's an actual building, False otherwise, None if
+        the check failed (it is retried on the next run)
+    """
+    prompt = f"""Is "{name}" {FILTER_QUESTION}?
+Answer with just "yes" or "no".
+{FILTER_CRITERIA}
 
 Answer:"""
 
@@ -47,16 +56,18 @@ Answer:"""
         return "yes" in answer
     except Exception as e:
         print(f"Error checking '{name}': {e}")
-        return False
+        return None
 
 
-def filter_buildings_list(input_file, output_file=None):
+def filter_buildings_list(input_file, output_file=None, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS):
     """
     Filter the buildings list to only include actual buildings.
 
     Args:
         input_file (str): Path to the input JSON file
         output_file (str): Path to save filtered results (optional)
+        batch_size (int): Names per classification request (1 to check names one at a time)
+        workers (int): Number of classification requests in flight at once
 
     Returns:
         list: List of actual buildings
@@ -69,10 +80,17 @@ def filter_buildings_list(input_file, output_file=None):
 
     print(f"Filtering {len(building_names)} entries...")
 
+    # Verdicts are journaled as they arrive so an interrupted run can resume
+    journal_file = journal_path(input_file, output_file)
+    verdicts = dict(run_filter(building_names, FILTER_QUESTION, FILTER_CRITERIA, is_actual_building, journal_file,
+                               batch_size=batch_size, workers=workers))
+
     for i, name in enumerate(building_names):
         print(f"Checking [{i+1}/{len(building_names)}]: {name}...", end=" ")
 
-        if is_actual_building(name):
+        if verdicts[name] is None:
+            print(" Not checked (retried on the next run)")
+        elif verdicts[name]:
             actual_buildings.append(name)
             print(" Building")
         else:
@@ -86,6 +104,8 @@ def filter_buildings_list(input_file, output_file=None):
             json.dump(actual_buildings, f, indent=4, ensure_ascii=False)
         print(f"Saved to {output_file}")
 
+    finish_filter(journal_file, verdicts)
+
     return actual_buildings
 
 
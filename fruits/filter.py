@@ -6,22 +6,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from inference.kimi import chat_with_kimi
+from pipeline.classify import DEFAULT_BATCH_SIZE
+from pipeline.filtering import run_filter, journal_path, finish_filter, DEFAULT_WORKERS
 
 
-def is_actual_fruit(name):
-    """
-    Use AI to determine if a name represents an actual fruit
-    (not a vegetable, nut, or other non-fruit).
-
-    Args:
-        name (str): The name to check
+# Shared by the single-name and batched checks
+FILTER_QUESTION = "the name of an actual fruit"
 
-    Returns:
-        bool: True if it's an actual fruit, False otherwise
-    """
-    prompt = f"""Is "{name}" the name of an actual fruit?
-Answer with just "yes" or "no".
-Do NOT count:
+FILTER_CRITERIA = """Do NOT count:
 - Vegetables (like "tomato", "cucumber", "pepper", "eggplant")
 - Nuts (like "almond", "walnut", "peanut", "cashew")
 - Spices or herbs
@@ -34,7 +26,24 @@ DO count:
 - Tropical fruits (like "mango", "pineapple", "papaya")
 - Citrus fruits (like "lemon", "lime", "grapefruit")
 - Stone fruits (like "peach", "plum", "cherry")
-- Melons (like "watermelon", "cantaloupe")
+- Melons (like "watermelon", "cantaloupe")"""
+
+
+def is_actual_fruit(name):
+    """
+    Use AI to determine if a name represents an actual fruit
+    (not a vegetable, nut, or other non-fruit).
+
+    Args:
+        name (str): The name to check
+
+    Returns:
+        bool: True if it's an actual fruit, False otherwise, None if
+        the check failed (it is retried on the next run)
+    """
+    prompt = f"""Is "{name}" {FILTER_QUESTION}?
+Answer with just "yes" or "no".
+{FILTER_CRITERIA}
 
 Answer:"""
 
@@ -44,16 +53,18 @@ Answer:"""
         return "yes" in answer
     except Exception as e:
         print(f"Error checking '{name}': {e}")
-        return False
+        return None
 
 
-def filter_fruits_list(input_file, output_file=None):
+def filter_fruits_list(input_file, output_file=None, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS):
     """
     Filter the fruits list to only include actual fruits.
 
     Args:
         input_file (str): Path to the input JSON file
         output_file (str): Path to save filtered results (optional)
+        batch_size (int): Names per classification request (1 to check names one at a time)
+        workers (int): Number of classification requests in flight at once
 
     Returns:
         list: List of actual fruits
@@ -66,10 +77,17 @@ def filter_fruits_list(input_file, output_file=None):
 
     print(f"Filtering {len(fruit_names)} entries...")
 
+    # Verdicts are journaled as they arrive so an interrupted run can resume
+    journal_file = journal_path(input_file, output_file)
+    verdicts = dict(run_filter(fruit_names, FILTER_QUESTION, FILTER_CRITERIA, is_actual_fruit, journal_file,
+                               batch_size=batch_size, workers=workers))
+
     for i, name in enumerate(fruit_names):
         print(f"Checking [{i+1}/{len(fruit_names)}]: {name}...", end=" ")
 
-        if is_actual_fruit(name):
+        if verdicts[name] is None:
+            print(" Not checked (retried on the next run)")
+        elif verdicts[name]:
             actual_fruits.append(name)
             print(" Fruit")
         else:
@@ -83,6 +101,8 @@ def filter_fruits_list(input_file, output_file=None):
             json.dump(actual_fruits, f, indent=4, ensure_ascii=False)
         print(f"Saved to {output_file}")
 
+    finish_filter(journal_file, verdicts)
+
     return actual_fruits
 
 
@@ -0,0 +1,312 @@
+"""
+Content-addressed on-disk cache for LLM responses.
+
+Entries are keyed by a SHA-256 of the model name, messages and sampling
+params, and stored in SQLite with compressed bodies (zstd when the optional
+`zstandard` package is installed, zlib otherwise). The cache is bounded by
+total size and entry age, evicting least-recently-used entries first.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Cache modes
+READ_WRITE = "readwrite"
+READ_ONLY = "readonly"
+WRITE_ONLY = "writeonly"
+BYPASS = "bypass"
+CACHE_MODES = (READ_WRITE, READ_ONLY, WRITE_ONLY, BYPASS)
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".kimi_cache"
+)
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB of compressed bodies
+DEFAULT_MAX_AGE = 90 * 24 * 3600  # 90 days
+
+# Body codecs, stored per row so a cache written with zstd can still be read
+CODEC_ZLIB = 0
+CODEC_ZSTD = 1
+
+# Access times are flushed to disk in batches to keep hits read-only
+TOUCH_FLUSH_EVERY = 256
+# Expired entries are swept every N writes
+SWEEP_EVERY = 500
+
+
+def cache_key(model, messages, params=None):
+    """
+    Compute the content address of a request.
+
+    Args:
+        model (str): Model name
+        messages (list): Chat messages
+        params (dict): Sampling params (temperature, top_p, max_tokens, ...)
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _compress(text):
+    data = text.encode("utf-8")
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=6).compress(data)
+    return CODEC_ZLIB, zlib.compress(data, 6)
+
+
+def _decompress(codec, blob):
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("cache entry is zstd-compressed but zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompress(blob)
+    else:
+        data = zlib.decompress(blob)
+    return data.decode("utf-8")
+
+
+class ResponseCache:
+    """
+    SQLite-backed LLM response cache with size- and age-based LRU eviction.
+
+    Args:
+        path (str): Directory holding the cache database
+        mode (str): One of "readwrite", "readonly", "writeonly", "bypass"
+        max_bytes (int): Maximum total size of stored bodies
+        max_age (float): Maximum entry age in seconds (None to disable)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, mode=READ_WRITE,
+                 max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode '{mode}', expected one of {CACHE_MODES}")
+
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._pending_touches = {}
+        self._writes_since_sweep = 0
+        self._total_bytes = None
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.hit_seconds = 0.0
+
+    def _connect(self):
+        """Open (or reopen after fork) the database connection."""
+        pid = os.getpid()
+        if self._conn is not None and self._pid == pid:
+            return self._conn
+
+        os.makedirs(self.path, exist_ok=True)
+        conn = sqlite3.connect(
+            os.path.join(self.path, "responses.sqlite3"),
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=30,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                codec INTEGER NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+        self._conn = conn
+        self._pid = pid
+        self._total_bytes = None
+        self._pending_touches = {}
+        return conn
+
+    @property
+    def readable(self):
+        return self.mode in (READ_WRITE, READ_ONLY)
+
+    @property
+    def writable(self):
+        return self.mode in (READ_WRITE, WRITE_ONLY)
+
+    def get(self, key):
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Key from cache_key()
+
+        Returns:
+            str: The cached response, or None on a miss (or when not readable)
+        """
+        if not self.readable:
+            return None
+
+        start = time.perf_counter()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT codec, body, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            now = time.time()
+            if row is None or (self.max_age is not None and now - row[2] > self.max_age):
+                self.misses += 1
+                return None
+
+            self._pending_touches[key] = now
+            if len(self._pending_touches) >= TOUCH_FLUSH_EVERY:
+                self._flush_touches(conn)
+
+        value = _decompress(row[0], row[1])
+        with self._lock:
+            self.hits += 1
+            self.hit_seconds += time.perf_counter() - start
+        return value
+
+    def put(self, key, value):
+        """
+        Store a response.
+
+        Args:
+            key (str): Key from cache_key()
+            value (str): Response text
+        """
+        if not self.writable or value is None:
+            return
+
+        codec, blob = _compress(value)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            previous = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, codec, body, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, codec, blob, len(blob), now, now),
+            )
+            self.writes += 1
+            if self._total_bytes is not None:
+                self._total_bytes += len(blob) - (previous[0] if previous else 0)
+
+            self._writes_since_sweep += 1
+            if self._writes_since_sweep >= SWEEP_EVERY:
+                self._writes_since_sweep = 0
+                self._evict_expired(conn)
+            self._evict_to_size(conn)
+
+    def _flush_touches(self, conn):
+        if self._pending_touches:
+            conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(ts, key) for key, ts in self._pending_touches.items()],
+            )
+            self._pending_touches = {}
+
+    def _evict_expired(self, conn):
+        if self.max_age is None:
+            return
+        cursor = conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age,)
+        )
+        if cursor.rowcount:
+            self.evictions += cursor.rowcount
+            self._total_bytes = None
+
+    def _evict_to_size(self, conn):
+        if self.max_bytes is None:
+            return
+        if self._total_bytes is None:
+            self._total_bytes = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        # Evict least recently used entries down to 90% of the budget
+        self._flush_touches(conn)
+        target = int(self.max_bytes * 0.9)
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        ).fetchall():
+            if self._total_bytes <= target:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def evict(self):
+        """Apply age and size eviction now."""
+        with self._lock:
+            conn = self._connect()
+            self._flush_touches(conn)
+            self._evict_expired(conn)
+            self._evict_to_size(conn)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            self._pending_touches = {}
+            self._total_bytes = 0
+
+    def close(self):
+        """Flush pending access times and close the database."""
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._flush_touches(self._conn)
+                self._conn.close()
+            self._conn = None
+            self._pid = None
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Hit/miss/write/eviction counts, entry count, size and mean hit latency
+        """
+        with self._lock:
+            conn = self._connect()
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "mode": self.mode,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": size,
+                "mean_hit_us": (self.hit_seconds / self.hits * 1e6) if self.hits else 0.0,
+            }
@@ -1,32 +1,432 @@
+import os
+import atexit
+import asyncio
+import threading
+import weakref
+
+import httpx
 import openai
-from .secret_key import rift_api_key
 
-def chat_with_kimi(prompt, stream=True):
+from .cache import ResponseCache, cache_key, DEFAULT_CACHE_DIR, READ_WRITE
+from .ratelimit import AdaptiveRateLimiter
+
+try:
+    from .secret_key import rift_api_key
+except ImportError:
+    rift_api_key = os.environ.get("RIFT_API_KEY")
+
+KIMI_BASE_URL = os.environ.get("KIMI_BASE_URL", "https://inference.cloudrift.ai/v1")
+KIMI_MODEL = "moonshotai/Kimi-K2-Instruct"
+
+# Connection pool settings shared by every script in the process
+MAX_CONNECTIONS = int(os.environ.get("KIMI_MAX_CONNECTIONS", "64"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("KIMI_MAX_KEEPALIVE", "32"))
+KEEPALIVE_EXPIRY = 120.0
+REQUEST_TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+
+# Global limit on concurrent async requests (see set_max_in_flight)
+MAX_IN_FLIGHT = int(os.environ.get("KIMI_MAX_IN_FLIGHT", "32"))
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+# Async clients and semaphores are bound to an event loop, so keep one per loop
+_async_state = weakref.WeakKeyDictionary()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# Retries are owned by the rate limiter, not by the OpenAI client
+_rate_limiter = AdaptiveRateLimiter(
+    rate=float(os.environ["KIMI_RATE"]) if os.environ.get("KIMI_RATE") else None,
+    initial_concurrency=int(os.environ.get("KIMI_INITIAL_CONCURRENCY", "8")),
+    max_concurrency=MAX_CONNECTIONS,
+    max_retries=int(os.environ.get("KIMI_MAX_RETRIES", "6")),
+)
+
+
+def _http2_available():
+    """Return True if the optional `h2` package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _pool_limits():
+    """Connection limits shared by the sync and async httpx clients."""
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def _build_http_client():
+    """
+    Build the pooled httpx client used under the OpenAI client.
+
+    Returns:
+        httpx.Client: Client with keep-alive, connection limits and HTTP/2 (if available)
+    """
+    return httpx.Client(
+        http2=_http2_available(),
+        limits=_pool_limits(),
+        timeout=REQUEST_TIMEOUT,
+    )
+
+
+def _build_async_http_client():
+    """
+    Build the pooled httpx client used under the AsyncOpenAI client.
+
+    Returns:
+        httpx.AsyncClient: Async client with the same pool settings as the sync one
+    """
+    return httpx.AsyncClient(
+        http2=_http2_available(),
+        limits=_pool_limits(),
+        timeout=REQUEST_TIMEOUT,
+    )
+
+
+def get_client():
+    """
+    Get the process-wide OpenAI client, creating it on first use.
+
+    The client is safe to share between threads. A forked child process gets
+    its own client so connection pools are never shared across processes.
+
+    Returns:
+        openai.OpenAI: The shared client
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            _client = openai.OpenAI(
+                api_key=rift_api_key,
+                base_url=KIMI_BASE_URL,
+                max_retries=0,
+                http_client=_build_http_client(),
+            )
+            _client_pid = pid
+    return _client
+
+
+def close_client():
+    """Close the shared client and release its pooled connections."""
+    global _client, _client_pid
+
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+atexit.register(close_client)
+
+
+def configure_cache(mode=None, path=None, max_bytes=None, max_age=None):
+    """
+    Replace the response cache used by chat_with_kimi and achat_with_kimi.
+
+    Args:
+        mode (str): "readwrite", "readonly", "writeonly" or "bypass"
+        path (str): Cache directory
+        max_bytes (int): Size budget for stored bodies
+        max_age (float): Maximum entry age in seconds
+
+    Returns:
+        ResponseCache: The new cache
+    """
+    global _cache
+
+    kwargs = {
+        "mode": mode or os.environ.get("KIMI_CACHE_MODE", READ_WRITE),
+        "path": path or os.environ.get("KIMI_CACHE_DIR", DEFAULT_CACHE_DIR),
+    }
+    if max_bytes is not None:
+        kwargs["max_bytes"] = max_bytes
+    if max_age is not None:
+        kwargs["max_age"] = max_age
+
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = ResponseCache(**kwargs)
+    return _cache
+
+
+def get_cache():
+    """
+    Get the process-wide response cache, configured from the environment on first use.
+
+    Returns:
+        ResponseCache: The shared cache
+    """
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    path=os.environ.get("KIMI_CACHE_DIR", DEFAULT_CACHE_DIR),
+                    mode=os.environ.get("KIMI_CACHE_MODE", READ_WRITE),
+                )
+    return _cache
+
+
+def cache_stats():
+    """Return hit/miss/eviction statistics of the shared response cache."""
+    return get_cache().stats()
+
+
+def _close_cache():
+    if _cache is not None:
+        _cache.close()
+
+
+atexit.register(_close_cache)
+
+
+def get_rate_limiter():
+    """
+    Get the process-wide adaptive rate limiter shared by sync and async calls.
+
+    Returns:
+        AdaptiveRateLimiter: The shared limiter
+    """
+    return _rate_limiter
+
+
+def configure_rate_limiter(**kwargs):
+    """
+    Replace the shared rate limiter.
+
+    Args:
+        **kwargs: Arguments for AdaptiveRateLimiter (rate, burst, max_retries, ...)
+
+    Returns:
+        AdaptiveRateLimiter: The new limiter
+    """
+    global _rate_limiter
+
+    kwargs.setdefault("max_concurrency", MAX_CONNECTIONS)
+    _rate_limiter = AdaptiveRateLimiter(**kwargs)
+    return _rate_limiter
+
+
+def rate_limit_stats():
+    """Return throughput and throttling counters of the shared rate limiter."""
+    return _rate_limiter.stats()
+
+
+def _user_messages(prompt):
+    return [{"role": "user", "content": prompt}]
+
+
+def chat_with_kimi(prompt, stream=True, use_cache=True, **params):
     """
     Send a prompt to the Kimi-K2-Instruct model and get a response.
 
+    Non-streamed responses are served from and stored in the response cache
+    (see configure_cache); streamed responses always go to the model. A
+    stream is sent on first iteration and holds a rate limiter slot until
+    it is exhausted or closed.
+
     Args:
         prompt (str): The user message to send to the model
         stream (bool): Whether to stream the response (default: True)
+        use_cache (bool): Whether to consult the response cache (default: True)
+        **params: Sampling params forwarded to the API (temperature, max_tokens, ...)
 
     Returns:
         str: The complete response from the model (if stream=False)
-        generator: A streaming response generator (if stream=True)
+        generator: The streamed completion chunks (if stream=True)
     """
-    client = openai.OpenAI(
-        api_key=rift_api_key,
-        base_url="https://inference.cloudrift.ai/v1"
-    )
+    messages = _user_messages(prompt)
 
-    completion = client.chat.completions.create(
-        model="moonshotai/Kimi-K2-Instruct",
-        messages=[
-            {"role": "user", "content": prompt}
-        ],
-        stream=stream
-    )
+    key = None
+    if not stream and use_cache:
+        cache = get_cache()
+        key = cache_key(KIMI_MODEL, messages, params)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
 
+    client = get_client()
+
+    def create():
+        return client.chat.completions.create(
+            model=KIMI_MODEL,
+            messages=messages,
+            stream=stream,
+            **params
+        )
+
+    # Throttled and transient failures are retried inside the limiter
     if stream:
-        return completion
-    else:
-        return completion.choices[0].message.content
\ No newline at end of file
+        return _rate_limiter.stream(create)
+
+    completion = _rate_limiter.call(create)
+    content = completion.choices[0].message.content
+    if key is not None:
+        cache.put(key, content)
+    return content
+
+
+def set_max_in_flight(limit):
+    """
+    Set the global limit on concurrent async requests.
+
+    Takes effect for event loops that have not made a request yet.
+
+    Args:
+        limit (int): Maximum number of requests in flight per event loop
+    """
+    global MAX_IN_FLIGHT
+
+    if limit < 1:
+        raise ValueError("max in-flight limit must be at least 1")
+    MAX_IN_FLIGHT = limit
+
+
+def _get_async_state():
+    """
+    Get the (client, semaphore) pair for the running event loop.
+
+    Returns:
+        tuple: (openai.AsyncOpenAI, asyncio.Semaphore)
+    """
+    loop = asyncio.get_running_loop()
+    state = _async_state.get(loop)
+    if state is None:
+        client = openai.AsyncOpenAI(
+            api_key=rift_api_key,
+            base_url=KIMI_BASE_URL,
+            max_retries=0,
+            http_client=_build_async_http_client(),
+        )
+        state = (client, asyncio.Semaphore(MAX_IN_FLIGHT))
+        _async_state[loop] = state
+    return state
+
+
+def get_async_client():
+    """
+    Get the AsyncOpenAI client for the running event loop.
+
+    Returns:
+        openai.AsyncOpenAI: The shared async client
+    """
+    return _get_async_state()[0]
+
+
+async def aclose_client():
+    """Close the async client of the running event loop."""
+    state = _async_state.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state[0].close()
+
+
+async def achat_with_kimi(prompt, timeout=None, use_cache=True, **params):
+    """
+    Async counterpart of chat_with_kimi(prompt, stream=False).
+
+    Cache hits return immediately; misses wait for a free slot under the
+    global in-flight limit before sending.
+
+    Args:
+        prompt (str): The user message to send to the model
+        timeout (float): Per-request timeout in seconds (None for the client default)
+        use_cache (bool): Whether to consult the response cache (default: True)
+        **params: Sampling params forwarded to the API
+
+    Returns:
+        str: The complete response from the model
+    """
+    messages = _user_messages(prompt)
+
+    key = None
+    if use_cache:
+        cache = get_cache()
+        key = cache_key(KIMI_MODEL, messages, params)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    client, semaphore = _get_async_state()
+
+    async with semaphore:
+        completion = await _rate_limiter.acall(
+            lambda: client.chat.completions.create(
+                model=KIMI_MODEL,
+                messages=messages,
+                stream=False,
+                timeout=timeout if timeout is not None else openai.NOT_GIVEN,
+                **params
+            )
+        )
+
+    content = completion.choices[0].message.content
+    if key is not None:
+        cache.put(key, content)
+    return content
+
+
+async def astream_kimi(prompt, timeout=None):
+    """
+    Stream a response from the model as an async generator of text chunks.
+
+    The in-flight slot and the rate limiter slot are held until the stream
+    is exhausted or closed.
+
+    Args:
+        prompt (str): The user message to send to the model
+        timeout (float): Per-request timeout in seconds (None for the client default)
+
+    Yields:
+        str: Content deltas as they arrive
+    """
+    client, semaphore = _get_async_state()
+
+    async with semaphore:
+        chunks = _rate_limiter.astream(
+            lambda: client.chat.completions.create(
+                model=KIMI_MODEL,
+                messages=_user_messages(prompt),
+                stream=True,
+                timeout=timeout if timeout is not None else openai.NOT_GIVEN
+            )
+        )
+        try:
+            async for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await chunks.aclose()
+
+
+async def achat_many(prompts, timeout=None):
+    """
+    Send many prompts concurrently, bounded by the global in-flight limit.
+
+    Args:
+        prompts (list): Prompts to send
+        timeout (float): Per-request timeout in seconds
+
+    Returns:
+        list: Responses in prompt order; failed requests are returned as exceptions
+    """
+    return await asyncio.gather(
+        *(achat_with_kimi(prompt, timeout=timeout) for prompt in prompts),
+        return_exceptions=True
+    )
@@ -0,0 +1,371 @@
+"""
+Adaptive rate limiting for the inference endpoint.
+
+Combines a token bucket (requests per second) with an AIMD concurrency
+window: the window grows additively while requests succeed and is halved
+when the endpoint throttles. 429 and 5xx responses are retried with
+exponential backoff, honoring Retry-After, so callers only see a failure
+once every retry has been spent.
+"""
+
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+
+import openai
+
+# Outcomes reported to release()
+SUCCESS = "success"
+THROTTLED = "throttled"
+SERVER_ERROR = "server_error"
+FAILED = "failed"
+
+
+def retry_after_seconds(exc):
+    """
+    Extract the Retry-After delay from an API error.
+
+    Args:
+        exc (Exception): Error raised by the OpenAI client
+
+    Returns:
+        float: Seconds to wait, or None if the header is absent or invalid
+    """
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+
+    value = response.headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000.0
+        except ValueError:
+            pass
+
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(exc):
+    """
+    Map an exception to a limiter outcome.
+
+    Returns:
+        str: THROTTLED, SERVER_ERROR (retryable) or FAILED (not retryable)
+    """
+    if isinstance(exc, openai.RateLimitError):
+        return THROTTLED
+    if isinstance(exc, openai.APIStatusError):
+        if exc.status_code == 429:
+            return THROTTLED
+        if exc.status_code >= 500:
+            return SERVER_ERROR
+        return FAILED
+    if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
+        return SERVER_ERROR
+    return FAILED
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket plus AIMD concurrency window, usable from threads and asyncio.
+
+    Args:
+        rate (float): Sustained requests per second (None for no rate cap)
+        burst (int): Token bucket capacity
+        initial_concurrency (int): Starting concurrency window
+        min_concurrency (int): Lower bound for the window
+        max_concurrency (int): Upper bound for the window
+        max_retries (int): Retries per call for throttled/5xx/connection errors
+        base_backoff (float): First backoff delay in seconds
+        max_backoff (float): Cap on any single backoff delay
+        decrease_cooldown (float): Minimum seconds between two window halvings
+    """
+
+    def __init__(self, rate=None, burst=10, initial_concurrency=8, min_concurrency=1,
+                 max_concurrency=64, max_retries=6, base_backoff=1.0, max_backoff=60.0,
+                 decrease_cooldown=1.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.decrease_cooldown = decrease_cooldown
+
+        self._cond = threading.Condition()
+        self._limit = float(min(max(initial_concurrency, min_concurrency), max_concurrency))
+        self._in_flight = 0
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._started = time.monotonic()
+
+        self.requests = 0
+        self.successes = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.failures = 0
+        self.retries = 0
+        self.wait_seconds = 0.0
+
+    # -- slot accounting -------------------------------------------------
+
+    def _refill(self, now):
+        if self.rate is None:
+            return
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _try_acquire(self):
+        """
+        Take a slot if one is available. Caller must hold the condition.
+
+        Returns:
+            float: 0 if acquired, otherwise seconds to wait before retrying
+        """
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._in_flight >= int(self._limit):
+            return 0.05
+        self._refill(now)
+        if self.rate is not None and self._tokens < 1.0:
+            return (1.0 - self._tokens) / self.rate
+        if self.rate is not None:
+            self._tokens -= 1.0
+        self._in_flight += 1
+        self.requests += 1
+        return 0.0
+
+    def acquire(self):
+        """Block the calling thread until a request slot is available."""
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0.0:
+                    break
+                self._cond.wait(timeout=wait)
+            self.wait_seconds += time.monotonic() - start
+
+    async def aacquire(self):
+        """Wait in the running event loop until a request slot is available."""
+        start = time.monotonic()
+        while True:
+            with self._cond:
+                wait = self._try_acquire()
+                if wait == 0.0:
+                    self.wait_seconds += time.monotonic() - start
+                    return
+            await asyncio.sleep(min(wait, 0.05))
+
+    def release(self, outcome, retry_after=None):
+        """
+        Return a slot and adapt the concurrency window.
+
+        Args:
+            outcome (str): SUCCESS, THROTTLED, SERVER_ERROR or FAILED
+            retry_after (float): Server-requested delay before the next request
+        """
+        now = time.monotonic()
+        with self._cond:
+            self._in_flight -= 1
+
+            if outcome == SUCCESS:
+                self.successes += 1
+                # Additive increase: roughly +1 per window of successful requests
+                self._limit = min(self.max_concurrency, self._limit + 1.0 / self._limit)
+            elif outcome in (THROTTLED, SERVER_ERROR):
+                if outcome == THROTTLED:
+                    self.throttled += 1
+                else:
+                    self.server_errors += 1
+                # Multiplicative decrease, once per congestion event
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self._limit = max(self.min_concurrency, self._limit / 2.0)
+                    self._last_decrease = now
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+            else:
+                self.failures += 1
+
+            self._cond.notify_all()
+
+    # -- retrying wrappers -----------------------------------------------
+
+    def _backoff(self, attempt, retry_after):
+        if retry_after is not None:
+            return min(self.max_backoff, retry_after)
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2.0)
+
+    def _start(self, fn):
+        """
+        Acquire a slot and run fn(), retrying throttled and transient failures.
+
+        The slot is still held when this returns; the caller releases it. If
+        fn() raises, including cancellation, the slot is released here.
+        """
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                return fn()
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # KeyboardInterrupt, task cancellation: give the slot back, never retry
+                    self.release(FAILED)
+                    raise
+                outcome = classify_error(e)
+                retry_after = retry_after_seconds(e)
+                self.release(outcome, retry_after)
+                if outcome == FAILED or attempt >= self.max_retries:
+                    raise
+                self.retries += 1
+                time.sleep(self._backoff(attempt, retry_after))
+                attempt += 1
+
+    async def _astart(self, fn):
+        """Async counterpart of _start(); fn() must return an awaitable."""
+        attempt = 0
+        while True:
+            await self.aacquire()
+            try:
+                return await fn()
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    self.release(FAILED)
+                    raise
+                outcome = classify_error(e)
+                retry_after = retry_after_seconds(e)
+                self.release(outcome, retry_after)
+                if outcome == FAILED or attempt >= self.max_retries:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+                attempt += 1
+
+    def call(self, fn):
+        """
+        Run fn() under the limiter, retrying throttled and transient failures.
+
+        Args:
+            fn (callable): Function performing one API request
+
+        Returns:
+            The result of fn()
+        """
+        result = self._start(fn)
+        self.release(SUCCESS)
+        return result
+
+    async def acall(self, fn):
+        """
+        Async counterpart of call(); fn() must return an awaitable.
+
+        Args:
+            fn (callable): Function returning a coroutine performing one API request
+
+        Returns:
+            The awaited result of fn()
+        """
+        result = await self._astart(fn)
+        self.release(SUCCESS)
+        return result
+
+    def stream(self, fn):
+        """
+        Run fn() under the limiter and yield from the stream it returns.
+
+        The slot is held until the stream is exhausted or closed, so streams
+        count against the concurrency window while they are read. Failures
+        opening the stream are retried like call(); a failure mid-stream
+        (e.g. a 429) adapts the window but is raised, since part of the
+        response has already been delivered.
+
+        Args:
+            fn (callable): Function opening one streaming API request
+
+        Yields:
+            The items of the stream
+        """
+        stream = self._start(fn)
+        outcome, retry_after = SUCCESS, None
+        try:
+            for item in stream:
+                yield item
+        except Exception as e:
+            outcome, retry_after = classify_error(e), retry_after_seconds(e)
+            raise
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            outcome = FAILED
+            raise
+        finally:
+            try:
+                stream.close()
+            finally:
+                self.release(outcome, retry_after)
+
+    async def astream(self, fn):
+        """
+        Async counterpart of stream(); fn() must return an awaitable async stream.
+
+        Args:
+            fn (callable): Function returning a coroutine opening one streaming API request
+
+        Yields:
+            The items of the stream
+        """
+        stream = await self._astart(fn)
+        outcome, retry_after = SUCCESS, None
+        try:
+            async for item in stream:
+                yield item
+        except Exception as e:
+            outcome, retry_after = classify_error(e), retry_after_seconds(e)
+            raise
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            outcome = FAILED
+            raise
+        finally:
+            try:
+                await stream.close()
+            finally:
+                self.release(outcome, retry_after)
+
+    def stats(self):
+        """
+        Get throughput and throttling counters.
+
+        Returns:
+            dict: Counters, current window, in-flight count and successes per second
+        """
+        with self._cond:
+            elapsed = time.monotonic() - self._started
+            return {
+                "requests": self.requests,
+                "successes": self.successes,
+                "throttled": self.throttled,
+                "server_errors": self.server_errors,
+                "failures": self.failures,
+                "retries": self.retries,
+                "concurrency_limit": round(self._limit, 2),
+                "in_flight": self._in_flight,
+                "paused_for": max(0.0, self._paused_until - time.monotonic()),
+                "throughput_per_s": self.successes / elapsed if elapsed > 0 else 0.0,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
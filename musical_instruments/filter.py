@@ -6,22 +6,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from inference.kimi import chat_with_kimi
+from pipeline.classify import DEFAULT_BATCH_SIZE
+from pipeline.filtering import run_filter, journal_path, finish_filter, DEFAULT_WORKERS
 
 
-def is_actual_musical_instrument(name):
-    """
-    Use AI to determine if a name represents an actual musical instrument
-    (not a tool, vehicle, or other non-instrument).
-
-    Args:
-        name (str): The name to check
+# Shared by the single-name and batched checks
+FILTER_QUESTION = "the name of an actual musical instrument"
 
-    Returns:
-        bool: True if it's an actual musical instrument, False otherwise
-    """
-    prompt = f"""Is "{name}" the name of an actual musical instrument?
-Answer with just "yes" or "no".
-Do NOT count:
+FILTER_CRITERIA = """Do NOT count:
 - Tools (like "hammer", "saw", "drill")
 - Vehicles (like "car", "boat", "plane")
 - Buildings (like "house", "tower", "bridge")
@@ -36,7 +28,24 @@ DO count:
 - Percussion instruments (like "drum", "cymbal", "xylophone")
 - Keyboard instruments (like "piano", "organ", "synthesizer")
 - Electronic instruments (like "theremin", "sampler", "sequencer")
-- Traditional/world instruments (like "didgeridoo", "koto", "tabla")
+- Traditional/world instruments (like "didgeridoo", "koto", "tabla")"""
+
+
+def is_actual_musical_instrument(name):
+    """
+    Use AI to determine if a name represents an actual musical instrument
+    (not a tool, vehicle, or other non-instrument).
+
+    Args:
+        name (str): The name to check
+
+    Returns:
+        bool: True if it's an actual musical instrument, False otherwise, None if
+        the check failed (it is retried on the next run)
+    """
+    prompt = f"""Is "{name}" {FILTER_QUESTION}?
+Answer with just "yes" or "no".
+{FILTER_CRITERIA}
 
 Answer:"""
 
@@ -46,16 +55,18 @@ Answer:"""
         return "yes" in answer
     except Exception as e:
         print(f"Error checking '{name}': {e}")
-        return False
+        return None
 
 
-def filter_musical_instruments_list(input_file, output_file=None):
+def filter_musical_instruments_list(input_file, output_file=None, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS):
     """
     Filter the musical instruments list to only include actual musical instruments.
 
     Args:
         input_file (str): Path to the input JSON file
         output_file (str): Path to save filtered results (optional)
+        batch_size (int): Names per classification request (1 to check names one at a time)
+        workers (int): Number of classification requests in flight at once
 
     Returns:
         list: List of actual musical instruments
@@ -68,10 +79,17 @@ def filter_musical_instruments_list(input_file, output_file=None):
 
     print(f"Filtering {len(instrument_names)} entries...")
 
+    # Verdicts are journaled as they arrive so an interrupted run can resume
+    journal_file = journal_path(input_file, output_file)
+    verdicts = dict(run_filter(instrument_names, FILTER_QUESTION, FILTER_CRITERIA, is_actual_musical_instrument, journal_file,
+                               batch_size=batch_size, workers=workers))
+
     for i, name in enumerate(instrument_names):
         print(f"Checking [{i+1}/{len(instrument_names)}]: {name}...", end=" ")
 
-        if is_actual_musical_instrument(name):
+        if verdicts[name] is None:
+            print(" Not checked (retried on the next run)")
+        elif verdicts[name]:
             actual_instruments.append(name)
             print(" Musical instrument")
         else:
@@ -85,6 +103,8 @@ def filter_musical_instruments_list(input_file, output_file=None):
             json.dump(actual_instruments, f, indent=4, ensure_ascii=False)
         print(f"Saved to {output_file}")
 
+    finish_filter(journal_file, verdicts)
+
     return actual_instruments
 
 
@@ -6,22 +6,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from inference.kimi import chat_with_kimi
+from pipeline.classify import DEFAULT_BATCH_SIZE
+from pipeline.filtering import run_filter, journal_path, finish_filter, DEFAULT_WORKERS
 
 
-def is_actual_household_item(name):
-    """
-    Use AI to determine if a name represents an actual household item
-    (not a food item, animal, or other non-household item).
-
-    Args:
-        name (str): The name to check
+# Shared by the single-name and batched checks
+FILTER_QUESTION = "the name of an actual household item"
 
-    Returns:
-        bool: True if it's an actual household item, False otherwise
-    """
-    prompt = f"""Is "{name}" the name of an actual household item?
-Answer with just "yes" or "no".
-Do NOT count:
+FILTER_CRITERIA = """Do NOT count:
 - Food items (like "apple", "bread", "milk", "cheese")
 - Animals (like "cat", "dog", "bird", "fish")
 - Plants (like "tree", "flower", "grass")
@@ -37,7 +29,24 @@ DO count:
 - Cleaning supplies (like "broom", "mop", "soap")
 - Personal care items (like "toothbrush", "towel", "mirror")
 - Decorative items (like "vase", "candle", "picture")
-- Tools and utensils (like "hammer", "scissors", "knife")
+- Tools and utensils (like "hammer", "scissors", "knife")"""
+
+
+def is_actual_household_item(name):
+    """
+    Use AI to determine if a name represents an actual household item
+    (not a food item, animal, or other non-household item).
+
+    Args:
+        name (str): The name to check
+
+    Returns:
+        bool: True if it's an actual household item, False otherwise, None if
+        the check failed (it is retried on the next run)
+    """
+    prompt = f"""Is "{name}" {FILTER_QUESTION}?
+Answer with just "yes" or "no".
+{FILTER_CRITERIA}
 
 Answer:"""
 
@@ -47,16 +56,18 @@ Answer:"""
         return "yes" in answer
     except Exception as e:
         print(f"Error checking '{name}': {e}")
-        return False
+        return None
 
 
-def filter_household_items_list(input_file, output_file=None):
+def filter_household_items_list(input_file, output_file=None, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS):
     """
     Filter the household items list to only include actual household items.
 
     Args:
         input_file (str): Path to the input JSON file
         output_file (str): Path to save filtered results (optional)
+        batch_size (int): Names per classification request (1 to check names one at a time)
+        workers (int): Number of classification requests in flight at once
 
     Returns:
         list: List of actual household items
@@ -69,10 +80,17 @@ def filter_household_items_list(input_file, output_file=None):
 
     print(f"Filtering {len(item_names)} entries...")
 
+    # Verdicts are journaled as they arrive so an interrupted run can resume
+    journal_file = journal_path(input_file, output_file)
+    verdicts = dict(run_filter(item_names, FILTER_QUESTION, FILTER_CRITERIA, is_actual_household_item, journal_file,
+                               batch_size=batch_size, workers=workers))
+
     for i, name in enumerate(item_names):
         print(f"Checking [{i+1}/{len(item_names)}]: {name}...", end=" ")
 
-        if is_actual_household_item(name):
+        if verdicts[name] is None:
+            print(" Not checked (retried on the next run)")
+        elif verdicts[name]:
             actual_items.append(name)
             print(" Household item")
         else:
@@ -86,6 +104,8 @@ def filter_household_items_list(input_file, output_file=None):
             json.dump(actual_items, f, indent=4, ensure_ascii=False)
         print(f"Saved to {output_file}")
 
+    finish_filter(journal_file, verdicts)
+
     return actual_items
 
 
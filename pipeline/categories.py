@@ -0,0 +1,870 @@
+"""
+Category registry for the OpenSCAD generation engine.
+
+Every category that used to have its own copy of generate-cad.py is one
+Category entry here: where its name list lives, which key names an item in
+its dataset, which dataset file it writes, its size limits and its prompt
+template. The engine in pipeline.engine is driven entirely by this table.
+"""
+
+import os
+import json
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Category:
+    """
+    One object category.
+
+    Args:
+        name (str): Category name, as used in Synthetic-Objects.json
+        directory (str): Directory holding list.json, relative to the repo root
+        name_key (str): Dataset entry key holding the item name
+        dataset_file (str): Dataset JSON file, relative to the repo root
+        prompt_template (str): Prompt with {name}, {style}, {complexity},
+            {min_size} and {max_size} placeholders
+        label (str): Human-readable item noun for messages
+        size_mm (tuple): (min, max) largest dimension requested, in mm
+        legacy_key (str): Key holding the entry list in the old dict layout
+        hf_dataset (str): Hugging Face dataset repo the category is published to
+    """
+
+    def __init__(self, name, directory, name_key, dataset_file, prompt_template,
+                 label=None, size_mm=(50, 100), legacy_key=None, hf_dataset=None):
+        self.name = name
+        self.directory = directory
+        self.name_key = name_key
+        self.dataset_file = dataset_file
+        self.prompt_template = prompt_template
+        self.label = label or name_key.replace("_", " ")
+        self.size_mm = size_mm
+        self.legacy_key = legacy_key
+        self.hf_dataset = hf_dataset
+
+    def __repr__(self):
+        return f"Category({self.name!r})"
+
+    def prompt(self, item_name, style="realistic", complexity="medium"):
+        """Build the generation prompt for one item."""
+        return self.prompt_template.format(
+            name=item_name, style=style, complexity=complexity,
+            min_size=self.size_mm[0], max_size=self.size_mm[1],
+        )
+
+    def dataset_path(self):
+        """Absolute path of the category's dataset file."""
+        return os.path.join(REPO_ROOT, self.dataset_file)
+
+    def list_path(self):
+        """Absolute path of the category's list.json."""
+        return os.path.join(REPO_ROOT, self.directory, "list.json")
+
+    def load_names(self):
+        """
+        Load the category's item names from list.json.
+
+        Returns:
+            list: Item names
+        """
+        with open(self.list_path(), 'r', encoding='utf-8-sig') as f:
+            return json.load(f)
+
+
+_ANIMALS_PROMPT = """Generate OpenSCAD code for a {name} in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+
+Style guidelines for {style}:
+- Realistic: More detailed, anatomical accuracy
+- Stylized: Simplified but recognizable features
+- Minimal: Very simple geometric shapes
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_FRUITS_PROMPT = """Generate OpenSCAD code for a {name} in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+
+Style guidelines for {style}:
+- Realistic: More detailed, anatomical accuracy
+- Stylized: Simplified but recognizable features
+- Minimal: Very simple geometric shapes
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_BUILDINGS_PROMPT = """Generate OpenSCAD code for a {name} in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+
+Style guidelines for {style}:
+- Realistic: More detailed, architectural accuracy
+- Stylized: Simplified but recognizable features
+- Minimal: Very simple geometric shapes
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_HOUSEHOLD_ITEMS_PROMPT = """Generate OpenSCAD code for a {name} in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+
+Style guidelines for {style}:
+- Realistic: More detailed, functional accuracy
+- Stylized: Simplified but recognizable features
+- Minimal: Very simple geometric shapes
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_MUSICAL_INSTRUMENTS_PROMPT = """Generate OpenSCAD code for a {name} in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+
+Style guidelines for {style}:
+- Realistic: More detailed, functional accuracy
+- Stylized: Simplified but recognizable features
+- Minimal: Very simple geometric shapes
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_VEHICLES_PROMPT = """Generate OpenSCAD code for a {name} in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+
+Style guidelines for {style}:
+- Realistic: More detailed, functional accuracy
+- Stylized: Simplified but recognizable features
+- Minimal: Very simple geometric shapes
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_FOOD_PROMPT = """Generate OpenSCAD code for a {name} food item in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include food-specific characteristics (texture, shape, color)
+- Use appropriate colors for the food item (color() function)
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to food appearance
+- Stylized: Simplified but recognizable food features
+- Minimal: Very simple geometric shapes representing the food
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Food-specific considerations:
+- Include characteristic food features (texture, layers, etc.)
+- Use appropriate proportions for the food item
+- Include food-specific details (seeds, patterns, etc.)
+- Consider the food's typical appearance and characteristics
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_HISTORICAL_ARTIFACTS_PROMPT = """Generate OpenSCAD code for a {name} historical artifact in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include historical artifact-specific features and characteristics
+- Use appropriate colors for the artifact (color() function)
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to historical accuracy
+- Stylized: Simplified but recognizable artifact features
+- Minimal: Very simple geometric shapes representing the artifact
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Historical artifact-specific considerations:
+- Include characteristic features (decorative elements, inscriptions, etc.)
+- Use appropriate proportions for the artifact
+- Include artifact-specific details (patterns, textures, etc.)
+- Consider the artifact's historical context and typical appearance
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_MYTHICAL_CREATURES_PROMPT = """Generate OpenSCAD code for a {name} mythical creature in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include mythical creature-specific features and characteristics
+- Use appropriate colors for the creature (color() function)
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to mythical creature lore
+- Stylized: Simplified but recognizable creature features
+- Minimal: Very simple geometric shapes representing the creature
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Mythical creature-specific considerations:
+- Include characteristic features (wings, horns, tails, scales, etc.)
+- Use appropriate proportions for the creature
+- Include creature-specific details (magical elements, patterns, etc.)
+- Consider the creature's typical appearance and characteristics from mythology
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_TECH_ELECTRONICS_PROMPT = """Generate OpenSCAD code for a {name} electronic device in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include electronic device-specific features and characteristics
+- Use appropriate colors for the device (color() function)
+
+Style guidelines for {style}:
+- Realistic: More detailed, functional accuracy
+- Stylized: Simplified but recognizable device features
+- Minimal: Very simple geometric shapes representing the device
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Electronic device-specific considerations:
+- Include characteristic features (screens, buttons, ports, etc.)
+- Use appropriate proportions for the device
+- Include device-specific details (logos, indicators, etc.)
+- Consider the device's typical appearance and functionality
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_TOOLS_PROMPT = """Generate OpenSCAD code for a {name} tool in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include tool-specific features and characteristics
+- Use appropriate colors for the tool (color() function)
+
+Style guidelines for {style}:
+- Realistic: More detailed, functional accuracy
+- Stylized: Simplified but recognizable tool features
+- Minimal: Very simple geometric shapes representing the tool
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Tool-specific considerations:
+- Include characteristic features (handles, blades, mechanisms, etc.)
+- Use appropriate proportions for the tool
+- Include tool-specific details (grips, markings, etc.)
+- Consider the tool's typical appearance and functionality
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_POKEMON_PROMPT = """Generate OpenSCAD code for a {name} Pokemon in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include Pokemon-specific features and characteristics
+- Use appropriate colors for the Pokemon (color() function)
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to Pokemon design
+- Stylized: Simplified but recognizable Pokemon features
+- Minimal: Very simple geometric shapes representing the Pokemon
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Pokemon-specific considerations:
+- Include characteristic features (ears, tails, wings, etc.)
+- Use appropriate proportions
+- Include facial features (eyes, mouth, etc.)
+- Add Pokemon-specific markings or patterns
+- Consider the Pokemon's type and characteristics
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_FURNITURE_PROMPT = """Generate OpenSCAD code for a {name} furniture item in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness ~2mm)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include furniture-specific characteristics (structural elements, joints, details)
+- Use appropriate proportions and realistic dimensions
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to furniture appearance with proper proportions
+- Stylized: Simplified but recognizable furniture features
+- Minimal: Very simple geometric shapes representing the furniture
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Furniture-specific considerations:
+- Include characteristic furniture elements (legs, backrests, cushions, drawers, etc.)
+- Use appropriate proportions for the furniture item
+- Include structural details (frames, supports, joints)
+- Consider typical furniture design and functionality
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_PLANTS_PROMPT = """Generate OpenSCAD code for a {name} plant in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness ~2mm)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include plant-specific characteristics (structural elements, joints, details)
+- Use appropriate proportions and realistic dimensions
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to plant appearance with proper proportions
+- Stylized: Simplified but recognizable plant features
+- Minimal: Very simple geometric shapes representing the plant
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Furniture-specific considerations:
+- Include characteristic plant elements (legs, backrests, cushions, drawers, etc.)
+- Use appropriate proportions for the plant
+- Include structural details (frames, supports, joints)
+- Consider typical plant design and functionality
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_MECHANICAL_COMPONENTS_PROMPT = """Generate OpenSCAD code for a {name} mechanical_component item in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness ~2mm)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include mechanical_component-specific characteristics (structural elements, joints, details)
+- Use appropriate proportions and realistic dimensions
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to mechanical_component appearance with proper proportions
+- Stylized: Simplified but recognizable mechanical_component features
+- Minimal: Very simple geometric shapes representing the mechanical_component
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Furniture-specific considerations:
+- Include characteristic mechanical_component elements (legs, backrests, cushions, drawers, etc.)
+- Use appropriate proportions for the mechanical_component item
+- Include structural details (frames, supports, joints)
+- Consider typical mechanical_component design and functionality
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_TOYS_PROMPT = """Generate OpenSCAD code for a {name} toy in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness ~2mm)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include toy-specific characteristics (structural elements, joints, details)
+- Use appropriate proportions and realistic dimensions
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to toy appearance with proper proportions
+- Stylized: Simplified but recognizable toy features
+- Minimal: Very simple geometric shapes representing the toy
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Furniture-specific considerations:
+- Include characteristic toy elements (legs, backrests, cushions, drawers, etc.)
+- Use appropriate proportions for the toy
+- Include structural details (frames, supports, joints)
+- Consider typical toy design and functionality
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_SPORTS_EQUIPMENT_PROMPT = """Generate OpenSCAD code for a {name} furniture item in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness ~2mm)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include furniture-specific characteristics (structural elements, joints, details)
+- Use appropriate proportions and realistic dimensions
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to furniture appearance with proper proportions
+- Stylized: Simplified but recognizable furniture features
+- Minimal: Very simple geometric shapes representing the furniture
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Furniture-specific considerations:
+- Include sports-specific features (grip texture, aerodynamic shapes, etc.)
+- Use appropriate proportions for the sports equipment item
+- Include structural details (frames, supports, joints)
+- Consider typical furniture design and functionality
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_OFFICE_SUPPLIES_PROMPT = """Generate OpenSCAD code for a {name} furniture item in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness ~2mm)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include furniture-specific characteristics (structural elements, joints, details)
+- Use appropriate proportions and realistic dimensions
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to furniture appearance with proper proportions
+- Stylized: Simplified but recognizable furniture features
+- Minimal: Very simple geometric shapes representing the furniture
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Furniture-specific considerations:
+- Include office-specific details (ergonomic design, functional elements)
+- Use appropriate proportions for the office supply item
+- Include structural details (frames, supports, joints)
+- Consider typical furniture design and functionality
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_KITCHEN_APPLIANCES_PROMPT = """Generate OpenSCAD code for a {name} kitchen appliance in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness ~2mm)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include furniture-specific characteristics (structural elements, joints, details)
+- Use appropriate proportions and realistic dimensions
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to furniture appearance with proper proportions
+- Stylized: Simplified but recognizable furniture features
+- Minimal: Very simple geometric shapes representing the furniture
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Kitchen appliance-specific considerations:
+- Include appliance-specific features (buttons, dials, containers)
+- Use appropriate proportions for the kitchen appliance
+- Include structural details (frames, supports, joints)
+- Consider typical furniture design and functionality
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_DECORATIVE_ART_PROMPT = """Generate OpenSCAD code for a {name} furniture item in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness ~2mm)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include furniture-specific characteristics (structural elements, joints, details)
+- Use appropriate proportions and realistic dimensions
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to furniture appearance with proper proportions
+- Stylized: Simplified but recognizable furniture features
+- Minimal: Very simple geometric shapes representing the furniture
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Furniture-specific considerations:
+- Include decorative details (patterns, textures, artistic elements)
+- Use appropriate proportions for the decorative art piece
+- Include structural details (frames, supports, joints)
+- Consider typical furniture design and functionality
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_NATURAL_OBJECTS_PROMPT = """Generate OpenSCAD code for a {name} furniture item in {style} style with {complexity} complexity.
+
+Requirements:
+- Use only basic OpenSCAD primitives (cube, sphere, cylinder, etc.)
+- Use transformations (translate, rotate, scale, mirror)
+- Use boolean operations (union, difference, intersection)
+- Use loops and modules for repetitive parts
+- Make it 3D printable (no overhangs, proper wall thickness ~2mm)
+- Include comments explaining each part
+- The model should be recognizable as a {name}
+- Size should be reasonable for 3D printing (roughly {min_size}-{max_size}mm in largest dimension)
+- Include furniture-specific characteristics (structural elements, joints, details)
+- Use appropriate proportions and realistic dimensions
+
+Style guidelines for {style}:
+- Realistic: More detailed, faithful to furniture appearance with proper proportions
+- Stylized: Simplified but recognizable furniture features
+- Minimal: Very simple geometric shapes representing the furniture
+
+Complexity for {complexity}:
+- Simple: Basic shapes, 20-50 lines of code
+- Medium: Moderate detail, 50-150 lines of code  
+- Detailed: High detail, 150+ lines of code
+
+Furniture-specific considerations:
+- Include natural features (organic shapes, textures, natural patterns)
+- Use appropriate proportions for the natural object
+- Include structural details (frames, supports, joints)
+- Consider typical furniture design and functionality
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_BASIC_SHAPES_PROMPT = """Generate OpenSCAD code for a {name} with {complexity} complexity.
+
+Requirements:
+- This is a BASIC PRIMITIVE SHAPE - keep it SIMPLE and GEOMETRIC
+- Use direct OpenSCAD primitives: cube(), sphere(), cylinder(), etc.
+- You may use simple boolean operations (union, difference, intersection) if needed
+- Do NOT add decorative elements - just the pure geometric form
+- Size should be reasonable (roughly {min_size}-{max_size}mm in largest dimension)
+- Include minimal comments
+
+Complexity for {complexity}:
+- Simple: Pure primitive, 5-15 lines of code
+- Medium: With rounded edges or slight modifications, 15-30 lines of code  
+- Detailed: With holes, chamfers, or basic features, 30-60 lines of code
+
+Examples:
+- For "cube": Just cube([100, 100, 100]) or cube with rounded edges if medium complexity
+- For "sphere": Just sphere(r=50) or sphere with variations
+- For "cylinder": Just cylinder(h=100, r=50)
+- For "cone": Just cylinder(h=100, r1=50, r2=0)
+- For "torus": Use rotate_extrude() with circle()
+- For "pyramid": Use cylinder() with r2=0, or polyhedron() with points
+
+Keep it clean, direct, and efficient. No unnecessary complexity.
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_PRIMITIVE_SHAPES_PROMPT = """Generate OpenSCAD code for a {name} primitive shape with {complexity} complexity.
+
+Requirements:
+- This is a PRIMITIVE SHAPE - keep it SIMPLE and GEOMETRIC
+- Use the most direct approach: polygon() for 2D shapes, linear_extrude() or rotate_extrude() for 3D
+- Do NOT add legs, supports, or decorative elements - just the geometric shape itself
+- The shape should be the pure geometric form
+- Size should be reasonable (roughly {min_size}-{max_size}mm in largest dimension)
+- Use proper OpenSCAD practices (polygon points, clean module organization)
+- Include minimal comments
+
+Complexity for {complexity}:
+- Simple: Pure shape, 5-15 lines of code
+- Medium: With rounded edges or slight variations, 15-30 lines of code  
+- Detailed: With multiple features like holes, chamfers, or subdivisions, 30-60 lines of code
+
+Examples:
+- For "triangle": Create a simple triangular prism or extruded triangle
+- For "circle": Create a simple disk (cylinder or extruded circle)
+- For "star": Create a simple star polygon, optionally extruded
+- For "extruded_triangle": Use polygon() + linear_extrude()
+- For "rotate_extrusion_circle": Use circle() or polygon() + rotate_extrude()
+
+Keep it clean, geometric, and efficient. No unnecessary complexity.
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+_SHAPE_COMBINATIONS_PROMPT = """Generate OpenSCAD code for a {name} with {complexity} complexity.
+
+Requirements:
+- This combines BASIC SHAPES using boolean operations
+- Use union(), difference(), or intersection() to combine primitive shapes
+- Keep it SIMPLE - the name describes the boolean operation being performed
+- Size should be reasonable (roughly {min_size}-{max_size}mm in largest dimension)
+- Include minimal comments
+
+Complexity for {complexity}:
+- Simple: One boolean operation combining 2-3 basic shapes, 10-20 lines of code
+- Medium: Multiple operations or slightly complex combination, 20-40 lines of code  
+- Detailed: Nested operations or complex combination, 40-80 lines of code
+
+Examples:
+- For "union_cube_sphere": union() with cube and sphere
+- For "difference_sphere_hole": difference() with sphere and cylinder
+- For "intersection_cube_sphere": intersection() with cube and sphere
+- For "hollow_cylinder": difference() with two cylinders
+- For "cube_with_hole": difference() with cube and cylinder
+
+Keep it clean and efficient. The name describes what boolean operation to perform.
+
+Output only the OpenSCAD code, no explanations or markdown formatting."""
+
+
+CATEGORIES = {category.name: category for category in [
+    Category("animals", "animals", "animal", "animal_openscad_dataset.json", _ANIMALS_PROMPT,
+             label="animal", size_mm=(50, 100), legacy_key="animals",
+             hf_dataset="ThomasTheMaker/Synthetic-Animals"),
+    Category("fruits", "fruits", "fruit", "fruit_openscad_dataset.json", _FRUITS_PROMPT,
+             label="fruit", size_mm=(50, 100), legacy_key="fruits",
+             hf_dataset="ThomasTheMaker/Synthetic-Fruits"),
+    Category("buildings", "buildings_architecture", "building", "building_openscad_dataset.json", _BUILDINGS_PROMPT,
+             label="building", size_mm=(50, 100), legacy_key="buildings",
+             hf_dataset="ThomasTheMaker/Synthetic-Buildings"),
+    Category("household_items", "household_item", "household_item", "household_item_openscad_dataset.json", _HOUSEHOLD_ITEMS_PROMPT,
+             label="household item", size_mm=(50, 100), legacy_key="household_items",
+             hf_dataset="ThomasTheMaker/Synthetic-HouseholdItems"),
+    Category("musical_instruments", "musical_instruments", "musical_instrument", "musical_instrument_openscad_dataset.json", _MUSICAL_INSTRUMENTS_PROMPT,
+             label="musical instrument", size_mm=(50, 100), legacy_key="musical_instruments",
+             hf_dataset="ThomasTheMaker/Synthetic-Musical-Instruments"),
+    Category("vehicles", "vehicles", "vehicle", "vehicle_openscad_dataset.json", _VEHICLES_PROMPT,
+             label="vehicle", size_mm=(50, 100), legacy_key="vehicles",
+             hf_dataset="ThomasTheMaker/Synthetic-Vehicles"),
+    Category("food", "food", "food_item", "food_openscad_dataset.json", _FOOD_PROMPT,
+             label="food", size_mm=(50, 100), legacy_key="food_items",
+             hf_dataset="ThomasTheMaker/Synthetic-Food"),
+    Category("historical_artifacts", "historical_artifacts", "historical_artifact", "historical_artifact_openscad_dataset.json", _HISTORICAL_ARTIFACTS_PROMPT,
+             label="historical artifact", size_mm=(50, 100), legacy_key="historical_artifacts",
+             hf_dataset="ThomasTheMaker/Synthetic-Historical-Artifacts"),
+    Category("mythical_creatures", "mythical_creatures", "mythical_creature", "mythical_creature_openscad_dataset.json", _MYTHICAL_CREATURES_PROMPT,
+             label="mythical creature", size_mm=(50, 100), legacy_key="mythical_creatures",
+             hf_dataset="ThomasTheMaker/Synthetic-Mythical-Creatures"),
+    Category("tech_electronics", "tech_electronics", "electronic_device", "electronic_device_openscad_dataset.json", _TECH_ELECTRONICS_PROMPT,
+             label="electronic device", size_mm=(50, 100), legacy_key="electronic_devices",
+             hf_dataset="ThomasTheMaker/Synthetic-Devices"),
+    Category("tools", "tools", "tool", "tool_openscad_dataset.json", _TOOLS_PROMPT,
+             label="tool", size_mm=(50, 100), legacy_key="tools",
+             hf_dataset="ThomasTheMaker/Synthetic-Tools"),
+    Category("pokemon", "pokemon", "pokemon", "pokemon_openscad_dataset.json", _POKEMON_PROMPT,
+             label="Pokemon", size_mm=(50, 100), legacy_key="pokemon",
+             hf_dataset="ThomasTheMaker/Synthetic-Pokemon"),
+    Category("furniture", "furniture", "furniture", "furniture_openscad_dataset.json", _FURNITURE_PROMPT,
+             label="furniture", size_mm=(50, 150), legacy_key=None,
+             hf_dataset="ThomasTheMaker/Synthetic-Furniture"),
+    Category("plants", "plants", "plant", "plant_openscad_dataset.json", _PLANTS_PROMPT,
+             label="plant", size_mm=(50, 150), legacy_key=None,
+             hf_dataset="ThomasTheMaker/Synthetic-Plants"),
+    Category("mechanical_components", "mechanical_components", "mechanical_component", "mechanical_component_openscad_dataset.json", _MECHANICAL_COMPONENTS_PROMPT,
+             label="mechanical component", size_mm=(50, 150), legacy_key=None,
+             hf_dataset="ThomasTheMaker/Synthetic-Mech-Components"),
+    Category("toys", "toys", "toy", "toy_openscad_dataset.json", _TOYS_PROMPT,
+             label="toy", size_mm=(50, 150), legacy_key=None,
+             hf_dataset="ThomasTheMaker/Synthetic-Toys"),
+    Category("sports_equipment", "sports_equipment", "sports_equipment", "sports_equipment_openscad_dataset.json", _SPORTS_EQUIPMENT_PROMPT,
+             label="sports equipment", size_mm=(50, 150), legacy_key=None,
+             hf_dataset="ThomasTheMaker/Synthetic-Sport-Equipment"),
+    Category("office_supplies", "office_supplies", "office_supply", "office_supply_openscad_dataset.json", _OFFICE_SUPPLIES_PROMPT,
+             label="office supply", size_mm=(50, 150), legacy_key=None,
+             hf_dataset="ThomasTheMaker/Synthetic-Office-Supply"),
+    Category("kitchen_appliances", "kitchen_appliances", "kitchen_appliance", "kitchen_appliance_openscad_dataset.json", _KITCHEN_APPLIANCES_PROMPT,
+             label="kitchen appliance", size_mm=(50, 150), legacy_key=None,
+             hf_dataset="ThomasTheMaker/Synthetic-Kitchen-Appliances"),
+    Category("decorative_art", "decorative_art", "decorative_art", "decorative_art_openscad_dataset.json", _DECORATIVE_ART_PROMPT,
+             label="decorative art", size_mm=(50, 150), legacy_key=None,
+             hf_dataset="ThomasTheMaker/Synthetic-Decorative-Art"),
+    Category("natural_objects", "natural_objects", "natural_object", "natural_object_openscad_dataset.json", _NATURAL_OBJECTS_PROMPT,
+             label="natural object", size_mm=(50, 150), legacy_key=None,
+             hf_dataset="ThomasTheMaker/Synthetic-Natural-Object"),
+    Category("basic_shapes", "basic_shapes", "basic_shape", "basic_shape_openscad_dataset.json", _BASIC_SHAPES_PROMPT,
+             label="basic shape", size_mm=(50, 150), legacy_key=None),
+    Category("primitive_shapes", "primitive_shapes", "primitive_shape", "primitive_shape_openscad_dataset.json", _PRIMITIVE_SHAPES_PROMPT,
+             label="primitive shape", size_mm=(50, 150), legacy_key=None),
+    Category("shape_combinations", "shape_combinations", "shape_combination", "shape_combination_openscad_dataset.json", _SHAPE_COMBINATIONS_PROMPT,
+             label="shape combination", size_mm=(50, 150), legacy_key=None),
+]}
+
+
+def get_category(name):
+    """
+    Look up a category by name or by its directory name.
+
+    Args:
+        name (str): e.g. "food", "buildings" or "buildings_architecture"
+
+    Returns:
+        Category: The registered category
+
+    Raises:
+        KeyError: If no category matches
+    """
+    if name in CATEGORIES:
+        return CATEGORIES[name]
+    for category in CATEGORIES.values():
+        if category.directory == name.rstrip("/"):
+            return category
+    raise KeyError(f"Unknown category '{name}'. Available: {', '.join(CATEGORIES)}")
@@ -0,0 +1,160 @@
+"""
+Batched yes/no classification of names for the category filter.py scripts.
+
+Instead of one request per name, N names are sent in a single prompt that
+reuses the category's own criteria text, and the model answers with a
+strict JSON object mapping each name to true/false. Names the response
+leaves out (or answers ambiguously) are re-queued through the category's
+single-name classifier. A name whose single-name check fails too (it
+returns None) gets no verdict, so callers can retry it later instead of
+recording a "no".
+"""
+
+import re
+import json
+
+from inference.kimi import chat_with_kimi
+
+DEFAULT_BATCH_SIZE = 50
+
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+
+
+def build_batch_prompt(names, question, criteria):
+    """
+    Build a prompt asking for a verdict on every name at once.
+
+    Args:
+        names (list): Names to classify
+        question (str): What a name must be, e.g. "the name of an actual fruit"
+        criteria (str): The category's "Do NOT count / DO count" text
+
+    Returns:
+        str: The prompt
+    """
+    return f"""For each name in the list below, decide whether it is {question}.
+{criteria}
+
+Names:
+{json.dumps(names, ensure_ascii=False, indent=0)}
+
+Respond with ONLY a JSON object that maps every name, exactly as written above, to true or false.
+Example: {{"first name": true, "second name": false}}
+No explanations or markdown formatting."""
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        answer = value.strip().lower()
+        if answer in ("yes", "true"):
+            return True
+        if answer in ("no", "false"):
+            return False
+    return None
+
+
+def parse_verdicts(response, names):
+    """
+    Parse a JSON verdict map for the requested names.
+
+    Only names from `names` with an unambiguous true/false (or "yes"/"no")
+    verdict are returned. Keys are matched exactly first, then ignoring case
+    and surrounding whitespace.
+
+    Args:
+        response (str): Raw model response
+        names (list): Names that were asked about
+
+    Returns:
+        dict: name -> bool for every name that got a valid verdict
+    """
+    text = _FENCE_RE.sub("", response.strip())
+    # Tolerate prose around the object by taking the outermost braces
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    folded = {}
+    for key, value in data.items():
+        if isinstance(key, str):
+            folded.setdefault(key.strip().casefold(), value)
+
+    verdicts = {}
+    for name in names:
+        value = data[name] if name in data else folded.get(name.strip().casefold())
+        verdict = _to_bool(value)
+        if verdict is not None:
+            verdicts[name] = verdict
+    return verdicts
+
+
+def classify_batch(names, question, criteria, classify_one):
+    """
+    Classify one batch of names with a single request.
+
+    Args:
+        names (list): Unique names in this batch
+        question (str): What a name must be
+        criteria (str): The category's criteria text
+        classify_one (callable): Single-name classifier used for re-queued names;
+            None from it means the check failed
+
+    Returns:
+        dict: name -> bool for every name in the batch that got a verdict
+    """
+    try:
+        response = chat_with_kimi(build_batch_prompt(names, question, criteria), stream=False)
+        verdicts = parse_verdicts(response, names)
+    except Exception as e:
+        print(f"Error classifying batch of {len(names)} names: {e}")
+        verdicts = {}
+
+    missing = [name for name in names if name not in verdicts]
+    if missing and len(missing) < len(names):
+        print(f"  Re-checking {len(missing)} names missing from the batch response")
+    for name in missing:
+        keep = classify_one(name)
+        if keep is not None:
+            verdicts[name] = keep
+
+    return verdicts
+
+
+def classify_names(names, question, criteria, classify_one, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Classify many names, batch_size names per request.
+
+    Args:
+        names (list): Names to classify (duplicates are asked about once)
+        question (str): What a name must be, e.g. "the name of an actual fruit"
+        criteria (str): The category's criteria text
+        classify_one (callable): Single-name classifier, used for names a batch
+            response leaves out and for every name when batch_size <= 1
+        batch_size (int): Names per request
+
+    Returns:
+        dict: name -> bool for every name that got a verdict
+    """
+    unique_names = list(dict.fromkeys(names))
+    if batch_size is None or batch_size <= 1:
+        verdicts = {}
+        for name in unique_names:
+            keep = classify_one(name)
+            if keep is not None:
+                verdicts[name] = keep
+        return verdicts
+
+    verdicts = {}
+    for start in range(0, len(unique_names), batch_size):
+        batch = unique_names[start:start + batch_size]
+        print(f"Classifying names {start + 1}-{start + len(batch)} of {len(unique_names)}...")
+        verdicts.update(classify_batch(batch, question, criteria, classify_one))
+    return verdicts
@@ -0,0 +1,329 @@
+"""
+Render-cost model: predicted OpenSCAD seconds per item and render mode.
+
+Render times across the corpus span several orders of magnitude, so one
+fixed timeout is either too short for minkowski-heavy models or far too
+long for a cube. CostModel fits, per render cache mode, a ridge
+regression of log(seconds) on log(1 + feature) over the static features
+of pipeline.scad_features, using the run times the render cache has
+recorded for every item of the corpus. From a fit it gives
+
+    predict(features, mode)   expected seconds
+    timeout(features, mode, default)
+                              a per-item timeout: the prediction widened by
+                              TIMEOUT_SIGMAS residual standard deviations,
+                              clamped to [MIN_TIMEOUT, MAX_TIMEOUT]; `default`
+                              when the mode has no fit
+    rank(features, mode)      a sort key for longest-first scheduling; without
+                              a fit every feature weighs the same
+
+The fit is stored as cost_model.json in the render cache directory and
+is refreshed, after renders have filled the cache, with
+
+    python -m pipeline.cost_model [--min-samples 50]
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+import threading
+
+from pipeline.dataset_store import atomic_write_json
+from pipeline.render_cache import get_render_cache
+from pipeline.scad_features import FEATURES, extract_features
+
+MODEL_FILE = "cost_model.json"
+MIN_SAMPLES = 50
+RIDGE = 1.0
+TIMEOUT_SIGMAS = 3.0
+MIN_TIMEOUT = 2.0
+MAX_TIMEOUT = 300.0
+
+
+def _row(features):
+    """Regression inputs: an intercept and log(1 + feature) for each of FEATURES."""
+    return [1.0] + [math.log1p(max(0.0, float(features.get(name, 0)))) for name in FEATURES]
+
+
+def _solve(matrix, vector):
+    """Solve matrix * x = vector by Gaussian elimination with partial pivoting."""
+    n = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(n)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        if abs(rows[col][col]) < 1e-12:
+            continue
+        for r in range(col + 1, n):
+            factor = rows[r][col] / rows[col][col]
+            if factor:
+                for c in range(col, n + 1):
+                    rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        if abs(rows[r][r]) < 1e-12:
+            continue
+        solution[r] = (rows[r][n] - sum(rows[r][c] * solution[c] for c in range(r + 1, n))) / rows[r][r]
+    return solution
+
+
+def fit_weights(rows, targets, ridge=RIDGE):
+    """
+    Ridge least squares (the intercept is not penalized).
+
+    Args:
+        rows (list): Input rows from _row()
+        targets (list): Target per row
+        ridge (float): L2 penalty
+
+    Returns:
+        tuple: (weights, residual standard deviation, R^2)
+    """
+    k = len(rows[0])
+    gram = [[0.0] * k for _ in range(k)]
+    moment = [0.0] * k
+    for row, target in zip(rows, targets):
+        for i in range(k):
+            if row[i]:
+                moment[i] += row[i] * target
+                gram_i = gram[i]
+                for j in range(k):
+                    gram_i[j] += row[i] * row[j]
+    for i in range(1, k):
+        gram[i][i] += ridge
+    weights = _solve(gram, moment)
+
+    mean = sum(targets) / len(targets)
+    residual = total = 0.0
+    for row, target in zip(rows, targets):
+        error = target - sum(w * x for w, x in zip(weights, row))
+        residual += error * error
+        total += (target - mean) ** 2
+    sigma = math.sqrt(residual / max(1, len(targets) - k))
+    r2 = 1 - residual / total if total else 0.0
+    return weights, sigma, r2
+
+
+class CostModel:
+    """
+    Per-mode log-linear render-time model.
+
+    Args:
+        modes (dict): Mode -> {"weights", "sigma", "samples", "r2"}
+    """
+
+    def __init__(self, modes=None):
+        self.modes = modes or {}
+
+    @classmethod
+    def fit(cls, samples, min_samples=MIN_SAMPLES, ridge=RIDGE):
+        """
+        Fit a model from recorded run times.
+
+        Args:
+            samples (iterable): (features, mode, seconds) tuples
+            min_samples (int): Modes with fewer samples are left unfitted
+            ridge (float): L2 penalty
+
+        Returns:
+            CostModel: The fitted model
+        """
+        grouped = {}
+        for features, mode, seconds in samples:
+            if seconds > 0:
+                rows, targets = grouped.setdefault(mode, ([], []))
+                rows.append(_row(features))
+                targets.append(math.log(seconds))
+
+        modes = {}
+        for mode, (rows, targets) in sorted(grouped.items()):
+            if len(rows) < min_samples:
+                continue
+            weights, sigma, r2 = fit_weights(rows, targets, ridge)
+            modes[mode] = {"weights": weights, "sigma": sigma, "samples": len(rows), "r2": r2}
+        return cls(modes)
+
+    def has_fit(self, mode):
+        """Whether predictions are available for a mode."""
+        return mode in self.modes
+
+    def _log_seconds(self, features, mode):
+        weights = self.modes[mode]["weights"]
+        return sum(w * x for w, x in zip(weights, _row(features)))
+
+    def predict(self, features, mode):
+        """
+        Predict the run time of an item.
+
+        Args:
+            features (dict): From scad_features.extract_features()
+            mode (str): Render cache mode, e.g. "csg" or "png-800"
+
+        Returns:
+            float: Expected seconds, or None if the mode has no fit
+        """
+        if mode not in self.modes:
+            return None
+        return math.exp(self._log_seconds(features, mode))
+
+    def timeout(self, features, mode, default, minimum=MIN_TIMEOUT, maximum=MAX_TIMEOUT):
+        """
+        Choose a timeout for an item.
+
+        Args:
+            features (dict): From scad_features.extract_features()
+            mode (str): Render cache mode
+            default (float): Timeout when the mode has no fit
+            minimum (float): Lower bound of a predicted timeout
+            maximum (float): Upper bound of a predicted timeout
+
+        Returns:
+            float: Seconds
+        """
+        if mode not in self.modes:
+            return default
+        upper = self._log_seconds(features, mode) + TIMEOUT_SIGMAS * self.modes[mode]["sigma"]
+        return max(minimum, math.exp(min(upper, math.log(maximum))))
+
+    def rank(self, features, mode=None):
+        """
+        Sort key for longest-first scheduling (higher runs first).
+
+        Args:
+            features (dict): From scad_features.extract_features()
+            mode (str): Render cache mode to rank by, if it has a fit
+
+        Returns:
+            float: Predicted log seconds, or the sum of log(1 + feature) without a fit
+        """
+        if mode in self.modes:
+            return self._log_seconds(features, mode)
+        return sum(_row(features)[1:])
+
+    def to_dict(self):
+        return {"features": list(FEATURES), "modes": self.modes}
+
+    def save(self, path):
+        """Write the model as JSON."""
+        atomic_write_json(path, self.to_dict(), backups=1)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a model written by save().
+
+        A missing file, or one fitted on a different feature set, gives an
+        unfitted model.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("features") != list(FEATURES):
+            return cls()
+        return cls(data.get("modes", {}))
+
+
+def model_path():
+    """Location of the fitted model, next to the render cache database."""
+    return os.path.join(get_render_cache().path, MODEL_FILE)
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_cost_model():
+    """
+    Get the process-wide cost model, loaded from model_path() on first use.
+
+    Returns:
+        CostModel: The model (unfitted if nothing has been fitted yet)
+    """
+    global _model
+
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                try:
+                    _model = CostModel.load(model_path())
+                except (OSError, ValueError) as e:
+                    print(f"Warning: could not load the cost model: {e}")
+                    _model = CostModel()
+    return _model
+
+
+def collect_samples(codes, cache=None, modes=None):
+    """
+    Pair the static features of each code with its recorded run times.
+
+    Args:
+        codes (iterable): OpenSCAD code strings
+        cache (RenderCache): Cache to read (default: the shared render cache)
+        modes (list): Modes to read (default: every mode in the cache)
+
+    Yields:
+        tuple: (features, mode, seconds) for every successful cached run
+    """
+    cache = cache or get_render_cache()
+    modes = modes if modes is not None else cache.modes()
+    for code in codes:
+        features = None
+        for mode in modes:
+            result = cache.get(code, mode)
+            if result is None or not result["success"] or result["elapsed"] <= 0:
+                continue
+            if features is None:
+                features = extract_features(code)
+                if features is None:
+                    break
+            yield features, mode, result["elapsed"]
+
+
+def _corpus_codes():
+    from pipeline.categories import CATEGORIES
+    from pipeline.dataset_reader import iter_dataset
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for category in CATEGORIES.values():
+        path = os.path.join(root, category.dataset_file)
+        if not os.path.exists(path):
+            continue
+        for entry in iter_dataset(path, legacy_key=category.legacy_key):
+            code = entry.get("openscad_code")
+            if code:
+                yield code
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the render-cost model on the render cache")
+    parser.add_argument("--min-samples", type=int, default=MIN_SAMPLES,
+                        help="Minimum recorded runs to fit a render mode")
+    parser.add_argument("--ridge", type=float, default=RIDGE, help="L2 penalty")
+    args = parser.parse_args()
+
+    samples = list(collect_samples(_corpus_codes()))
+    if not samples:
+        print("The render cache has no recorded runs for the corpus; render or validate first.")
+        return 1
+    model = CostModel.fit(samples, min_samples=args.min_samples, ridge=args.ridge)
+    counts = {}
+    for _, mode, _ in samples:
+        counts[mode] = counts.get(mode, 0) + 1
+    for mode, count in sorted(counts.items()):
+        fit = model.modes.get(mode)
+        if fit:
+            print(f"  {mode}: {count} runs, R^2 {fit['r2']:.2f}, "
+                  f"spread x{math.exp(fit['sigma']):.1f} per standard deviation")
+        else:
+            print(f"  {mode}: {count} runs, too few to fit")
+    path = model_path()
+    model.save(path)
+    print(f"Saved {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Streaming reader for `*_openscad_dataset.json` files.
+
+json.load materializes a whole dataset (and, transiently, several times
+its size in Python objects) before the first entry can be used. The
+reader here parses the top-level array incrementally and yields one entry
+at a time, so memory stays bounded by the largest single entry plus the
+read buffer, whatever the size of the file.
+
+Both layouts written by the generate scripts are accepted: a top-level
+list of entries, and the legacy `{"<legacy_key>": [...]}` dict.
+"""
+
+import re
+import json
+
+from pipeline.dataset_store import DatasetCorruptError
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+# Characters that can follow a complete value
+_DELIMITER = re.compile(r"[\s,:\]}]")
+
+
+class _Buffer:
+    """Sliding text window over a file, refilled on demand."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        # File offset (in characters) of text[0], for error messages
+        self.offset = 0
+        self.eof = False
+
+    def fill(self, minimum=None):
+        """
+        Read more text, discarding what has already been consumed.
+
+        Returns:
+            bool: False at end of file
+        """
+        if self.eof:
+            return False
+        if self.pos:
+            self.offset += self.pos
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        # Grow the read size with the pending text so a long value is not
+        # re-parsed once per chunk
+        chunk = self.f.read(max(self.chunk_size, minimum or 0, len(self.text)))
+        if not chunk:
+            self.eof = True
+            return False
+        self.text += chunk
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character ("" at end of file)."""
+        while True:
+            text = self.text
+            pos = self.pos
+            while pos < len(text) and text[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(text):
+                return text[pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars, path):
+        """Consume one of `chars` after optional whitespace and return it."""
+        c = self.peek()
+        if not c or c not in chars:
+            found = repr(c) if c else "end of file"
+            raise DatasetCorruptError(
+                f"{path}: expected one of {chars!r}, found {found} at char {self.offset + self.pos}")
+        self.pos += 1
+        return c
+
+    def value(self, decoder, path):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError as e:
+                # Most likely the value continues past the buffer
+                if self.fill():
+                    continue
+                raise DatasetCorruptError(f"{path}: {e.msg} at char {self.offset + e.pos}") from e
+            # A number cut at the buffer edge (e.g. "1." of "1.5") decodes
+            # early; only trust it once a delimiter follows
+            if not _DELIMITER.match(self.text, end) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_array(buf, decoder, path):
+    buf.expect("[", path)
+    if buf.peek() == "]":
+        buf.pos += 1
+        return
+    while True:
+        yield buf.value(decoder, path)
+        if buf.expect(",]", path) == "]":
+            return
+
+
+def iter_dataset(path, legacy_key=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Lazily yield the entries of a dataset file.
+
+    Args:
+        path (str): Dataset JSON file
+        legacy_key (str): Key holding the entry list in the old dict layout
+        chunk_size (int): Characters read per refill
+
+    Yields:
+        The dataset entries, in file order
+
+    Raises:
+        DatasetCorruptError: If the file is not valid JSON in a known layout.
+            Entries before the error have already been yielded.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buf = _Buffer(f, chunk_size)
+        first = buf.peek()
+        if first == "[":
+            yield from _iter_array(buf, decoder, path)
+        elif first == "{":
+            buf.pos += 1
+            found = False
+            if buf.peek() == "}":
+                buf.pos += 1
+            else:
+                while True:
+                    key = buf.value(decoder, path)
+                    if not isinstance(key, str):
+                        raise DatasetCorruptError(f"{path}: expected a key, found {key!r}")
+                    buf.expect(":", path)
+                    if key == legacy_key and not found and buf.peek() == "[":
+                        yield from _iter_array(buf, decoder, path)
+                        found = True
+                    else:
+                        # Other keys are decoded in full and dropped
+                        buf.value(decoder, path)
+                    if buf.expect(",}", path) == "}":
+                        break
+            if not found:
+                raise DatasetCorruptError(f"{path}: unexpected top-level dict without a '{legacy_key}' list")
+        else:
+            found = repr(first) if first else "end of file"
+            raise DatasetCorruptError(f"{path}: expected a list or dict, found {found}")
+
+        if buf.peek():
+            raise DatasetCorruptError(f"{path}: extra data after the dataset")
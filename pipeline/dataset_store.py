@@ -0,0 +1,334 @@
+"""
+Append-only dataset store for the generate-cad.py scripts.
+
+Each new entry is appended as one line to a JSONL record log next to the
+dataset file, so persisting an item costs O(record size) instead of
+re-serializing the whole dataset. The log is periodically compacted into
+the existing `*_openscad_dataset.json` layout (a JSON list, indent=2).
+
+Compaction is crash-safe: the JSON is written to a temp file, fsynced and
+atomically renamed over the dataset, keeping N rolling backups. The log of
+the previous compaction cycle is kept alongside the newest backup, so a
+corrupt dataset file can be rebuilt from backup + logs instead of loading
+as an empty list.
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+
+DEFAULT_COMPACT_EVERY = 100
+DEFAULT_BACKUPS = 3
+
+
+class DatasetCorruptError(Exception):
+    """Raised when a dataset file exists but cannot be parsed."""
+
+
+def log_path(dataset_file):
+    """
+    Get the record log path for a dataset file.
+
+    Args:
+        dataset_file (str): Path to the compacted JSON dataset
+
+    Returns:
+        str: Path to the JSONL record log
+    """
+    return f"{os.path.splitext(dataset_file)[0]}.log.jsonl"
+
+
+def recover_log(path):
+    """
+    Truncate a torn last line left by a crash mid-append.
+
+    Args:
+        path (str): Path to the JSONL record log
+
+    Returns:
+        int: Number of bytes removed
+    """
+    if not os.path.exists(path):
+        return 0
+
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return 0
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+
+        # Walk back to the last complete line
+        pos = size
+        chunk = 4096
+        while pos > 0:
+            start = max(0, pos - chunk)
+            f.seek(start)
+            data = f.read(pos - start)
+            idx = data.rfind(b"\n")
+            if idx != -1:
+                keep = start + idx + 1
+                break
+            pos = start
+        else:
+            keep = 0
+
+        f.truncate(keep)
+        return size - keep
+
+
+def iter_log(path):
+    """
+    Stream records from a JSONL record log.
+
+    Lines that are not valid JSON (e.g. a torn last line) are skipped.
+
+    Args:
+        path (str): Path to the JSONL record log
+
+    Yields:
+        dict: One dataset entry per line
+    """
+    if not os.path.exists(path):
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def _record_key(entry):
+    return json.dumps(entry, sort_keys=True, ensure_ascii=False)
+
+
+def backup_path(dataset_file, index):
+    """Path of the index-th most recent backup (1 = newest)."""
+    return f"{dataset_file}.bak.{index}"
+
+
+def _fsync_dir(path):
+    """fsync the directory holding path so a rename is durable."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _rotate_backups(path, backups):
+    """Shift path.bak.1..N down by one and hard-link the current file as .bak.1."""
+    if backups <= 0 or not os.path.exists(path):
+        return
+    oldest = backup_path(path, backups)
+    if os.path.exists(oldest):
+        os.unlink(oldest)
+    for index in range(backups - 1, 0, -1):
+        src = backup_path(path, index)
+        if os.path.exists(src):
+            os.replace(src, backup_path(path, index + 1))
+    # A hard link keeps the old contents without copying them; fall back to a copy
+    try:
+        os.link(path, backup_path(path, 1))
+    except OSError:
+        shutil.copy2(path, backup_path(path, 1))
+
+
+def atomic_write_json(path, data, backups=DEFAULT_BACKUPS, indent=2):
+    """
+    Write JSON to path atomically, keeping rolling backups of the old file.
+
+    The data goes to a temp file in the same directory, is fsynced, and is
+    renamed over path, so readers only ever see the old or the new file.
+
+    Args:
+        path (str): Destination file
+        data: JSON-serializable data
+        backups (int): Number of previous versions to keep as path.bak.1..N
+        indent (int): JSON indentation
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_file = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        _rotate_backups(path, backups)
+        os.replace(temp_file, path)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.unlink(temp_file)
+        raise
+    _fsync_dir(path)
+
+
+class DatasetStore:
+    """
+    Compacted JSON dataset plus an append-only JSONL record log.
+
+    Args:
+        dataset_file (str): Path to the dataset JSON file
+        legacy_key (str): Key holding the entry list in the old dict layout
+        compact_every (int): Compact after this many appends (0 to only compact explicitly)
+        backups (int): Number of rolling backups kept by compact()
+    """
+
+    def __init__(self, dataset_file, legacy_key=None, compact_every=DEFAULT_COMPACT_EVERY,
+                 backups=DEFAULT_BACKUPS):
+        self.dataset_file = dataset_file
+        self.log_file = log_path(dataset_file)
+        self.previous_log_file = f"{self.log_file}.1"
+        self.legacy_key = legacy_key
+        self.compact_every = compact_every
+        self.backups = backups
+        self._dataset = None
+        self._appends_since_compact = 0
+
+    def _read_entries(self, path):
+        """
+        Parse one compacted dataset file.
+
+        Raises:
+            DatasetCorruptError: If the file is not valid JSON in a known layout
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise DatasetCorruptError(f"{path}: {e}") from e
+        # Handle both old format and new format
+        if isinstance(data, dict) and self.legacy_key in data:
+            return data[self.legacy_key]
+        elif isinstance(data, list):
+            return data
+        raise DatasetCorruptError(f"{path}: unexpected top-level {type(data).__name__}")
+
+    def _quarantine(self, path):
+        """Move a corrupt file aside so it is never overwritten or lost."""
+        corrupt_file = f"{path}.corrupt-{time.strftime('%Y%m%d_%H%M%S')}"
+        os.replace(path, corrupt_file)
+        print(f"Warning: {path} is corrupt, moved to {corrupt_file}")
+
+    def _load_compacted(self):
+        """
+        Load the newest valid compacted dataset.
+
+        Returns:
+            tuple: (entries, logs) where logs lists the record logs to replay on top
+        """
+        if not os.path.exists(self.dataset_file):
+            backups = [backup_path(self.dataset_file, i) for i in range(1, self.backups + 1)]
+            if not any(os.path.exists(b) for b in backups):
+                return [], [self.log_file]
+
+        try:
+            if os.path.exists(self.dataset_file):
+                return self._read_entries(self.dataset_file), [self.log_file]
+        except DatasetCorruptError as e:
+            print(f"Warning: could not load {e}")
+            self._quarantine(self.dataset_file)
+
+        # bak.1 is the state before the last compaction, whose records are in the previous log
+        for index in range(1, self.backups + 1):
+            candidate = backup_path(self.dataset_file, index)
+            if not os.path.exists(candidate):
+                continue
+            try:
+                entries = self._read_entries(candidate)
+            except DatasetCorruptError as e:
+                print(f"Warning: could not load backup {e}")
+                continue
+            print(f"Recovered {len(entries)} entries from backup {candidate}")
+            if index > 1:
+                print(f"Warning: entries compacted after {candidate} was written may be missing")
+            return entries, [self.previous_log_file, self.log_file]
+
+        print(f"Warning: no valid dataset or backup for {self.dataset_file}, rebuilding from record logs only")
+        return [], [self.previous_log_file, self.log_file]
+
+    def load(self):
+        """
+        Load the dataset: the compacted JSON plus records appended since.
+
+        If the dataset file is corrupt it is moved aside and the newest valid
+        backup is used instead, replaying the record logs on top. Records
+        that are already present are not duplicated.
+
+        Returns:
+            list: The dataset list
+        """
+        dataset, logs = self._load_compacted()
+
+        recover_log(self.log_file)
+        known = {_record_key(entry) for entry in dataset}
+        replayed = 0
+        for path in logs:
+            for entry in iter_log(path):
+                key = _record_key(entry)
+                if key not in known:
+                    dataset.append(entry)
+                    known.add(key)
+                    replayed += 1
+        self._appends_since_compact = replayed
+
+        self._dataset = dataset
+        return dataset
+
+    def append(self, entry):
+        """
+        Durably append one entry to the record log.
+
+        The line is written in a single call and fsynced, so a crash can at
+        most leave a torn last line, which load() discards.
+
+        Args:
+            entry (dict): The dataset entry
+        """
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.log_file, 'ab') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._appends_since_compact += 1
+        if self.compact_every and self._appends_since_compact >= self.compact_every and self._dataset is not None:
+            self.compact(self._dataset)
+
+    def compact(self, dataset):
+        """
+        Atomically write the full dataset in the JSON layout and start a new record log.
+
+        The current log is kept as the previous log, pairing with the newest
+        backup for recovery.
+
+        Args:
+            dataset (list): The complete dataset list
+        """
+        atomic_write_json(self.dataset_file, dataset, backups=self.backups)
+
+        if os.path.exists(self.log_file):
+            os.replace(self.log_file, self.previous_log_file)
+        elif os.path.exists(self.previous_log_file):
+            os.unlink(self.previous_log_file)
+        _fsync_dir(self.dataset_file)
+        self._dataset = dataset
+        self._appends_since_compact = 0
+
+    def pending_records(self):
+        """Return the number of appended records not yet compacted."""
+        return self._appends_since_compact
@@ -0,0 +1,268 @@
+"""
+Persistent virtual X displays for headless OpenSCAD renders.
+
+OpenSCAD needs an X display to export PNGs. Wrapping every call in
+`xvfb-run -a` starts and tears down an X server per item; instead a small
+pool of long-lived Xvfb servers is started once per process and handed to
+renders through DISPLAY. A display that dies is restarted transparently
+and the render retried once.
+
+The backend is chosen with OPENSCAD_DISPLAY_BACKEND:
+    xvfb      persistent Xvfb pool (default when Xvfb is installed)
+    xvfb-run  the old per-call `xvfb-run -a` wrapper
+    none      use the caller's DISPLAY as is
+"""
+
+import os
+import time
+import queue
+import select
+import shutil
+import atexit
+import threading
+import subprocess
+import multiprocessing.util
+from contextlib import contextmanager
+
+XVFB_SCREEN = os.environ.get("OPENSCAD_XVFB_SCREEN", "1024x768x24")
+START_TIMEOUT = 10
+
+# stderr fragments meaning the X connection, not the model, was the problem
+DISPLAY_ERRORS = ("cannot open display", "could not connect to display", "unable to open display",
+                   "can't open display", "xcb_connection_has_error")
+
+
+class DisplayError(RuntimeError):
+    """Raised when a virtual display cannot be started."""
+
+
+class XvfbDisplay:
+    """
+    One Xvfb server, started lazily and restarted if it dies.
+
+    The display number is picked by Xvfb itself (-displayfd), so several
+    processes can start displays concurrently without colliding.
+
+    Args:
+        screen (str): Screen geometry and depth, e.g. "1024x768x24"
+    """
+
+    def __init__(self, screen=XVFB_SCREEN):
+        self.screen = screen
+        self.number = None
+        self.restarts = 0
+        self._proc = None
+
+    @property
+    def name(self):
+        return f":{self.number}"
+
+    def start(self):
+        """Start the server and wait until it accepts connections."""
+        read_fd, write_fd = os.pipe()
+        try:
+            self._proc = subprocess.Popen(
+                ["Xvfb", "-displayfd", str(write_fd), "-screen", "0", self.screen,
+                 "-nolisten", "tcp", "-noreset"],
+                pass_fds=(write_fd,),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except BaseException:
+            os.close(read_fd)
+            os.close(write_fd)
+            raise
+        os.close(write_fd)
+
+        # Xvfb writes the display number once it is ready for clients
+        number = b""
+        deadline = time.monotonic() + START_TIMEOUT
+        try:
+            while not number.endswith(b"\n"):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._proc.kill()
+                    self._proc.wait()
+                    self._proc = None
+                    raise DisplayError(f"Xvfb did not report a display within {START_TIMEOUT}s")
+                # Xvfb exiting closes the pipe, which also wakes the select
+                ready, _, _ = select.select([read_fd], [], [], remaining)
+                if not ready:
+                    continue
+                chunk = os.read(read_fd, 16)
+                if not chunk:
+                    self.stop()
+                    raise DisplayError("Xvfb exited before reporting its display number")
+                number += chunk
+        finally:
+            os.close(read_fd)
+        self.number = int(number.strip())
+
+    def alive(self):
+        """Return True if the server process is running."""
+        return self._proc is not None and self._proc.poll() is None
+
+    def ensure(self):
+        """Start the server, or restart it if it has died."""
+        if self.alive():
+            return
+        if self.number is not None:
+            self.restarts += 1
+        self.start()
+
+    def stop(self):
+        """Terminate the server."""
+        if self._proc is None:
+            return
+        if self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+        self._proc = None
+
+
+class DisplayPool:
+    """
+    Fixed set of persistent displays shared by render threads.
+
+    Each render borrows a display for its duration, so one display is never
+    shared by two concurrent OpenSCAD processes.
+
+    Args:
+        size (int): Number of displays (default: one per CPU core)
+    """
+
+    def __init__(self, size=None):
+        self.size = max(1, size or os.cpu_count() or 1)
+        self._displays = [XvfbDisplay() for _ in range(self.size)]
+        self._free = queue.Queue()
+        for display in self._displays:
+            self._free.put(display)
+
+    @contextmanager
+    def acquire(self):
+        """Borrow a running display."""
+        display = self._free.get()
+        try:
+            display.ensure()
+            yield display
+        finally:
+            self._free.put(display)
+
+    def close(self):
+        for display in self._displays:
+            display.stop()
+
+    def stats(self):
+        """
+        Get pool counters.
+
+        Returns:
+            dict: Pool size, running displays and restarts after a crash
+        """
+        return {
+            "size": self.size,
+            "running": sum(1 for d in self._displays if d.alive()),
+            "restarts": sum(d.restarts for d in self._displays),
+        }
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def backend():
+    """
+    Get the configured display backend.
+
+    Returns:
+        str: "xvfb", "xvfb-run" or "none"
+    """
+    configured = os.environ.get("OPENSCAD_DISPLAY_BACKEND")
+    if configured:
+        return configured
+    if shutil.which("Xvfb"):
+        return "xvfb"
+    if shutil.which("xvfb-run"):
+        return "xvfb-run"
+    return "none"
+
+
+def get_display_pool():
+    """
+    Get this process's display pool, creating it on first use.
+
+    Pool size comes from OPENSCAD_DISPLAYS (default: one per CPU core).
+    Forked children get their own pool rather than sharing the parent's
+    servers. The pool is stopped when the process exits, including
+    multiprocessing workers, which skip atexit handlers.
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            size = int(os.environ.get("OPENSCAD_DISPLAYS", 0)) or None
+            _pool = DisplayPool(size)
+            _pool_pid = pid
+            # Runs at interpreter exit and when a multiprocessing worker exits
+            multiprocessing.util.Finalize(_pool, _pool.close, exitpriority=10)
+        return _pool
+
+
+def close_display_pool():
+    """Stop this process's displays."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.close()
+        _pool = None
+
+
+atexit.register(close_display_pool)
+
+
+def _display_failed(result):
+    stderr = (result.stderr or "").lower() if isinstance(result.stderr, str) else ""
+    return result.returncode != 0 and any(fragment in stderr for fragment in DISPLAY_ERRORS)
+
+
+def run_with_display(cmd, timeout=None, **kwargs):
+    """
+    Run a command that needs an X display, e.g. an OpenSCAD PNG export.
+
+    With the xvfb backend the command runs against a pooled persistent
+    display; if that display died mid-run it is restarted and the command
+    retried once.
+
+    Args:
+        cmd (list): Command and arguments
+        timeout (float): Seconds before the command is killed
+        **kwargs: Passed to subprocess.run (capture_output, text, ...)
+
+    Returns:
+        subprocess.CompletedProcess: The finished command
+    """
+    mode = backend()
+    if mode == "xvfb-run":
+        return subprocess.run(["xvfb-run", "-a"] + list(cmd), timeout=timeout, **kwargs)
+    if mode != "xvfb":
+        return subprocess.run(cmd, timeout=timeout, **kwargs)
+
+    env = dict(kwargs.pop("env", None) or os.environ)
+    pool = get_display_pool()
+    for attempt in range(2):
+        with pool.acquire() as display:
+            env["DISPLAY"] = display.name
+            result = subprocess.run(cmd, timeout=timeout, env=env, **kwargs)
+            if attempt == 0 and (not display.alive() or _display_failed(result)):
+                display.stop()
+                continue
+        return result
+    return result
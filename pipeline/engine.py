@@ -0,0 +1,562 @@
+"""
+Category-driven OpenSCAD generation engine.
+
+One implementation of generate -> validate -> record, parameterized by the
+category registry in pipeline.categories, replaces the per-category copies
+of generate-cad.py (which are now thin wrappers around main()). Several
+categories can run in one process: the Scheduler interleaves their items
+through a single StagePipeline, so the shared inference client and the
+render workers are used across categories instead of one script per
+terminal.
+
+Usage:
+    python -m pipeline.engine food animals --list --workers 8
+    python -m pipeline.engine all --list --target 500 --weight pokemon=2
+    python -m pipeline.engine food --item "apple pie"
+"""
+
+import os
+import time
+from datetime import datetime
+
+from inference.kimi import chat_with_kimi
+from pipeline.categories import CATEGORIES, get_category
+from pipeline.dataset_store import DatasetStore
+from pipeline.generation import StagePipeline
+from pipeline.render_budget import add_budget_arguments, budget_from_args, estimate
+from pipeline.scheduler import Scheduler
+from pipeline import validation
+
+
+def generate_openscad(category, item_name, style="realistic", complexity="medium"):
+    """
+    Generate OpenSCAD code for one item using the Kimi model.
+
+    Args:
+        category (Category): Category the item belongs to
+        item_name (str): Name of the item to generate
+        style (str): Style of the model ("realistic", "stylized", "minimal")
+        complexity (str): Complexity level ("simple", "medium", "detailed")
+
+    Returns:
+        str: Generated OpenSCAD code, or None on failure
+    """
+    prompt = category.prompt(item_name, style, complexity)
+
+    try:
+        response = chat_with_kimi(prompt, stream=False)
+        return response.strip()
+    except Exception as e:
+        print(f"Error generating OpenSCAD code for '{item_name}': {e}")
+        return None
+
+
+def test_openscad_rendering(code, tier=validation.CSG, lowres=False, budget=None, escalate=False):
+    """
+    Test if OpenSCAD code can be rendered without errors.
+
+    Runs the syntax check and then `tier` (see pipeline.validation), or
+    every tier up to it with escalate;
+    results are shared through the render cache, so identical code is only
+    checked once per tier. Timeouts are predicted per item once the cost
+    model has been fitted (30s per tier until then). Code over `budget`
+    fails without running OpenSCAD, or is validated at most at the csg tier
+    if the budget downtiers it.
+
+    Args:
+        code (str): The OpenSCAD code to test
+        tier (str): Validation tier, e.g. "syntax", "ast", "csg", "stl" or "png"
+        lowres (bool): Evaluate geometry at low resolution ($fn clamped)
+        budget (Budget): Static render budget (pipeline.render_budget), or None
+        escalate (bool): Run the cheaper tiers below `tier` first
+
+    Returns:
+        bool: True if code renders successfully, False otherwise
+    """
+    result = validation.validate(code, tier, escalate=escalate, lowres=lowres, budget=budget)
+    # If OpenSCAD is not installed or too slow, assume it's valid
+    return result["ok"] or result["reason"] in (validation.TIMEOUT, validation.UNAVAILABLE)
+
+
+def save_openscad_code(code, item_name, output_dir="generated_models"):
+    """
+    Save OpenSCAD code to a file.
+
+    Args:
+        code (str): The OpenSCAD code to save
+        item_name (str): Name of the item (used for filename)
+        output_dir (str): Directory to save the file
+
+    Returns:
+        str: Path to the saved file
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Clean item name for filename
+    clean_name = "".join(c for c in item_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    clean_name = clean_name.replace(' ', '_').lower()
+
+    # Add timestamp to avoid conflicts
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filepath = os.path.join(output_dir, f"{clean_name}_{timestamp}.scad")
+
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(code)
+
+    return filepath
+
+
+def make_entry(category, item_name, openscad_code, render_success, error_message=None):
+    """
+    Build a dataset entry in the category's layout.
+
+    Entries with code record its static render estimate (primitives,
+    polygons, loop iterations) under "estimate", which render/render.py
+    uses to send expensive items to their own lane.
+
+    Args:
+        category (Category): Category the item belongs to
+        item_name (str): Name of the item
+        openscad_code (str): Generated OpenSCAD code
+        render_success (bool): Whether the code renders successfully
+        error_message (str): Error message if generation failed
+
+    Returns:
+        dict: The dataset entry
+    """
+    entry = {
+        category.name_key: item_name,
+        "openscad_code": openscad_code,
+        "renders": render_success
+    }
+
+    if openscad_code:
+        estimated = estimate(openscad_code)
+        if estimated is not None:
+            entry["estimate"] = estimated
+
+    # Only add error message if there's an error
+    if error_message:
+        entry["error"] = error_message
+
+    return entry
+
+
+def format_time_duration(seconds):
+    """
+    Format seconds into a human-readable duration string.
+
+    Args:
+        seconds (float): Duration in seconds
+
+    Returns:
+        str: Formatted duration string
+    """
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    elif seconds < 3600:
+        minutes = seconds / 60
+        return f"{minutes:.1f}m"
+    else:
+        hours = seconds / 3600
+        return f"{hours:.1f}h"
+
+
+def calculate_eta(start_time, current_index, total_items):
+    """
+    Calculate estimated time of arrival based on current progress.
+
+    Args:
+        start_time (float): Start time timestamp
+        current_index (int): Number of items completed
+        total_items (int): Total number of items to process
+
+    Returns:
+        tuple: (elapsed_time, eta_time, remaining_time)
+    """
+    if current_index == 0:
+        return 0, None, None
+
+    elapsed_time = time.time() - start_time
+    avg_time_per_item = elapsed_time / current_index
+    remaining_items = total_items - current_index
+    remaining_time = remaining_items * avg_time_per_item
+    eta_time = time.time() + remaining_time
+
+    return elapsed_time, eta_time, remaining_time
+
+
+class CategoryRun:
+    """
+    Dataset state and counters for one category within a run.
+
+    Loads the category's dataset and works out which listed items still
+    need generating; results are appended to the dataset's record log as
+    they are committed.
+
+    Args:
+        category (Category): The category
+        names (list): Item names to generate, in order
+        max_items (int): Only consider the first max_items names (None for all)
+        dataset_file (str): Dataset path (default: the category's dataset file)
+        weight (float): Share of the worker pool relative to other categories
+        quota (int): Maximum number of items to generate in this run (None for no limit)
+        target (int): Stop once the dataset holds this many renderable entries (None for no target)
+    """
+
+    def __init__(self, category, names, max_items=None, dataset_file=None, weight=1.0, quota=None, target=None):
+        self.category = category
+        self.weight = weight
+        self.quota = quota
+        self.target = target
+        self.dataset_file = dataset_file or category.dataset_path()
+        self.store = DatasetStore(self.dataset_file, legacy_key=category.legacy_key)
+        self.dataset = self.store.load()
+
+        if max_items is not None:
+            names = names[:max_items]
+        processed = {entry.get(category.name_key) for entry in self.dataset}
+        self.already_processed = len(processed)
+        self.todo = [name for name in dict.fromkeys(names) if name not in processed]
+
+        self.successful = sum(1 for entry in self.dataset if entry.get("renders", False))
+        self.failed = len(self.dataset) - self.successful
+
+    def record(self, item_name, code, render_success):
+        """
+        Add one result to the dataset and its record log.
+
+        Args:
+            item_name (str): Name of the item
+            code (str): Generated code (None or empty if generation failed)
+            render_success (bool): Whether the code renders
+        """
+        if code:
+            if render_success:
+                print(f"  ✓ Code generated and renders successfully")
+                self.successful += 1
+            else:
+                print(f"  ⚠ Code generated but failed to render")
+                self.failed += 1
+            entry = make_entry(self.category, item_name, code, render_success)
+        else:
+            print(f"  ✗ Failed to generate code")
+            self.failed += 1
+            entry = make_entry(self.category, item_name, "", False, "Failed to generate OpenSCAD code")
+
+        self.dataset.append(entry)
+        self.store.append(entry)
+        print(f"  Dataset updated: {self.successful} successful, {self.failed} failed")
+
+    def finish(self):
+        """Fold the record log back into the JSON dataset."""
+        self.store.compact(self.dataset)
+
+
+def process_categories(runs, style="realistic", complexity="medium", workers=1, validators=None,
+                       tier=validation.CSG, lowres=False, budget=None, escalate=False):
+    """
+    Generate and validate the pending items of one or more categories.
+
+    All categories share one StagePipeline (generation workers, validators
+    and the inference client). The Scheduler decides which category's item
+    is generated next from the runs' weights, quotas and targets; each
+    result is committed to its category's dataset as it completes.
+
+    Args:
+        runs (list): CategoryRun objects
+        style (str): Style for all models
+        complexity (str): Complexity for all models
+        workers (int): Number of concurrent generation requests
+        validators (int): Number of concurrent render tests (None for one per CPU core)
+        tier (str): Validation tier for generated code
+        lowres (bool): Validate geometry at low resolution
+        budget (Budget): Static render budget for generated code (None for no limits)
+        escalate (bool): Run the cheaper validation tiers first
+
+    Returns:
+        list: The runs, with updated datasets and counters
+    """
+    scheduler = Scheduler(runs)
+    multi = len(runs) > 1
+
+    print(f"Style: {style}, Complexity: {complexity}, Validation: {tier}{' (low-res)' if lowres else ''}")
+    for run in runs:
+        limits = f"weight {run.weight:g}"
+        if run.quota is not None:
+            limits += f", quota {run.quota}"
+        if run.target is not None:
+            limits += f", target {run.target} renderable ({run.successful} so far)"
+        print(f"{run.category.name}: {run.already_processed} already processed, "
+              f"{len(run.todo)} to generate ({limits}) -> {run.dataset_file}")
+    print("-" * 60)
+
+    if scheduler.remaining() == 0:
+        print("All items have already been processed!")
+        return runs
+
+    start_time = time.time()
+
+    def generate(item):
+        # LLM stage: runs on the generation workers
+        run, item_name = item
+        return generate_openscad(run.category, item_name, style, complexity)
+
+    def validate(code):
+        return test_openscad_rendering(code, tier, lowres, budget, escalate)
+
+    pipeline = StagePipeline(generate, validate, llm_workers=workers, validate_workers=validators)
+    completed = 0
+    try:
+        for i, (run, item_name), (code, render_success) in pipeline.run(scheduler):
+            completed = i + 1
+            total = completed + scheduler.remaining()
+            elapsed_time, eta_time, remaining_time = calculate_eta(start_time, completed, total)
+
+            elapsed_str = format_time_duration(elapsed_time)
+            if eta_time:
+                eta_str = datetime.fromtimestamp(eta_time).strftime("%H:%M:%S")
+                remaining_str = format_time_duration(remaining_time)
+                time_info = f" | Elapsed: {elapsed_str} | ETA: {eta_str} | Remaining: {remaining_str}"
+            else:
+                time_info = f" | Elapsed: {elapsed_str}"
+            if elapsed_time:
+                time_info += f" | Rate: {completed / elapsed_time * 60:.1f} items/min"
+
+            label = f"{run.category.name}/{item_name}" if multi else item_name
+            print(f"Completed [{completed}/{total}]: {label}{time_info}")
+            run.record(item_name, code, render_success)
+            scheduler.complete(run)
+            print()
+    finally:
+        scheduler.close()
+
+    for run in runs:
+        run.finish()
+
+    print(f"Processing complete!")
+    status = scheduler.status()
+    for run in runs:
+        issued, reason = status[run.category.name]
+        print(f"{run.category.name}: {len(run.dataset)} items, "
+              f"{run.successful} successful, {run.failed} failed "
+              f"({issued} generated this run, stopped: {reason or 'interrupted'})")
+    total_time = time.time() - start_time
+    if total_time > 0:
+        print(f"Throughput: {completed / total_time * 60:.1f} items/min")
+    print("Stage utilization:")
+    for line in pipeline.report():
+        print(f"  {line}")
+    print("Validation cost per tier:")
+    for line in validation.stats().report():
+        print(f"  {line}")
+
+    return runs
+
+
+def process_category_from_list(category, names, max_items=None, style="realistic", complexity="medium",
+                               dataset_file=None, workers=1, validators=None, tier=validation.CSG,
+                               lowres=False, budget=None, escalate=False):
+    """
+    Process one category's items from a list.
+
+    Args:
+        category (Category): The category
+        names (list): Item names
+        max_items (int): Maximum number of items to process (None for all)
+        style (str): Style for all models
+        complexity (str): Complexity for all models
+        dataset_file (str): Path to the dataset file (default: the category's)
+        workers (int): Number of concurrent generation requests
+        validators (int): Number of concurrent render tests (None for one per CPU core)
+        tier (str): Validation tier for generated code
+        lowres (bool): Validate geometry at low resolution
+        budget (Budget): Static render budget for generated code (None for no limits)
+        escalate (bool): Run the cheaper validation tiers first
+
+    Returns:
+        list: The updated dataset
+    """
+    run = CategoryRun(category, names, max_items=max_items, dataset_file=dataset_file)
+    process_categories([run], style, complexity, workers=workers, validators=validators, tier=tier,
+                       lowres=lowres, budget=budget, escalate=escalate)
+    return run.dataset
+
+
+def generate_single(category, item_name, style="realistic", complexity="medium", dataset_file=None,
+                    tier=validation.CSG, lowres=False, budget=None, escalate=False):
+    """
+    Generate one item and add it to the category's dataset.
+
+    Args:
+        category (Category): The category
+        item_name (str): Name of the item
+        style (str): Style of the model
+        complexity (str): Complexity level
+        dataset_file (str): Path to the dataset file (default: the category's)
+        tier (str): Validation tier for the generated code
+        lowres (bool): Validate geometry at low resolution
+        budget (Budget): Static render budget for the generated code (None for no limits)
+        escalate (bool): Run the cheaper validation tiers first
+
+    Returns:
+        dict: The new dataset entry
+    """
+    dataset_file = dataset_file or category.dataset_path()
+    store = DatasetStore(dataset_file, legacy_key=category.legacy_key)
+    dataset = store.load()
+
+    code = generate_openscad(category, item_name, style, complexity)
+    if code:
+        render_success = test_openscad_rendering(code, tier, lowres, budget, escalate)
+        print(f"Rendering test: {'✓ Success' if render_success else '✗ Failed'}")
+        entry = make_entry(category, item_name, code, render_success)
+    else:
+        print("✗ Failed to generate code")
+        entry = make_entry(category, item_name, "", False, "Failed to generate OpenSCAD code")
+
+    dataset.append(entry)
+    store.compact(dataset)
+    if code:
+        print(f"✓ Added to dataset: {dataset_file}")
+    return entry
+
+
+def parse_per_category(values, cast, default=None):
+    """
+    Parse repeatable "[category=]value" options such as --quota.
+
+    A bare value sets the default for every category; "category=value"
+    overrides it for one category.
+
+    Args:
+        values (list): Raw option values (may be None)
+        cast (callable): Converts the value part, e.g. int or float
+        default: Value for categories not mentioned
+
+    Returns:
+        function: Category -> value
+
+    Raises:
+        ValueError: If a value or category name is invalid
+    """
+    overrides = {}
+    for value in values or []:
+        if "=" in value:
+            name, _, raw = value.partition("=")
+            overrides[get_category(name.strip()).name] = cast(raw)
+        else:
+            default = cast(value)
+    return lambda category: overrides.get(category.name, default)
+
+
+def build_parser(category=None):
+    """
+    Build the command line parser.
+
+    Args:
+        category (Category): Fixed category for a per-category wrapper script,
+            or None to take category names on the command line
+    """
+    import argparse
+
+    if category is None:
+        parser = argparse.ArgumentParser(description="Generate OpenSCAD models for one or more categories using AI")
+        parser.add_argument("categories", nargs="+",
+                            help=f"Categories to generate, or 'all' ({', '.join(CATEGORIES)})")
+        parser.add_argument("--item", help="Generate a single item (one category only)")
+    else:
+        parser = argparse.ArgumentParser(description=f"Generate OpenSCAD {category.label} models using AI")
+        parser.add_argument("item", nargs="?", help=f"Name of the {category.label} to generate")
+    parser.add_argument("--list", action="store_true", help="Process items from each category's list.json")
+    parser.add_argument("--max", type=int, help="Maximum number of items to process per category (default: all)")
+    parser.add_argument("--style", choices=["realistic", "stylized", "minimal"], default="realistic",
+                        help="Style of the model")
+    parser.add_argument("--complexity", choices=["simple", "medium", "detailed"], default="medium",
+                        help="Complexity level")
+    parser.add_argument("--dataset", help="Dataset file path (one category only; default: the category's dataset)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume processing from where it left off (always on; kept for compatibility)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of concurrent generation requests")
+    parser.add_argument("--validators", type=int, default=None,
+                        help="Number of concurrent render tests (default: one per CPU core)")
+    parser.add_argument("--validate-tier", choices=validation.TIERS, default=validation.CSG,
+                        help="Validation fidelity: syntax (in-process parse), ast (parse), csg (evaluate), stl (mesh) or png (render); "
+                             "default: csg")
+    parser.add_argument("--escalate", action="store_true",
+                        help="Run the cheaper OpenSCAD tiers before --validate-tier and stop at the first failure")
+    parser.add_argument("--lowres", action="store_true",
+                        help="Validate stl/png tiers at low resolution ($fn clamped to 8)")
+    add_budget_arguments(parser)
+    parser.add_argument("--weight", action="append", metavar="[CATEGORY=]W",
+                        help="Relative share of the worker pool (default: 1); repeatable")
+    parser.add_argument("--quota", action="append", metavar="[CATEGORY=]N",
+                        help="Generate at most N items in this run; repeatable")
+    parser.add_argument("--target", action="append", metavar="[CATEGORY=]N",
+                        help="Stop a category once its dataset has N renderable items; repeatable")
+    return parser
+
+
+def main(argv=None, category=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list): Arguments (default: sys.argv[1:])
+        category (str): Fixed category name, used by the per-category scripts
+    """
+    fixed = get_category(category) if category else None
+    parser = build_parser(fixed)
+    args = parser.parse_args(argv)
+
+    if fixed:
+        categories = [fixed]
+    else:
+        names = list(CATEGORIES) if "all" in args.categories else args.categories
+        try:
+            categories = list(dict.fromkeys(get_category(name) for name in names))
+        except KeyError as e:
+            parser.error(e.args[0])
+
+    if args.dataset and len(categories) > 1:
+        parser.error("--dataset can only be used with a single category")
+
+    try:
+        weight = parse_per_category(args.weight, float, default=1.0)
+        quota = parse_per_category(args.quota, int)
+        target = parse_per_category(args.target, int)
+    except (KeyError, ValueError) as e:
+        parser.error(f"invalid --weight/--quota/--target: {e}")
+
+    if args.list:
+        runs = []
+        for cat in categories:
+            if not os.path.exists(cat.list_path()):
+                print(f"Error: {cat.list_path()} not found!")
+                return
+            names = cat.load_names()
+            print(f"Loaded {len(names)} {cat.label} items from {cat.list_path()}")
+            runs.append(CategoryRun(cat, names, max_items=args.max, dataset_file=args.dataset,
+                                    weight=weight(cat), quota=quota(cat), target=target(cat)))
+
+        process_categories(runs, style=args.style, complexity=args.complexity,
+                           workers=args.workers, validators=args.validators, tier=args.validate_tier,
+                           lowres=args.lowres, budget=budget_from_args(args), escalate=args.escalate)
+
+        for run in runs:
+            print(f"\nDataset saved to: {run.dataset_file}")
+
+    elif args.item:
+        if len(categories) > 1:
+            parser.error("a single item can only be generated for one category")
+        print(f"Generating OpenSCAD model for: {args.item}")
+        print(f"Style: {args.style}, Complexity: {args.complexity}")
+        generate_single(categories[0], args.item, args.style, args.complexity, dataset_file=args.dataset,
+                        tier=args.validate_tier, lowres=args.lowres, budget=budget_from_args(args),
+                        escalate=args.escalate)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
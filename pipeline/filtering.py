@@ -0,0 +1,169 @@
+"""
+Concurrent, resumable filtering engine shared by the category filter.py scripts.
+
+Names are classified in batches on a thread pool. Every verdict is appended
+to a JSONL progress journal as soon as its batch completes, so a crashed or
+interrupted run resumes from the journal instead of starting over. Results
+are always returned in input order.
+
+Only real verdicts are journaled: a name whose check failed (an API error
+or rate limit) has no verdict, is reported as None, and keeps the journal
+alive so the next run asks about it again.
+"""
+
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pipeline.classify import classify_batch, DEFAULT_BATCH_SIZE
+
+DEFAULT_WORKERS = 8
+
+
+def journal_path(input_file, output_file=None):
+    """
+    Get the progress journal path for a filter run.
+
+    Args:
+        input_file (str): Path to the list being filtered
+        output_file (str): Path of the filtered output (optional)
+
+    Returns:
+        str: Path to the journal file
+    """
+    base = output_file or input_file
+    return f"{os.path.splitext(base)[0]}.journal.jsonl"
+
+
+def load_journal(path):
+    """
+    Load verdicts recorded by a previous run.
+
+    A torn last line (from a crash mid-write) is ignored.
+
+    Args:
+        path (str): Path to the journal file
+
+    Returns:
+        dict: name -> bool
+    """
+    verdicts = {}
+    if not os.path.exists(path):
+        return verdicts
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and "name" in record and isinstance(record.get("keep"), bool):
+                verdicts[record["name"]] = record["keep"]
+    return verdicts
+
+
+class _Journal:
+    """Append-only, thread-safe verdict journal."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        # Terminate a torn last line so new records start cleanly
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(path, 'a', encoding='utf-8')
+        if needs_newline:
+            self._file.write("\n")
+
+    def append(self, verdicts):
+        lines = "".join(
+            json.dumps({"name": name, "keep": keep}, ensure_ascii=False) + "\n"
+            for name, keep in verdicts.items()
+        )
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def _classify_single(name, classify_one):
+    keep = classify_one(name)
+    return {} if keep is None else {name: keep}
+
+
+def run_filter(names, question, criteria, classify_one, journal_file,
+               batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS):
+    """
+    Classify every name, resuming from and appending to a progress journal.
+
+    Args:
+        names (list): Names to classify, in input order
+        question (str): What a name must be, e.g. "the name of an actual fruit"
+        criteria (str): The category's criteria text
+        classify_one (callable): Single-name classifier for names a batch leaves out
+        journal_file (str): Path to the JSONL progress journal
+        batch_size (int): Names per classification request
+        workers (int): Number of batches classified concurrently
+
+    Returns:
+        list: (name, keep) pairs in input order; keep is None for names whose
+        check failed
+    """
+    verdicts = load_journal(journal_file)
+    pending = [name for name in dict.fromkeys(names) if name not in verdicts]
+
+    if verdicts:
+        print(f"Resuming from {journal_file}: {len(verdicts)} names already checked")
+    print(f"Checking {len(pending)} names with {workers} workers, {batch_size} per request...")
+
+    if pending:
+        size = max(1, batch_size or 1)
+        batches = [pending[i:i + size] for i in range(0, len(pending), size)]
+        journal = _Journal(journal_file)
+        done = 0
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                if size > 1:
+                    futures = [
+                        executor.submit(classify_batch, batch, question, criteria, classify_one)
+                        for batch in batches
+                    ]
+                else:
+                    futures = [executor.submit(_classify_single, batch[0], classify_one) for batch in batches]
+                for future in as_completed(futures):
+                    batch_verdicts = future.result()
+                    journal.append(batch_verdicts)
+                    verdicts.update(batch_verdicts)
+                    done += len(batch_verdicts)
+                    print(f"  Checked {done}/{len(pending)} names")
+        finally:
+            journal.close()
+
+    unchecked = sum(1 for name in pending if name not in verdicts)
+    if unchecked:
+        print(f"Could not check {unchecked} names; run the filter again to retry them")
+    return [(name, verdicts.get(name)) for name in names]
+
+
+def finish_filter(journal_file, verdicts=None):
+    """
+    Remove the progress journal once the filtered output has been saved.
+
+    The journal is kept while any name is still unchecked, so the next run
+    only retries those.
+
+    Args:
+        journal_file (str): Path to the JSONL progress journal
+        verdicts (dict): name -> verdict from run_filter(), if known
+    """
+    if verdicts and any(keep is None for keep in verdicts.values()):
+        print(f"Keeping {journal_file} to retry the unchecked names")
+        return
+    if os.path.exists(journal_file):
+        os.unlink(journal_file)
@@ -0,0 +1,285 @@
+"""
+Concurrent execution helpers for the generate-cad.py item loops.
+
+Generation (LLM call) and validation (OpenSCAD run) for several items run
+concurrently, while results are handed back to the caller in input order
+so dataset commits stay deterministic and resumable.
+"""
+
+import os
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+
+def ordered_map(fn, items, workers=1, processes=False, initializer=None):
+    """
+    Apply fn to every item on a worker pool, yielding results in input order.
+
+    At most `workers * 2` items are in flight at once, so results that finish
+    early wait in a small reorder buffer and an interrupted run has little
+    work queued. Items are pulled from the iterable lazily, so a generator
+    source is never materialized. With workers <= 1 items are processed one
+    at a time on the calling thread.
+
+    Args:
+        fn (callable): Function taking one item
+        items (iterable): Items to process
+        workers (int): Number of worker threads or processes
+        processes (bool): Use a process pool (fn and items must be picklable)
+        initializer (callable): Run once in each worker
+
+    Yields:
+        tuple: (index, item, result) in input order
+    """
+    if workers is None or workers <= 1:
+        for i, item in enumerate(items):
+            yield i, item, fn(item)
+        return
+
+    window = workers * 2
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers, initializer=initializer) as executor:
+        source = iter(items)
+        exhausted = False
+        pending = {}
+        done = {}
+        queued = {}
+        next_submit = 0
+        next_yield = 0
+
+        while True:
+            while not exhausted and len(pending) + len(done) < window:
+                try:
+                    item = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future = executor.submit(fn, item)
+                pending[future] = next_submit
+                queued[next_submit] = item
+                next_submit += 1
+
+            if next_yield == next_submit:
+                break
+            if next_yield not in done:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done[pending.pop(future)] = future
+                continue
+
+            # Re-raises here if the worker raised
+            result = done.pop(next_yield).result()
+            yield next_yield, queued.pop(next_yield), result
+            next_yield += 1
+
+
+class _StageStats:
+    """Busy/blocked time accounting for one pipeline stage."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, busy=0.0, blocked=0.0, items=0):
+        with self._lock:
+            self.busy += busy
+            self.blocked += blocked
+            self.items += items
+
+
+class _ItemSource:
+    """Thread-safe, lazily consumed item iterator that numbers what it hands out."""
+
+    def __init__(self, items):
+        self._iterator = iter(items)
+        self._lock = threading.Lock()
+        self.dispatched = 0
+        self.exhausted = False
+
+    def take(self):
+        """
+        Get the next item.
+
+        Returns:
+            tuple: (index, item), or None once the source is exhausted
+        """
+        with self._lock:
+            if self.exhausted:
+                return None
+            try:
+                item = next(self._iterator)
+            except StopIteration:
+                self.exhausted = True
+                return None
+            except BaseException:
+                self.exhausted = True
+                raise
+            index = self.dispatched
+            self.dispatched += 1
+            return index, item
+
+
+class StagePipeline:
+    """
+    Generate -> validate -> write pipeline with bounded queues.
+
+    LLM workers generate code and feed a bounded queue; a separate pool of
+    validation workers (sized to the core count by default) runs the
+    OpenSCAD check; the caller consumes results in input order as the
+    writer stage. When validation falls behind, the bounded queue fills
+    and generation blocks (backpressure) instead of piling up code.
+
+    Args:
+        generate (callable): name -> code (or None on failure); runs on LLM workers
+        validate (callable): code -> bool; runs on validation workers
+        llm_workers (int): Concurrent generation requests
+        validate_workers (int): Concurrent validations (default: os.cpu_count())
+        queue_size (int): Capacity of the generate -> validate queue (default: 2 * validate_workers)
+    """
+
+    def __init__(self, generate, validate, llm_workers=1, validate_workers=None, queue_size=None):
+        self.generate = generate
+        self.validate = validate
+        self.llm_workers = max(1, llm_workers or 1)
+        self.validate_workers = max(1, validate_workers or os.cpu_count() or 1)
+        self.queue_size = queue_size or 2 * self.validate_workers
+
+        self.stats = {
+            "generate": _StageStats("generate", self.llm_workers),
+            "validate": _StageStats("validate", self.validate_workers),
+            "write": _StageStats("write", 1),
+        }
+        self.wall_time = 0.0
+
+    def _generate_worker(self, source, validate_q, results_q, stop):
+        stats = self.stats["generate"]
+        while not stop.is_set():
+            try:
+                task = source.take()
+            except BaseException as e:
+                results_q.put((-1, None, e))
+                return
+            if task is None:
+                # Wake the writer so it can notice the source is exhausted
+                results_q.put((None, None, None))
+                return
+            index, item = task
+            start = time.perf_counter()
+            try:
+                code = self.generate(item)
+            except BaseException as e:
+                results_q.put((index, item, e))
+                return
+            busy = time.perf_counter() - start
+            stats.record(busy=busy, items=1)
+
+            if not code:
+                results_q.put((index, item, (code, False)))
+                continue
+
+            # Blocks while the validation queue is full (backpressure)
+            start = time.perf_counter()
+            while not stop.is_set():
+                try:
+                    validate_q.put((index, item, code), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            stats.record(blocked=time.perf_counter() - start)
+
+    def _validate_worker(self, validate_q, results_q, stop):
+        stats = self.stats["validate"]
+        while not stop.is_set():
+            try:
+                index, item, code = validate_q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            start = time.perf_counter()
+            try:
+                ok = self.validate(code)
+            except BaseException as e:
+                results_q.put((index, item, e))
+                continue
+            stats.record(busy=time.perf_counter() - start, items=1)
+            results_q.put((index, item, (code, ok)))
+
+    def run(self, items):
+        """
+        Run every item through the pipeline.
+
+        Items are pulled lazily by the generation workers, so `items` may be
+        a generator that decides what to hand out next (e.g. a scheduler).
+        It is only ever advanced by one thread at a time.
+
+        Args:
+            items (iterable): Items to generate
+
+        Yields:
+            tuple: (index, item, (code, render_success)) in the order items were taken
+        """
+        source = _ItemSource(items)
+        validate_q = queue.Queue(maxsize=self.queue_size)
+        results_q = queue.Queue()
+        stop = threading.Event()
+
+        generators = [
+            threading.Thread(target=self._generate_worker, args=(source, validate_q, results_q, stop), daemon=True)
+            for _ in range(self.llm_workers)
+        ]
+        validators = [
+            threading.Thread(target=self._validate_worker, args=(validate_q, results_q, stop), daemon=True)
+            for _ in range(self.validate_workers)
+        ]
+        for thread in generators + validators:
+            thread.start()
+
+        started = time.perf_counter()
+        writer = self.stats["write"]
+        done = {}
+        next_yield = 0
+        try:
+            while True:
+                if next_yield not in done:
+                    if source.exhausted and next_yield >= source.dispatched:
+                        break
+                    index, item, result = results_q.get()
+                    if index is None:
+                        continue
+                    if isinstance(result, BaseException):
+                        raise result
+                    done[index] = (item, result)
+                    continue
+
+                item, result = done.pop(next_yield)
+                start = time.perf_counter()
+                yield next_yield, item, result
+                writer.record(busy=time.perf_counter() - start, items=1)
+                next_yield += 1
+        finally:
+            # Workers poll `stop` between items and exit on their own
+            stop.set()
+            self.wall_time = time.perf_counter() - started
+
+    def report(self):
+        """
+        Summarize per-stage utilization for the last run.
+
+        Returns:
+            list: One formatted line per stage
+        """
+        lines = []
+        for stage in self.stats.values():
+            capacity = stage.workers * self.wall_time
+            utilization = stage.busy / capacity * 100 if capacity else 0.0
+            line = (f"{stage.name:>8}: {stage.items} items, {stage.workers} workers, "
+                    f"{utilization:.0f}% busy")
+            if stage.blocked >= 0.05:
+                line += f", {stage.blocked:.1f}s blocked on full queue"
+            lines.append(line)
+        return lines
@@ -0,0 +1,135 @@
+"""
+Buffered writer for large JSON arrays of flat records (Synthetic-Objects.json).
+
+combine.py used to serialize each item with json.dumps(indent=2), split the
+result into lines and re-join them with a two-space prefix, which copies
+every code string several times. JsonArrayWriter emits the same indented
+layout directly: each value is encoded once and appended to a large
+binary buffer.
+
+Values are encoded by a pluggable codec:
+    json    the standard library; ASCII output, byte-identical to the old
+            json.dumps(indent=2) layout
+    orjson  orjson, if installed; non-ASCII characters are written as
+            UTF-8 instead of \\u escapes (same JSON, different bytes)
+    auto    orjson when installed, json otherwise
+"""
+
+import io
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+CODECS = ("auto", "json", "orjson")
+
+
+def _encode_json(value):
+    return json.dumps(value).encode("ascii")
+
+
+def get_codec(name="auto"):
+    """
+    Get a value encoder.
+
+    Args:
+        name (str): "auto", "json" or "orjson"
+
+    Returns:
+        tuple: (codec name, encode function returning bytes)
+    """
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec '{name}', expected one of {CODECS}")
+    if name == "orjson" and orjson is None:
+        raise ValueError("orjson codec requested but orjson is not installed")
+    if name == "orjson" or (name == "auto" and orjson is not None):
+        return "orjson", orjson.dumps
+    return "json", _encode_json
+
+
+class JsonArrayWriter:
+    """
+    Stream records into a JSON array file.
+
+    The indented layout matches json.dumps(record, indent=2) for every
+    record, nested one level inside the array. Compact mode writes one
+    record per line with no spaces. Record values are encoded compactly,
+    so the indented layout is only exact for flat records (scalar values),
+    which is what the combined dataset holds.
+
+    Use as a context manager; the closing bracket is written on exit.
+
+    Args:
+        path (str): Output file
+        compact (bool): One record per line instead of the indented layout
+        codec (str): "auto", "json" or "orjson"
+        buffer_size (int): Bytes buffered before each write to disk
+    """
+
+    def __init__(self, path, compact=False, codec="auto", buffer_size=DEFAULT_BUFFER_SIZE):
+        self.path = path
+        self.compact = compact
+        self.codec, self._encode = get_codec(codec)
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._file = None
+        self._keys = {}
+        if compact:
+            self._open, self._sep, self._close, self._empty = b"{", b",", b"}", b"{}"
+        else:
+            self._open, self._sep, self._close, self._empty = b"  {\n", b",\n", b"\n  }", b"  {}"
+
+    def __enter__(self):
+        self._file = io.open(self.path, 'wb', buffering=self.buffer_size)
+        self._file.write(b"[\n")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _key(self, key):
+        """Encoded `"key": ` prefix, cached per key."""
+        prefix = self._keys.get(key)
+        if prefix is None:
+            encoded = self._encode(key)
+            prefix = encoded + b":" if self.compact else b"    " + encoded + b": "
+            self._keys[key] = prefix
+        return prefix
+
+    def write(self, record):
+        """
+        Append one record.
+
+        Args:
+            record (dict): Flat mapping of field name to JSON-serializable value
+        """
+        if self.count:
+            self._file.write(b",\n")
+        self.count += 1
+        if not record:
+            self._file.write(self._empty)
+            return
+
+        encode = self._encode
+        parts = [self._open]
+        first = True
+        for key, value in record.items():
+            if not first:
+                parts.append(self._sep)
+            first = False
+            parts.append(self._key(key))
+            parts.append(encode(value))
+        parts.append(self._close)
+        self._file.write(b"".join(parts))
+
+    def close(self):
+        """Write the closing bracket and close the file."""
+        if self._file is None:
+            return
+        self._file.write(b"\n]\n")
+        self._file.close()
+        self._file = None
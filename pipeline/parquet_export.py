@@ -0,0 +1,225 @@
+"""
+Sharded Parquet export of the combined corpus.
+
+Synthetic-Objects.json has to be parsed whole before it can be used.
+The Parquet export writes the same items as columns (name, category,
+code, renders, code_length, code_hash) in size-bounded shards made of
+size-bounded row groups, so loaders can memory-map the files, read only
+the columns they need and skip row groups.
+
+Shards are laid out per category in the Hugging Face dataset layout,
+
+    <out_dir>/<category>/data/train-00000-of-00002.parquet
+
+so each category folder can be pushed as-is to the category's dataset
+repo (Category.hf_dataset), and the whole tree can be read at once with
+pyarrow.dataset.dataset(out_dir).
+
+Needs pyarrow (and huggingface_hub for uploads); both are imported on use.
+"""
+
+import os
+import glob
+
+from pipeline.categories import CATEGORIES
+from pipeline.render_cache import code_hash
+
+DEFAULT_SHARD_ROWS = 50000
+DEFAULT_ROW_GROUP_ROWS = 5000
+DEFAULT_COMPRESSION = "zstd"
+COLUMNS = ("name", "category", "code", "renders", "code_length", "code_hash")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow)") from e
+    return pyarrow, pyarrow.parquet
+
+
+def shard_dir(out_dir, category):
+    """Directory holding a category's shards."""
+    return os.path.join(out_dir, category, "data")
+
+
+class _CategoryShards:
+    """Row buffer and open shard of one category."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.columns = {column: [] for column in COLUMNS}
+        self.buffered = 0
+        self.writer = None
+        self.shard_rows = 0
+        self.files = []
+
+
+class ParquetShardWriter:
+    """
+    Stream items into per-category Parquet shards.
+
+    Rows are buffered per category and written one row group at a time; a
+    shard is closed and the next one started after `shard_rows` rows.
+    Memory is bounded by one row group per category being written.
+    Existing shards of a category are removed when it is first written.
+
+    Use as a context manager; shards get their final
+    train-XXXXX-of-YYYYY.parquet names on close.
+
+    Args:
+        out_dir (str): Output root directory
+        shard_rows (int): Maximum rows per shard file
+        row_group_rows (int): Rows per row group
+        compression (str): Parquet compression codec
+    """
+
+    def __init__(self, out_dir, shard_rows=DEFAULT_SHARD_ROWS, row_group_rows=DEFAULT_ROW_GROUP_ROWS,
+                 compression=DEFAULT_COMPRESSION):
+        if shard_rows < 1 or row_group_rows < 1:
+            raise ValueError("shard_rows and row_group_rows must be positive")
+        self.pa, self.pq = _import_pyarrow()
+        self.out_dir = out_dir
+        self.shard_rows = shard_rows
+        self.row_group_rows = min(row_group_rows, shard_rows)
+        self.compression = compression
+        self.schema = self.pa.schema([
+            ("name", self.pa.string()),
+            ("category", self.pa.string()),
+            ("code", self.pa.large_string()),
+            ("renders", self.pa.bool_()),
+            ("code_length", self.pa.int32()),
+            ("code_hash", self.pa.string()),
+        ])
+        self.rows = 0
+        self._categories = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _category(self, category):
+        shards = self._categories.get(category)
+        if shards is None:
+            directory = shard_dir(self.out_dir, category)
+            os.makedirs(directory, exist_ok=True)
+            for stale in glob.glob(os.path.join(directory, "train-*.parquet")):
+                os.unlink(stale)
+            shards = self._categories[category] = _CategoryShards(directory)
+        return shards
+
+    def write(self, name, category, code, renders=None):
+        """
+        Add one item.
+
+        Args:
+            name (str): Item name
+            category (str): Category name
+            code (str): OpenSCAD code
+            renders (bool): Whether the code rendered (None if not checked)
+        """
+        shards = self._category(category)
+        columns = shards.columns
+        columns["name"].append(name)
+        columns["category"].append(category)
+        columns["code"].append(code)
+        columns["renders"].append(renders)
+        columns["code_length"].append(len(code))
+        columns["code_hash"].append(code_hash(code))
+        shards.buffered += 1
+        self.rows += 1
+
+        # Flush at the row group size, or early so the shard ends exactly at shard_rows
+        if shards.buffered >= min(self.row_group_rows, self.shard_rows - shards.shard_rows):
+            self._flush(shards)
+
+    def _flush(self, shards):
+        if not shards.buffered:
+            return
+        if shards.writer is None:
+            path = os.path.join(shards.directory, f"train-{len(shards.files):05d}.parquet.partial")
+            shards.writer = self.pq.ParquetWriter(path, self.schema, compression=self.compression)
+            shards.files.append(path)
+        table = self.pa.Table.from_pydict(shards.columns, schema=self.schema)
+        shards.writer.write_table(table, row_group_size=self.row_group_rows)
+        shards.shard_rows += shards.buffered
+        shards.columns = {column: [] for column in COLUMNS}
+        shards.buffered = 0
+        if shards.shard_rows >= self.shard_rows:
+            shards.writer.close()
+            shards.writer = None
+            shards.shard_rows = 0
+
+    def close(self):
+        """
+        Flush and close every shard and give them their final names.
+
+        Returns:
+            dict: Category name -> list of shard paths
+        """
+        written = {}
+        for category, shards in self._categories.items():
+            self._flush(shards)
+            if shards.writer is not None:
+                shards.writer.close()
+                shards.writer = None
+            final = []
+            for index, partial in enumerate(shards.files):
+                path = os.path.join(shards.directory, f"train-{index:05d}-of-{len(shards.files):05d}.parquet")
+                os.replace(partial, path)
+                final.append(path)
+            shards.files = []
+            written[category] = final
+        self._categories = {}
+        return written
+
+
+def upload_shards(out_dir, categories=None, token=None):
+    """
+    Push each category's shards to its Hugging Face dataset repo.
+
+    Remote train-*.parquet shards are replaced in the same commit, so a
+    re-export with fewer shards leaves no stale files behind.
+
+    Args:
+        out_dir (str): Export root written by ParquetShardWriter
+        categories (list): Category names to upload (default: all exported)
+        token (str): Hugging Face token (default: HF_TOKEN / cached login)
+
+    Returns:
+        list: Dataset repo ids that were updated
+    """
+    try:
+        from huggingface_hub import HfApi
+    except ImportError as e:
+        raise ImportError("Uploading needs huggingface_hub (pip install huggingface_hub)") from e
+
+    api = HfApi(token=token)
+    if categories is None:
+        categories = sorted(name for name in os.listdir(out_dir)
+                            if os.path.isdir(shard_dir(out_dir, name)))
+    uploaded = []
+    for name in categories:
+        category = CATEGORIES.get(name)
+        if category is None or not category.hf_dataset:
+            print(f"  {name}: no Hugging Face dataset configured, skipping")
+            continue
+        files = glob.glob(os.path.join(shard_dir(out_dir, name), "train-*-of-*.parquet"))
+        if not files:
+            print(f"  {name}: no shards, skipping")
+            continue
+        print(f"  {name}: uploading {len(files)} shards to {category.hf_dataset}...")
+        api.upload_folder(
+            repo_id=category.hf_dataset,
+            repo_type="dataset",
+            folder_path=os.path.join(out_dir, name),
+            allow_patterns="data/train-*-of-*.parquet",
+            delete_patterns="data/train-*.parquet",
+            commit_message=f"Upload {len(files)} Parquet shards",
+        )
+        uploaded.append(category.hf_dataset)
+    return uploaded
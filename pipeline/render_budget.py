@@ -0,0 +1,118 @@
+"""
+Static render budget: catch pathological loops and tessellation before
+OpenSCAD runs.
+
+A generated model with nested `for (i = [0:0.1:360])` loops or a huge $fn
+does not fail, it just pins a core until the timeout kills it. estimate()
+reads the primitive count and polygon estimate off the static features
+(pipeline.scad_features), which expand loop ranges and $fn without
+running anything, and Budget decides what to do with code over the
+limits:
+
+    reject    fail validation with reason "budget" without running OpenSCAD
+    downtier  validate at most at the csg tier, which evaluates the code
+              but never tessellates it; code over the primitive limit is
+              still rejected, since evaluating it is the expensive part
+
+Generated dataset entries record their estimate under "estimate", so the
+render pool (render/render.py) can send expensive items to a separate
+lane without parsing them again.
+"""
+
+from pipeline.scad_features import extract_features
+
+DEFAULT_MAX_PRIMITIVES = 20000
+DEFAULT_MAX_POLYGONS = 2000000
+# Polygon estimate above which render/render.py uses the expensive lane
+EXPENSIVE_POLYGONS = 100000
+
+REJECT = "reject"
+DOWNTIER = "downtier"
+ACTIONS = (REJECT, DOWNTIER)
+
+
+def estimate(code, features=None):
+    """
+    Estimate the render workload of OpenSCAD code.
+
+    Args:
+        code (str): OpenSCAD code
+        features (dict): Its scad_features, if already extracted
+
+    Returns:
+        dict: {"primitives", "polygons", "loop_iterations"}, or None if the
+        code has a syntax error
+    """
+    if features is None:
+        features = extract_features(code)
+        if features is None:
+            return None
+    return {key: int(features[key]) for key in ("primitives", "polygons", "loop_iterations")}
+
+
+def is_expensive(estimated, threshold=EXPENSIVE_POLYGONS):
+    """Whether an estimate belongs in the expensive render lane."""
+    return estimated is not None and estimated["polygons"] > threshold
+
+
+class Budget:
+    """
+    Limits on the static workload estimate, and what to do above them.
+
+    Args:
+        max_primitives (int): Maximum primitive instances
+        max_polygons (int): Maximum estimated polygons
+        action (str): REJECT or DOWNTIER
+    """
+
+    def __init__(self, max_primitives=DEFAULT_MAX_PRIMITIVES, max_polygons=DEFAULT_MAX_POLYGONS,
+                 action=DOWNTIER):
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown budget action '{action}', expected one of {ACTIONS}")
+        self.max_primitives = max_primitives
+        self.max_polygons = max_polygons
+        self.action = action
+
+    def violations(self, estimated):
+        """
+        Describe how an estimate exceeds the budget.
+
+        Args:
+            estimated (dict): From estimate()
+
+        Returns:
+            list: Messages, empty if the estimate is within budget
+        """
+        messages = []
+        if estimated["primitives"] > self.max_primitives:
+            messages.append(f"{estimated['primitives']:,} primitives > {self.max_primitives:,}")
+        if estimated["polygons"] > self.max_polygons:
+            messages.append(f"{estimated['polygons']:,} polygons > {self.max_polygons:,}")
+        return messages
+
+    def rejects(self, estimated):
+        """Whether code with this estimate must not be run at all."""
+        if self.action == REJECT:
+            return bool(self.violations(estimated))
+        return estimated["primitives"] > self.max_primitives
+
+    def downtiers(self, estimated):
+        """Whether code with this estimate should stop below the tessellating tiers."""
+        return self.action == DOWNTIER and estimated["polygons"] > self.max_polygons
+
+
+def add_budget_arguments(parser):
+    """Add --max-primitives, --max-polygons and --over-budget to an argparse parser."""
+    parser.add_argument("--max-primitives", type=int, default=DEFAULT_MAX_PRIMITIVES,
+                        help=f"Static budget: primitive instances after loop expansion "
+                             f"(default: {DEFAULT_MAX_PRIMITIVES})")
+    parser.add_argument("--max-polygons", type=int, default=DEFAULT_MAX_POLYGONS,
+                        help=f"Static budget: estimated polygons from loops and $fn (default: {DEFAULT_MAX_POLYGONS})")
+    parser.add_argument("--over-budget", choices=ACTIONS, default=DOWNTIER,
+                        help="Code over budget: reject it, or downtier (validate without tessellating, "
+                             "reject only over the primitive limit). Default: downtier")
+
+
+def budget_from_args(args):
+    """Build a Budget from the add_budget_arguments() options."""
+    return Budget(args.max_primitives, args.max_polygons, args.over_budget)
@@ -0,0 +1,346 @@
+"""
+Shared cache of OpenSCAD validation and render results.
+
+Generation (test_openscad_rendering), combining (total/combine.py) and
+the render driver all run OpenSCAD on the same code, often more than once
+per item. Results are stored in SQLite keyed by a hash of the
+canonicalized code (comments and whitespace removed), the render mode
+(e.g. "info" or "png-800") and the OpenSCAD version, so identical code is
+only ever checked once per mode. Each entry records success, a stderr
+summary, the elapsed time and any artifact paths (e.g. the rendered PNG).
+
+Only deterministic outcomes are cached: timeouts, memory-limit and
+allocation failures, X display errors and "OpenSCAD not installed" are
+not (see is_environment_failure()).
+"""
+
+import os
+import json
+import time
+import atexit
+import sqlite3
+import hashlib
+import threading
+
+from inference.cache import READ_WRITE, READ_ONLY, WRITE_ONLY, BYPASS, CACHE_MODES
+from pipeline.displays import DISPLAY_ERRORS
+from pipeline.render_manifest import openscad_version
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".render_cache"
+)
+STDERR_SUMMARY_CHARS = 500
+
+# stderr fragments of allocation failures, e.g. under an RLIMIT_AS cap
+MEMORY_ERRORS = ("bad_alloc", "out of memory", "cannot allocate memory", "memory exhausted",
+                 "failed to allocate")
+
+
+def canonicalize_code(code):
+    """
+    Normalize OpenSCAD code so formatting-only differences hash the same.
+
+    Comments are removed, whitespace runs collapse to one space and leading
+    or trailing whitespace is dropped; string literals are kept verbatim.
+
+    Args:
+        code (str): OpenSCAD code
+
+    Returns:
+        str: Canonical form
+    """
+    out = []
+    i = 0
+    n = len(code)
+    pending_space = False
+    while i < n:
+        c = code[i]
+        if c == '"':
+            # Copy the string literal, honoring backslash escapes
+            j = i + 1
+            while j < n and code[j] != '"':
+                j += 2 if code[j] == '\\' else 1
+            if pending_space and out:
+                out.append(" ")
+            pending_space = False
+            out.append(code[i:j + 1])
+            i = j + 1
+        elif code.startswith("//", i):
+            end = code.find("\n", i)
+            i = n if end == -1 else end
+        elif code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            pending_space = True
+        elif c.isspace():
+            pending_space = True
+            i += 1
+        else:
+            if pending_space and out:
+                out.append(" ")
+            pending_space = False
+            out.append(c)
+            i += 1
+    return "".join(out)
+
+
+def code_hash(code):
+    """SHA-256 of the canonicalized code."""
+    return hashlib.sha256(canonicalize_code(code).encode("utf-8")).hexdigest()
+
+
+def is_environment_failure(stderr):
+    """
+    Whether a failed run's stderr blames the environment rather than the code.
+
+    Display and memory failures can succeed on the next run, so their
+    results must not be cached.
+
+    Args:
+        stderr (str): OpenSCAD's stderr
+
+    Returns:
+        bool: True for X display and allocation errors
+    """
+    stderr = (stderr or "").lower()
+    return any(fragment in stderr for fragment in DISPLAY_ERRORS + MEMORY_ERRORS)
+
+
+def summarize_stderr(stderr):
+    """Keep the tail of stderr, where OpenSCAD reports errors."""
+    stderr = (stderr or "").strip()
+    if len(stderr) > STDERR_SUMMARY_CHARS:
+        stderr = "..." + stderr[-STDERR_SUMMARY_CHARS:]
+    return stderr
+
+
+class RenderCache:
+    """
+    SQLite-backed cache of OpenSCAD results, safe to share across processes.
+
+    Args:
+        path (str): Directory holding the cache database
+        mode (str): One of "readwrite", "readonly", "writeonly", "bypass"
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, mode=READ_WRITE):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode '{mode}', expected one of {CACHE_MODES}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.saved_seconds = 0.0
+
+    def _connect(self):
+        """Open (or reopen after fork) the database connection."""
+        pid = os.getpid()
+        if self._conn is not None and self._pid == pid:
+            return self._conn
+
+        os.makedirs(self.path, exist_ok=True)
+        conn = sqlite3.connect(
+            os.path.join(self.path, "renders.sqlite3"),
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=30,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                mode TEXT NOT NULL,
+                success INTEGER NOT NULL,
+                stderr TEXT NOT NULL,
+                elapsed REAL NOT NULL,
+                artifacts TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn = conn
+        self._pid = pid
+        return conn
+
+    @staticmethod
+    def key(code, mode):
+        """
+        Compute the cache key of a code/mode pair.
+
+        Args:
+            code (str): OpenSCAD code
+            mode (str): Render mode, e.g. "info" or "png-800"
+
+        Returns:
+            str: Hex digest
+        """
+        h = hashlib.sha256()
+        for part in (code_hash(code), mode, openscad_version()):
+            h.update(part.encode("utf-8") + b"\0")
+        return h.hexdigest()
+
+    def get(self, code, mode):
+        """
+        Look up a result.
+
+        Returns:
+            dict: {"success", "stderr", "elapsed", "artifacts"}, or None on a miss
+        """
+        if self.mode not in (READ_WRITE, READ_ONLY):
+            return None
+        key = self.key(code, mode)
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT success, stderr, elapsed, artifacts FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += row[2]
+        return {"success": bool(row[0]), "stderr": row[1], "elapsed": row[2], "artifacts": json.loads(row[3])}
+
+    def put(self, code, mode, success, stderr="", elapsed=0.0, artifacts=None):
+        """
+        Store a result.
+
+        Args:
+            code (str): OpenSCAD code
+            mode (str): Render mode
+            success (bool): Whether OpenSCAD succeeded
+            stderr (str): OpenSCAD's stderr (summarized before storing)
+            elapsed (float): Seconds the run took
+            artifacts (list): Paths of files the run produced
+        """
+        if self.mode not in (READ_WRITE, WRITE_ONLY):
+            return
+        key = self.key(code, mode)
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO results (key, mode, success, stderr, elapsed, artifacts, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, mode, int(bool(success)), summarize_stderr(stderr), float(elapsed),
+                 json.dumps(artifacts or []), time.time()),
+            )
+            self.writes += 1
+
+    def modes(self):
+        """
+        List the render modes that have entries.
+
+        Returns:
+            list: Mode names, sorted
+        """
+        with self._lock:
+            rows = self._connect().execute("SELECT DISTINCT mode FROM results ORDER BY mode").fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._connect().execute("DELETE FROM results")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._pid = None
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Hits, misses, writes, entries and OpenSCAD seconds saved by hits
+        """
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "mode": self.mode,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "writes": self.writes,
+                "entries": entries,
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_render_cache():
+    """
+    Get the process-wide render cache, configured from the environment on first use.
+
+    RENDER_CACHE_DIR sets the directory and RENDER_CACHE_MODE the mode
+    (readwrite by default; "bypass" disables it).
+
+    Returns:
+        RenderCache: The shared cache
+    """
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RenderCache(
+                    path=os.environ.get("RENDER_CACHE_DIR", DEFAULT_CACHE_DIR),
+                    mode=os.environ.get("RENDER_CACHE_MODE", READ_WRITE),
+                )
+    return _cache
+
+
+def _close_cache():
+    if _cache is not None:
+        _cache.close()
+
+
+atexit.register(_close_cache)
+
+
+def cached_run(code, mode, run, implied_by=(), usable=None):
+    """
+    Get a result from the cache, or run OpenSCAD and cache the outcome.
+
+    Args:
+        code (str): OpenSCAD code
+        mode (str): Render mode, e.g. "info" or "png-100"
+        run (callable): run() -> (success, stderr, artifacts, cacheable);
+            cacheable is False for outcomes that may differ next time
+            (timeouts, missing OpenSCAD, ...)
+        implied_by (tuple): Stricter modes whose success implies success in
+            this one (e.g. a full-size PNG render implies a thumbnail render)
+        usable (callable): usable(result) -> bool; a hit it rejects (e.g.
+            because its artifact was deleted) is treated as a miss
+
+    Returns:
+        dict: {"success", "stderr", "elapsed", "artifacts", "cached"}
+    """
+    cache = get_render_cache()
+    result = cache.get(code, mode)
+    if result is None:
+        for other in implied_by:
+            other_result = cache.get(code, other)
+            if other_result is not None and other_result["success"]:
+                result = dict(other_result, artifacts=[])
+                break
+    if result is not None and (usable is None or usable(result)):
+        result["cached"] = True
+        return result
+
+    start = time.perf_counter()
+    success, stderr, artifacts, cacheable = run()
+    elapsed = time.perf_counter() - start
+    if cacheable:
+        cache.put(code, mode, success, stderr, elapsed, artifacts)
+    return {"success": success, "stderr": summarize_stderr(stderr), "elapsed": elapsed,
+            "artifacts": artifacts or [], "cached": False}
@@ -0,0 +1,147 @@
+"""
+Content-hash manifest for incremental PNG rendering.
+
+Maps (dataset, item name) to a hash of everything that determines the
+image (the OpenSCAD code, the OpenSCAD version and the render flags) plus
+the PNG path. A re-render only has to process entries whose hash changed
+or whose PNG is missing, and PNGs no entry points at any more can be
+removed.
+"""
+
+import os
+import json
+import hashlib
+import subprocess
+
+from pipeline.dataset_store import atomic_write_json
+
+MANIFEST_VERSION = 1
+
+_openscad_version = None
+
+
+def openscad_version():
+    """
+    Get the installed OpenSCAD version string (cached per process).
+
+    Returns:
+        str: e.g. "OpenSCAD version 2021.01", or "unknown" if it cannot be run
+    """
+    global _openscad_version
+    if _openscad_version is None:
+        try:
+            result = subprocess.run(['openscad', '--version'], capture_output=True, text=True, timeout=30)
+            # OpenSCAD prints its version on stderr
+            _openscad_version = (result.stderr or result.stdout).strip() or "unknown"
+        except (OSError, subprocess.TimeoutExpired):
+            _openscad_version = "unknown"
+    return _openscad_version
+
+
+def render_hash(code, version, flags):
+    """
+    Hash the inputs that determine a rendered image.
+
+    Args:
+        code (str): OpenSCAD code
+        version (str): OpenSCAD version string
+        flags (list): Render command line flags (image size, etc.)
+
+    Returns:
+        str: Hex digest
+    """
+    h = hashlib.sha256()
+    for part in (version, "\0".join(flags), code):
+        data = part.encode("utf-8")
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class RenderManifest:
+    """
+    On-disk record of which PNG was rendered from which inputs.
+
+    PNG paths are stored relative to the image root, so the image tree can
+    be moved together with its manifest.
+
+    Args:
+        path (str): Manifest JSON file
+        root (str): Image root directory (default: the manifest's directory)
+    """
+
+    def __init__(self, path, root=None):
+        self.path = path
+        self.root = root or os.path.dirname(os.path.abspath(path))
+        self.entries = {}
+        self._dirty = False
+
+    def _relative(self, png_path):
+        return os.path.relpath(png_path, self.root)
+
+    @staticmethod
+    def key(dataset, name):
+        return f"{dataset}/{name}"
+
+    def load(self):
+        """Load the manifest; a missing or unreadable file starts empty."""
+        self.entries = {}
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Warning: ignoring unreadable render manifest {self.path}: {e}")
+            return self
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+            self.entries = data.get("entries", {})
+        return self
+
+    def save(self):
+        """Atomically write the manifest if it changed."""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        atomic_write_json(self.path, {"version": MANIFEST_VERSION, "entries": self.entries}, backups=0, indent=None)
+        self._dirty = False
+
+    def is_current(self, dataset, name, digest, png_path):
+        """
+        Check whether an item's PNG is up to date.
+
+        Returns:
+            bool: True if the recorded hash matches and the PNG exists
+        """
+        entry = self.entries.get(self.key(dataset, name))
+        return (entry is not None and entry.get("hash") == digest
+                and entry.get("png") == self._relative(png_path) and os.path.exists(png_path))
+
+    def record(self, dataset, name, digest, png_path):
+        """Record a successful render."""
+        self.entries[self.key(dataset, name)] = {"hash": digest, "png": self._relative(png_path)}
+        self._dirty = True
+
+    def forget(self, dataset, name):
+        """Drop an item, e.g. after a failed render."""
+        if self.entries.pop(self.key(dataset, name), None) is not None:
+            self._dirty = True
+
+    def prune(self, datasets, keep_keys):
+        """
+        Drop entries of the given datasets that are not in keep_keys.
+
+        Args:
+            datasets (set): Dataset names being rendered
+            keep_keys (set): Manifest keys of items still in those datasets
+
+        Returns:
+            list: Absolute PNG paths of the dropped entries
+        """
+        dropped = []
+        for key in list(self.entries):
+            dataset = key.split("/", 1)[0]
+            if dataset in datasets and key not in keep_keys:
+                dropped.append(self.entries.pop(key).get("png"))
+                self._dirty = True
+        return [os.path.join(self.root, png) for png in dropped if png]
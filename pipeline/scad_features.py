@@ -0,0 +1,480 @@
+"""
+Static features of OpenSCAD code, for estimating render cost.
+
+extract_features(code) parses the code (pipeline.scad_parser) and walks
+the tree the way OpenSCAD evaluates it, without building any geometry:
+for loops are expanded by their trip counts, user modules at each call
+site (with children() standing for the caller's children), and $fn/$fa/
+$fs follow OpenSCAD's dynamic scoping. Loop ranges, vectors, radii and
+$fn values are evaluated when they are built from literals, variables,
+arithmetic and a few built-in functions; a loop over anything else
+counts as UNKNOWN_TRIPS iterations.
+
+Counts are instances after expansion, so a cube in a 10 x 10 loop counts
+100 times. The features (FEATURES, all numbers) are:
+
+    code_length       characters of code
+    primitives        primitive instances, also split per primitive:
+    cube, sphere, cylinder, polyhedron, square, circle, polygon, text
+    extrusions        linear_extrude / rotate_extrude instances
+    csg_ops           union / difference / intersection instances
+    csg_depth         deepest nesting of CSG, hull and minkowski operations
+    hull, minkowski   hull / minkowski instances
+    loops             for / intersection_for statements in the code
+    loop_iterations   loop body executions after expansion
+    max_trips         largest trip count of a single loop
+    module_calls      user module instances
+    max_fn            largest $fn in effect at a round primitive
+    fragments         sum of the fragment counts of round primitives, as
+                      OpenSCAD derives them from $fn, $fa, $fs and the radius
+    polygons          estimated faces (3D) and edges (2D) of all primitives,
+                      multiplied out by rotate_extrude fragments and
+                      linear_extrude slices: the tessellation workload
+"""
+
+import math
+
+from pipeline.scad_parser import ScadSyntaxError, parse
+
+PRIMITIVES = ("cube", "sphere", "cylinder", "polyhedron", "square", "circle", "polygon", "text")
+FEATURES = ("code_length", "primitives") + PRIMITIVES + (
+    "extrusions", "csg_ops", "csg_depth", "hull", "minkowski", "loops", "loop_iterations", "max_trips",
+    "module_calls", "max_fn", "fragments", "polygons")
+
+_ROUND = ("sphere", "cylinder", "circle")
+_CSG = ("union", "difference", "intersection")
+_EXTRUSIONS = ("linear_extrude", "rotate_extrude")
+_LOOPS = ("for", "intersection_for")
+
+# Trip count assumed for a loop over a value that cannot be evaluated statically
+UNKNOWN_TRIPS = 8
+# Statement visits after which expansion stops (the features are already huge)
+MAX_VISITS = 100000
+# Trip counts beyond this are clamped
+MAX_TRIPS = 10 ** 9
+# Polygon estimates for primitives whose size cannot be evaluated statically
+UNKNOWN_POINTS = 16
+TEXT_POLYGONS = 40
+
+# OpenSCAD's defaults and minimum for round primitives
+DEFAULT_SPECIALS = {"$fn": 0.0, "$fa": 12.0, "$fs": 2.0}
+_GRID_FINE = 1e-8
+
+_FUNCTIONS = {
+    "abs": abs, "sign": lambda x: (x > 0) - (x < 0), "floor": math.floor, "ceil": math.ceil,
+    "round": lambda x: math.floor(x + 0.5), "sqrt": math.sqrt, "pow": math.pow, "exp": math.exp,
+    "ln": math.log, "log": math.log10,
+    "sin": lambda x: math.sin(math.radians(x)), "cos": lambda x: math.cos(math.radians(x)),
+    "tan": lambda x: math.tan(math.radians(x)),
+}
+
+
+class _Range:
+    """An evaluated [start : step : end] range."""
+
+    def __init__(self, start, step, end):
+        if step is None:
+            # OpenSCAD swaps the bounds of a reversed range without a step
+            start, end, step = min(start, end), max(start, end), 1.0
+        self.start = start
+        self.step = step
+        self.end = end
+
+    def trips(self):
+        # A negative step counts down, e.g. [10:-1:0] runs 11 times
+        span = self.end - self.start
+        if self.step == 0 or span * self.step < 0:
+            return 0
+        return min(MAX_TRIPS, int(math.floor(span / self.step + 1e-9)) + 1)
+
+    def middle(self):
+        return (self.start + self.end) / 2
+
+
+class _TooLarge(Exception):
+    """Raised when expansion reaches MAX_VISITS."""
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _bind(args, env):
+    """Evaluate let()-style assignments in order into a copy of env."""
+    env = dict(env)
+    for arg in args:
+        if arg.name is not None:
+            env[arg.name] = evaluate(arg.expr, env)
+    return env
+
+
+def evaluate(node, env):
+    """
+    Statically evaluate an expression.
+
+    Args:
+        node (Node): Expression node
+        env (dict): Variable name -> value (None for unknown)
+
+    Returns:
+        The value (float, bool, str, list or range), or None if it cannot be
+        determined without running the code
+    """
+    try:
+        return _evaluate(node, env)
+    except (TypeError, ValueError, ArithmeticError, IndexError, RecursionError):
+        return None
+
+
+def _evaluate(node, env):
+    kind = node.kind
+    if kind in ("number", "bool", "string"):
+        return node.value
+    if kind == "ident":
+        return env.get(node.name)
+    if kind == "vector":
+        if any(item.kind.startswith("lc_") for item in node.items):
+            return None
+        return [_evaluate(item, env) for item in node.items]
+    if kind == "range":
+        start = _evaluate(node.start, env)
+        step = _evaluate(node.step, env) if node.step is not None else None
+        end = _evaluate(node.end, env)
+        if _is_number(start) and _is_number(end) and (step is None or _is_number(step)):
+            return _Range(start, step, end)
+        return None
+    if kind == "unary":
+        value = _evaluate(node.operand, env)
+        if node.op == "!":
+            return None if value is None else not value
+        if not _is_number(value):
+            return None
+        return -value if node.op == "-" else value
+    if kind == "binary":
+        return _binary(node.op, _evaluate(node.left, env), _evaluate(node.right, env))
+    if kind == "ternary":
+        cond = _evaluate(node.cond, env)
+        if cond is None:
+            return None
+        return _evaluate(node.then if cond else node.else_, env)
+    if kind == "let_expr":
+        return _evaluate(node.expr, _bind(node.args, env))
+    if kind == "index":
+        target = _evaluate(node.target, env)
+        index = _evaluate(node.index, env)
+        if isinstance(target, list) and _is_number(index) and 0 <= index < len(target):
+            return target[int(index)]
+        return None
+    if kind == "call_expr" and node.callee.kind == "ident":
+        return _call(node.callee.name, [_evaluate(arg.expr, env) for arg in node.args])
+    return None
+
+
+def _binary(op, left, right):
+    if op == "&&":
+        return None if left is None or right is None else bool(left and right)
+    if op == "||":
+        return None if left is None or right is None else bool(left or right)
+    if not (_is_number(left) and _is_number(right)):
+        if op in ("==", "!=") and left is not None and right is not None:
+            return (left == right) == (op == "==")
+        return None
+    if op == "+":
+        return left + right
+    if op == "-":
+        return left - right
+    if op == "*":
+        return left * right
+    if op == "/":
+        return left / right
+    if op == "%":
+        return math.fmod(left, right)
+    if op == "^":
+        return math.pow(left, right)
+    if op == "<":
+        return left < right
+    if op == "<=":
+        return left <= right
+    if op == ">":
+        return left > right
+    if op == ">=":
+        return left >= right
+    if op == "==":
+        return left == right
+    if op == "!=":
+        return left != right
+    return None
+
+
+def _call(name, values):
+    if name == "len":
+        return len(values[0]) if len(values) == 1 and isinstance(values[0], (list, str)) else None
+    if name in ("min", "max"):
+        if len(values) == 1 and isinstance(values[0], list):
+            values = values[0]
+        if values and all(_is_number(value) for value in values):
+            return min(values) if name == "min" else max(values)
+        return None
+    function = _FUNCTIONS.get(name)
+    if function is None or not values or not all(_is_number(value) for value in values):
+        return None
+    return function(*values)
+
+
+def fragments(radius, env):
+    """
+    Fragments OpenSCAD uses for a circle of `radius` (get_fragments_from_r).
+
+    Args:
+        radius (float): Radius, or None if unknown (the $fa limit is used)
+        env (dict): Scope holding $fn, $fa and $fs
+
+    Returns:
+        int: Number of fragments
+    """
+    fn = env.get("$fn")
+    fa = env.get("$fa")
+    fs = env.get("$fs")
+    fn = fn if _is_number(fn) else 0.0
+    fa = fa if _is_number(fa) and fa > 0 else DEFAULT_SPECIALS["$fa"]
+    fs = fs if _is_number(fs) and fs > 0 else DEFAULT_SPECIALS["$fs"]
+    if radius is not None and radius < _GRID_FINE:
+        return 3
+    if fn > 0:
+        return min(MAX_TRIPS, int(max(fn, 3)))
+    if radius is None:
+        return int(math.ceil(max(360.0 / fa, 5)))
+    return int(math.ceil(max(min(360.0 / fa, radius * 2 * math.pi / fs), 5)))
+
+
+def _argument(args, name, position, env):
+    """Evaluate the argument passed by `name` or at `position`, or None."""
+    positional = [arg for arg in args if arg.name is None]
+    for arg in args:
+        if arg.name == name:
+            return evaluate(arg.expr, env)
+    if position < len(positional):
+        return evaluate(positional[position].expr, env)
+    return None
+
+
+def _polygon_count(name, args, env, n):
+    """Estimated faces (3D) or edges (2D) of one primitive with `n` fragments."""
+    if name == "cube":
+        return 6
+    if name == "square":
+        return 4
+    if name == "circle":
+        return n
+    if name == "cylinder":
+        return n + 2
+    if name == "sphere":
+        # (n + 1) / 2 rings of n fragments
+        return n * ((n + 1) // 2)
+    if name == "text":
+        value = _argument(args, "text", 0, env)
+        return TEXT_POLYGONS * (len(value) if isinstance(value, str) else 8)
+    value = _argument(args, "points", 0, env) if name == "polygon" else _argument(args, "faces", 1, env)
+    return len(value) if isinstance(value, list) else UNKNOWN_POINTS
+
+
+def _extrusion_factor(name, args, env):
+    """How many times an extrusion repeats the outline of its 2D children."""
+    if name == "rotate_extrude":
+        return fragments(None, env)
+    slices = _argument(args, "slices", 5, env)
+    if _is_number(slices) and slices >= 1:
+        return int(slices)
+    twist = _argument(args, "twist", 2, env)
+    if _is_number(twist) and twist:
+        # OpenSCAD derives the slices of a twisted extrusion from the fragments
+        return max(1, int(math.ceil(fragments(None, env) * abs(twist) / 360)))
+    return 1
+
+
+def _radius(name, args, env):
+    """Largest radius given to a sphere, cylinder or circle call, or None."""
+    radii = []
+    positional = [arg for arg in args if arg.name is None]
+    # cylinder(h, r1, r2, center); sphere(r) and circle(r)
+    positions = (1, 2) if name == "cylinder" else (0,)
+    for index in positions:
+        if index < len(positional):
+            radii.append(evaluate(positional[index].expr, env))
+    for arg in args:
+        if arg.name in ("r", "r1", "r2"):
+            radii.append(evaluate(arg.expr, env))
+        elif arg.name in ("d", "d1", "d2"):
+            value = evaluate(arg.expr, env)
+            radii.append(value / 2 if _is_number(value) else None)
+    radii = [value for value in radii if _is_number(value)]
+    return max(radii) if radii else (1.0 if not args else None)
+
+
+class _Walker:
+    def __init__(self, features):
+        self.features = features
+        self.modules = {}
+        self.globals = {}
+        self.expanding = []
+        self.visits = 0
+
+    def scope(self, body, env):
+        """Register the module definitions and evaluate the assignments of a block."""
+        env = dict(env)
+        for statement in body:
+            if statement.kind == "module_def":
+                self.modules[statement.name] = statement
+            elif statement.kind == "assign":
+                env[statement.name] = evaluate(statement.expr, env)
+        return env
+
+    def statements(self, body, env, count, depth, children):
+        for statement in body:
+            kind = statement.kind
+            if kind == "call":
+                self.call(statement, env, count, depth, children)
+            elif kind == "block":
+                self.statements(statement.body, self.scope(statement.body, env), count, depth, children)
+            elif kind == "if":
+                cond = evaluate(statement.cond, env)
+                if cond is None or cond:
+                    self.child(statement.then, env, count, depth, children)
+                if cond is None or not cond:
+                    self.child(statement.else_, env, count, depth, children)
+
+    def child(self, node, env, count, depth, children):
+        if node is not None:
+            self.statements([node], env, count, depth, children)
+
+    def call(self, statement, env, count, depth, children):
+        self.visits += 1
+        if self.visits > MAX_VISITS:
+            raise _TooLarge()
+        features = self.features
+        name = statement.name
+        args = statement.args
+
+        # Special variables passed as arguments apply to the call and its children
+        if any(arg.name is not None and arg.name.startswith("$") for arg in args):
+            env = dict(env)
+            for arg in args:
+                if arg.name is not None and arg.name.startswith("$"):
+                    env[arg.name] = evaluate(arg.expr, env)
+
+        if name in _LOOPS:
+            env = dict(env)
+            trips = 1
+            for arg in args:
+                value = evaluate(arg.expr, env)
+                if isinstance(value, _Range):
+                    arg_trips = value.trips()
+                    middle = value.middle()
+                elif isinstance(value, list):
+                    arg_trips = len(value)
+                    middle = value[len(value) // 2] if value else None
+                elif value is None:
+                    arg_trips, middle = UNKNOWN_TRIPS, None
+                else:
+                    arg_trips, middle = 1, value
+                if arg.name is not None:
+                    env[arg.name] = middle
+                trips = min(MAX_TRIPS, trips * arg_trips)
+            features["loops"] += 1
+            features["loop_iterations"] += count * trips
+            features["max_trips"] = max(features["max_trips"], trips)
+            if trips:
+                self.child(statement.child, env, count * trips, depth, children)
+        elif name == "let":
+            self.child(statement.child, _bind(args, env), count, depth, children)
+        elif name in PRIMITIVES:
+            features[name] += count
+            features["primitives"] += count
+            n = 0
+            if name in _ROUND:
+                n = fragments(_radius(name, args, env), env)
+                features["fragments"] += count * n
+                fn = env.get("$fn")
+                if _is_number(fn):
+                    features["max_fn"] = max(features["max_fn"], fn)
+            features["polygons"] += count * _polygon_count(name, args, env, n)
+        elif name in _CSG or name in ("hull", "minkowski"):
+            features["csg_ops" if name in _CSG else name] += count
+            features["csg_depth"] = max(features["csg_depth"], depth + 1)
+            self.child(statement.child, env, count, depth + 1, children)
+        elif name == "children":
+            if children is not None:
+                node, caller_env, caller_children = children
+                self.child(node, caller_env, count, depth, caller_children)
+        elif name in self.modules:
+            if name in self.expanding:
+                # Recursive module: count the call, don't expand it again
+                features["module_calls"] += count
+                return
+            features["module_calls"] += count
+            self.module(self.modules[name], statement, env, count, depth, children)
+        elif name in _EXTRUSIONS:
+            features["extrusions"] += count
+            before = features["polygons"]
+            self.child(statement.child, env, count, depth, children)
+            features["polygons"] += (features["polygons"] - before) * (_extrusion_factor(name, args, env) - 1)
+        else:
+            # Transforms, color, render, unknown library modules, ...
+            self.child(statement.child, env, count, depth, children)
+
+    def module(self, definition, statement, env, count, depth, children):
+        # Lexical scope of the definition (approximated by the file scope) plus dynamic $ variables
+        module_env = dict(self.globals)
+        module_env.update((name, value) for name, value in env.items() if name.startswith("$"))
+        for param in definition.params:
+            module_env[param.name] = evaluate(param.default, module_env) if param.default is not None else None
+        positional = [param.name for param in definition.params]
+        index = 0
+        for arg in statement.args:
+            if arg.name is None:
+                if index < len(positional):
+                    module_env[positional[index]] = evaluate(arg.expr, env)
+                index += 1
+            elif not arg.name.startswith("$"):
+                module_env[arg.name] = evaluate(arg.expr, env)
+
+        self.expanding.append(definition.name)
+        try:
+            body = definition.body
+            if body.kind == "block":
+                module_env = self.scope(body.body, module_env)
+                self.statements(body.body, module_env, count, depth, (statement.child, env, children))
+            else:
+                self.statements([body], module_env, count, depth, (statement.child, env, children))
+        finally:
+            self.expanding.pop()
+
+
+def extract_features(code, tree=None):
+    """
+    Compute the static cost features of OpenSCAD code.
+
+    Args:
+        code (str): OpenSCAD code
+        tree (Node): Its parse tree, if already parsed
+
+    Returns:
+        dict: Feature name -> number for every name in FEATURES, or None if
+        the code has a syntax error
+    """
+    if tree is None:
+        try:
+            tree = parse(code)
+        except (ScadSyntaxError, RecursionError):
+            return None
+
+    features = dict.fromkeys(FEATURES, 0)
+    features["code_length"] = len(code)
+    walker = _Walker(features)
+    try:
+        env = walker.scope(tree.body, DEFAULT_SPECIALS)
+        walker.globals = env
+        walker.statements(tree.body, env, 1, 0, None)
+    except (_TooLarge, RecursionError):
+        pass
+    return features
@@ -0,0 +1,604 @@
+"""
+Pure-Python OpenSCAD tokenizer and parser.
+
+Generated code often fails for purely syntactic reasons: unbalanced
+braces, leftover markdown fences or a sentence of prose. Spawning
+OpenSCAD to find that out costs a process start per item; parse() finds
+it in-process in about a millisecond for a typical model, raising
+ScadSyntaxError with the line and column of the problem.
+
+The grammar follows OpenSCAD's parser.y (2021.01), including list
+comprehensions, function literals and let/assert/echo expressions, plus
+the bitwise operators of newer releases. It deliberately accepts a small
+superset (module and function definitions in any block, let/assert/echo
+in any expression position) so that code OpenSCAD accepts is never
+rejected here.
+
+parse() returns a tree of Node objects that later passes can reuse.
+Every node has `kind` and `offset` (character offset in the source)
+plus kind-specific fields:
+
+    Statements
+        file            body
+        block           body
+        empty
+        use, include    path
+        assign          name, expr
+        module_def      name, params, body
+        function_def    name, params, expr
+        call            name, args, child, modifiers   (child is None for ";")
+        if              cond, then, else_
+    Expressions
+        number, string, bool    value
+        undef
+        ident           name
+        range           start, step, end               (step may be None)
+        vector          items
+        unary           op, operand
+        binary          op, left, right
+        ternary         cond, then, else_
+        call_expr       callee, args
+        index           target, index
+        member          target, name
+        function_literal  params, expr
+        let_expr        args, expr
+        assert_expr, echo_expr  args, expr             (expr may be None)
+    List comprehension elements
+        lc_for          args, body
+        lc_for_c        init, cond, update, body
+        lc_if           cond, then, else_
+        lc_let          args, body
+        lc_each         body
+    Arguments and parameters
+        arg             name, expr                     (name is None if positional)
+        param           name, default
+"""
+
+import re
+
+# Whitespace and comments are skipped in front of every token
+_TOKEN = re.compile(r"""
+    (?:\s+|//[^\n]*|/\*.*?\*/)*
+    (?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<id>\$?[A-Za-z0-9_]+)
+      | (?P<string>"(?:[^"\\]|\\.)*")
+      | (?P<unterminated>/\*|")
+      | (?P<op><=|>=|==|!=|&&|\|\||<<|>>|[-+*/%^!?:;,.()\[\]{}=<>#&|~])
+      | (?P<end>\Z)
+      | (?P<bad>.)
+    )
+""", re.VERBOSE | re.DOTALL)
+
+_IDENT = re.compile(r"\$?[A-Za-z0-9_]+")
+_IMPORT_PATH = re.compile(r"\s*<([^\t\r\n>]*)>")
+_IDENT_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_")
+
+KEYWORDS = frozenset(("module", "function", "if", "else", "for", "let", "each", "assert", "echo",
+                      "true", "false", "undef"))
+# Keywords that can name a module instantiation
+_MODULE_KEYWORDS = frozenset(("for", "let", "assert", "echo", "each"))
+# Keywords that start an expression
+_EXPR_KEYWORDS = frozenset(("true", "false", "undef", "function", "let", "assert", "echo"))
+_MODIFIERS = frozenset("!#%*")
+_UNARY = frozenset("-+!~")
+_EXPR_START = frozenset(("number", "string", "(", "[")) | _UNARY
+
+# Binary operator precedence, loosest first; "^" binds tighter than unary minus and is handled apart
+_BINARY = {"||": 1, "&&": 2, "|": 3, "&": 4, "==": 5, "!=": 5, "<": 6, "<=": 6, ">": 6, ">=": 6,
+           "<<": 7, ">>": 7, "+": 8, "-": 8, "*": 9, "/": 9, "%": 9}
+
+# Tokens past the end, so the parser can look ahead without bounds checks
+_LOOKAHEAD = 3
+
+
+class ScadSyntaxError(ValueError):
+    """
+    Raised for OpenSCAD code that cannot be parsed.
+
+    Attributes:
+        message (str): What was wrong
+        offset (int): Character offset of the problem
+        line (int): 1-based line
+        column (int): 1-based column
+    """
+
+    def __init__(self, message, code, offset):
+        self.message = message
+        self.offset = offset
+        self.line = code.count("\n", 0, offset) + 1
+        self.column = offset - code.rfind("\n", 0, offset)
+        super().__init__(f"line {self.line}, column {self.column}: {message}")
+
+
+class Node:
+    """One syntax tree node; see the module docstring for the fields of each kind."""
+
+    def __init__(self, kind, offset, **fields):
+        self.kind = kind
+        self.offset = offset
+        self.__dict__.update(fields)
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.__dict__.items() if k not in ("kind", "offset"))
+        return f"Node({self.kind!r}, {fields})" if fields else f"Node({self.kind!r})"
+
+    def children(self):
+        """Yield the direct child nodes, in source order."""
+        for value in self.__dict__.values():
+            if isinstance(value, Node):
+                yield value
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, Node):
+                        yield item
+
+    def walk(self):
+        """Yield this node and all its descendants, depth first."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(list(node.children())))
+
+
+def tokenize(code):
+    """
+    Split OpenSCAD code into tokens.
+
+    Args:
+        code (str): OpenSCAD code
+
+    Returns:
+        list: (kind, value, offset) tuples. kind is "number", "string", "id",
+        "use", "include", "eof", or the operator itself for operators.
+
+    Raises:
+        ScadSyntaxError: On a character or literal OpenSCAD cannot tokenize
+    """
+    tokens = []
+    append = tokens.append
+    match = _TOKEN.match
+    n = len(code)
+    pos = 0
+    while True:
+        m = match(code, pos)
+        kind = m.lastgroup
+        start = m.start(kind)
+        end = m.end()
+        if kind == "op":
+            op = m.group(kind)
+            append((op, op, start))
+        elif kind == "id":
+            value = m.group(kind)
+            path = _IMPORT_PATH.match(code, end) if value in ("use", "include") else None
+            if path is not None:
+                append((value, path.group(1), start))
+                end = path.end()
+            else:
+                append(("id", value, start))
+        elif kind == "number":
+            # Like OpenSCAD's lexer, the longest match wins: "2d" is an identifier
+            if end < n and code[end] in _IDENT_CHARS:
+                ident = _IDENT.match(code, start)
+                if ident.end() > end:
+                    end = ident.end()
+                    append(("id", code[start:end], start))
+                    pos = end
+                    continue
+            append(("number", float(m.group(kind)), start))
+        elif kind == "string":
+            append(("string", m.group(kind)[1:-1], start))
+        elif kind == "end":
+            break
+        elif kind == "unterminated":
+            what = "comment" if code.startswith("/*", start) else "string"
+            raise ScadSyntaxError(f"unterminated {what}", code, start)
+        else:
+            raise ScadSyntaxError(f"unexpected character {code[start]!r}", code, start)
+        pos = end
+    tokens.extend([("eof", None, n)] * _LOOKAHEAD)
+    return tokens
+
+
+def _describe(token):
+    kind, value, _ = token
+    if kind == "eof":
+        return "end of input"
+    if kind == "id":
+        return f"keyword {value!r}" if value in KEYWORDS else f"identifier {value!r}"
+    if kind == "number":
+        return f"number {value:g}"
+    if kind == "string":
+        return "string"
+    if kind in ("use", "include"):
+        return f"'{kind}'"
+    return repr(value)
+
+
+class _Parser:
+    def __init__(self, code):
+        self.code = code
+        self.tokens = tokenize(code)
+        self.i = 0
+
+    # Token helpers
+
+    def error(self, message, token=None):
+        token = token or self.tokens[self.i]
+        raise ScadSyntaxError(message, self.code, token[2])
+
+    def accept(self, kind):
+        if self.tokens[self.i][0] == kind:
+            self.i += 1
+            return True
+        return False
+
+    def expect(self, kind):
+        token = self.tokens[self.i]
+        if token[0] != kind:
+            self.error(f"expected '{kind}', found {_describe(token)}")
+        self.i += 1
+        return token
+
+    def expect_name(self, what):
+        token = self.tokens[self.i]
+        if token[0] != "id" or token[1] in KEYWORDS:
+            self.error(f"expected {what}, found {_describe(token)}")
+        self.i += 1
+        return token[1]
+
+    def keyword_call(self, ahead=0):
+        """Keyword of an `id (` pair at the cursor, or None."""
+        kind, value, _ = self.tokens[self.i + ahead]
+        if kind == "id" and self.tokens[self.i + ahead + 1][0] == "(":
+            return value
+        return None
+
+    # Statements
+
+    def parse_file(self):
+        body = []
+        while self.tokens[self.i][0] != "eof":
+            body.append(self.statement())
+        return Node("file", 0, body=body)
+
+    def statement(self):
+        kind, value, offset = token = self.tokens[self.i]
+        if kind == ";":
+            self.i += 1
+            return Node("empty", offset)
+        if kind == "{":
+            self.i += 1
+            body = []
+            while not self.accept("}"):
+                if self.tokens[self.i][0] == "eof":
+                    self.error("'{' is never closed", token)
+                body.append(self.statement())
+            return Node("block", offset, body=body)
+        if kind in _MODIFIERS:
+            return self.instantiation()
+        if kind == "use" or kind == "include":
+            self.i += 1
+            return Node(kind, offset, path=value)
+        if kind != "id":
+            self.error(f"expected a statement, found {_describe(token)}")
+        if value == "module":
+            self.i += 1
+            name = self.expect_name("a module name")
+            params = self.parameters()
+            return Node("module_def", offset, name=name, params=params, body=self.statement())
+        if value == "function":
+            self.i += 1
+            name = self.expect_name("a function name")
+            params = self.parameters()
+            self.expect("=")
+            expr = self.expr()
+            self.expect(";")
+            return Node("function_def", offset, name=name, params=params, expr=expr)
+        if self.tokens[self.i + 1][0] == "=" and value not in KEYWORDS:
+            self.i += 2
+            expr = self.expr()
+            self.expect(";")
+            return Node("assign", offset, name=value, expr=expr)
+        return self.instantiation()
+
+    def instantiation(self):
+        offset = self.tokens[self.i][2]
+        modifiers = ""
+        while self.tokens[self.i][0] in _MODIFIERS:
+            modifiers += self.tokens[self.i][0]
+            self.i += 1
+
+        kind, value, _ = token = self.tokens[self.i]
+        if kind == "id" and value == "if":
+            self.i += 1
+            self.expect("(")
+            cond = self.expr()
+            self.expect(")")
+            then = self.child()
+            else_ = None
+            if self.tokens[self.i][1] == "else" and self.tokens[self.i][0] == "id":
+                self.i += 1
+                else_ = self.child()
+            return Node("if", offset, cond=cond, then=then, else_=else_, modifiers=modifiers)
+        if kind != "id" or (value in KEYWORDS and value not in _MODULE_KEYWORDS):
+            self.error(f"expected a module instantiation, found {_describe(token)}")
+        self.i += 1
+        following = self.tokens[self.i]
+        if following[0] != "(":
+            if following[0] == "id" and not modifiers:
+                self.error(f"unexpected {_describe(following)} after {_describe(token)}"
+                           f" (prose or a missing ';'?)")
+            self.error(f"expected '(' after {_describe(token)}, found {_describe(following)}")
+        args = self.arguments()
+        return Node("call", offset, name=value, args=args, child=self.child(), modifiers=modifiers)
+
+    def child(self):
+        """Statement following a module instantiation; None for a bare ';'."""
+        if self.accept(";"):
+            return None
+        if self.tokens[self.i][0] == "eof":
+            self.error("expected a child statement or ';', found end of input")
+        return self.statement()
+
+    def parameters(self):
+        self.expect("(")
+        params = []
+        while True:
+            while self.accept(","):
+                pass
+            if self.accept(")"):
+                return params
+            offset = self.tokens[self.i][2]
+            name = self.expect_name("a parameter name")
+            default = self.expr() if self.accept("=") else None
+            params.append(Node("param", offset, name=name, default=default))
+            if self.tokens[self.i][0] not in (",", ")"):
+                self.error(f"expected ',' or ')', found {_describe(self.tokens[self.i])}")
+
+    def arguments(self):
+        self.expect("(")
+        args = self.argument_list((")",))
+        self.i += 1
+        return args
+
+    def argument_list(self, closers):
+        """Arguments up to one of the `closers` tokens, which is left unconsumed."""
+        args = []
+        tokens = self.tokens
+        while True:
+            while self.accept(","):
+                pass
+            kind, value, offset = tokens[self.i]
+            if kind in closers:
+                return args
+            if kind == "id" and tokens[self.i + 1][0] == "=" and value not in KEYWORDS:
+                self.i += 2
+                args.append(Node("arg", offset, name=value, expr=self.expr()))
+            else:
+                args.append(Node("arg", offset, name=None, expr=self.expr()))
+            if tokens[self.i][0] != "," and tokens[self.i][0] not in closers:
+                expected = " or ".join(f"'{c}'" for c in closers)
+                self.error(f"expected ',' or {expected}, found {_describe(tokens[self.i])}")
+
+    # Expressions
+
+    def starts_expr(self):
+        kind, value, _ = self.tokens[self.i]
+        if kind == "id":
+            return value not in KEYWORDS or value in _EXPR_KEYWORDS
+        return kind in _EXPR_START
+
+    def expr(self):
+        kind, value, offset = self.tokens[self.i]
+        if kind == "id" and value in ("function", "let", "assert", "echo") and self.tokens[self.i + 1][0] == "(":
+            self.i += 1
+            if value == "function":
+                params = self.parameters()
+                return Node("function_literal", offset, params=params, expr=self.expr())
+            args = self.arguments()
+            if value == "let":
+                return Node("let_expr", offset, args=args, expr=self.expr())
+            expr = self.expr() if self.starts_expr() else None
+            return Node(f"{value}_expr", offset, args=args, expr=expr)
+        cond = self.binary(1)
+        if self.tokens[self.i][0] == "?":
+            self.i += 1
+            then = self.expr()
+            self.expect(":")
+            return Node("ternary", offset, cond=cond, then=then, else_=self.expr())
+        return cond
+
+    def binary(self, min_precedence):
+        """Binary operators of at least `min_precedence`, by precedence climbing."""
+        left = self.unary()
+        tokens = self.tokens
+        while True:
+            kind, _, offset = tokens[self.i]
+            precedence = _BINARY.get(kind)
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.i += 1
+            left = Node("binary", offset, op=kind, left=left, right=self.binary(precedence + 1))
+
+    def unary(self):
+        kind, _, offset = self.tokens[self.i]
+        if kind in _UNARY:
+            self.i += 1
+            return Node("unary", offset, op=kind, operand=self.unary())
+        base = self.postfix()
+        kind, _, offset = self.tokens[self.i]
+        if kind == "^":
+            self.i += 1
+            return Node("binary", offset, op="^", left=base, right=self.unary())
+        return base
+
+    def postfix(self):
+        node = self.primary()
+        tokens = self.tokens
+        while True:
+            kind, _, offset = tokens[self.i]
+            if kind == "(":
+                node = Node("call_expr", offset, callee=node, args=self.arguments())
+            elif kind == "[":
+                self.i += 1
+                index = self.expr()
+                self.expect("]")
+                node = Node("index", offset, target=node, index=index)
+            elif kind == ".":
+                self.i += 1
+                node = Node("member", offset, target=node, name=self.expect_name("a member name"))
+            else:
+                return node
+
+    def primary(self):
+        kind, value, offset = token = self.tokens[self.i]
+        if kind == "id":
+            if value not in KEYWORDS:
+                self.i += 1
+                return Node("ident", offset, name=value)
+            if value == "true" or value == "false":
+                self.i += 1
+                return Node("bool", offset, value=value == "true")
+            if value == "undef":
+                self.i += 1
+                return Node("undef", offset)
+            if value in ("function", "let", "assert", "echo") and self.tokens[self.i + 1][0] == "(":
+                return self.expr()
+            self.error(f"unexpected {_describe(token)} in an expression")
+        if kind == "number" or kind == "string":
+            self.i += 1
+            return Node(kind, offset, value=value)
+        if kind == "(":
+            self.i += 1
+            expr = self.expr()
+            if self.tokens[self.i][0] != ")":
+                self.error(f"expected ')', found {_describe(self.tokens[self.i])}")
+            self.i += 1
+            return expr
+        if kind == "[":
+            return self.vector()
+        self.error(f"expected an expression, found {_describe(token)}")
+
+    def vector(self):
+        open_token = self.expect("[")
+        offset = open_token[2]
+        while self.accept(","):
+            pass
+        if self.accept("]"):
+            return Node("vector", offset, items=[])
+        first = self.element()
+        if self.tokens[self.i][0] == ":" and not first.kind.startswith("lc_"):
+            self.i += 1
+            second = self.expr()
+            if self.accept(":"):
+                third = self.expr()
+                self.expect("]")
+                return Node("range", offset, start=first, step=second, end=third)
+            self.expect("]")
+            return Node("range", offset, start=first, step=None, end=second)
+        items = [first]
+        while True:
+            if self.accept("]"):
+                return Node("vector", offset, items=items)
+            if not self.accept(","):
+                if self.tokens[self.i][0] == "eof":
+                    self.error("'[' is never closed", open_token)
+                self.error(f"expected ',' or ']', found {_describe(self.tokens[self.i])}")
+            while self.accept(","):
+                pass
+            if self.accept("]"):
+                return Node("vector", offset, items=items)
+            items.append(self.element())
+
+    def element(self):
+        """A vector element: an expression or a list comprehension."""
+        kind, value, offset = self.tokens[self.i]
+        if kind == "id":
+            if value == "each":
+                self.i += 1
+                return Node("lc_each", offset, body=self.element())
+            keyword = self.keyword_call()
+            if keyword == "for" or keyword == "if":
+                return self.comprehension()
+            if keyword == "let":
+                self.i += 1
+                args = self.arguments()
+                if self.starts_comprehension():
+                    return Node("lc_let", offset, args=args, body=self.element())
+                return Node("let_expr", offset, args=args, expr=self.expr())
+        elif kind == "(" and self.starts_comprehension(1):
+            self.i += 1
+            node = self.element()
+            self.expect(")")
+            return node
+        return self.expr()
+
+    def starts_comprehension(self, ahead=0):
+        kind, value, _ = self.tokens[self.i + ahead]
+        if kind == "id":
+            return value == "each" or self.keyword_call(ahead) in ("for", "if", "let")
+        return kind == "(" and self.starts_comprehension(ahead + 1)
+
+    def comprehension(self):
+        value, offset = self.tokens[self.i][1:]
+        self.i += 1
+        if value == "if":
+            self.expect("(")
+            cond = self.expr()
+            self.expect(")")
+            then = self.element()
+            else_ = None
+            if self.tokens[self.i][1] == "else" and self.tokens[self.i][0] == "id":
+                self.i += 1
+                else_ = self.element()
+            return Node("lc_if", offset, cond=cond, then=then, else_=else_)
+
+        # for (...) or C-style for (init; cond; update)
+        self.expect("(")
+        args = self.argument_list((")", ";"))
+        if self.accept(";"):
+            cond = self.expr()
+            self.expect(";")
+            update = self.argument_list((")",))
+            self.expect(")")
+            return Node("lc_for_c", offset, init=args, cond=cond, update=update, body=self.element())
+        self.expect(")")
+        return Node("lc_for", offset, args=args, body=self.element())
+
+
+def parse(code):
+    """
+    Parse OpenSCAD code into a syntax tree.
+
+    Args:
+        code (str): OpenSCAD code
+
+    Returns:
+        Node: The "file" node
+
+    Raises:
+        ScadSyntaxError: If the code is not valid OpenSCAD syntax
+    """
+    return _Parser(code).parse_file()
+
+
+def check_syntax(code):
+    """
+    Check OpenSCAD code for syntax errors without raising.
+
+    Args:
+        code (str): OpenSCAD code
+
+    Returns:
+        ScadSyntaxError: The first error, or None if the code parses
+    """
+    try:
+        parse(code)
+    except ScadSyntaxError as e:
+        return e
+    except RecursionError:
+        # Pathologically deep nesting; leave the verdict to OpenSCAD
+        return None
+    return None
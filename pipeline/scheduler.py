@@ -0,0 +1,159 @@
+"""
+Global scheduler for generating several categories over one worker pool.
+
+The Scheduler is the item source a StagePipeline pulls from. It interleaves
+the pending items of every selected category in proportion to their
+weights (stride scheduling), respects per-category quotas, and stops
+handing out a category's items once its dataset holds the target number of
+renderable entries. Because all categories share one bounded pool of LLM
+and render workers, a full refresh takes roughly as long as the busiest
+resource rather than the sum of per-category runs.
+"""
+
+import threading
+
+# Why a category stopped being scheduled
+TARGET_REACHED = "target reached"
+QUOTA_USED = "quota used"
+LIST_DONE = "list done"
+
+
+class _Lane:
+    """Scheduling state for one CategoryRun."""
+
+    def __init__(self, run):
+        self.run = run
+        self.position = 0
+        self.issued = 0
+        self.in_flight = 0
+        self.pass_value = 0.0
+        self.stride = 1.0 / run.weight
+
+    def names_left(self):
+        return len(self.run.todo) - self.position
+
+    def quota_left(self):
+        if self.run.quota is None:
+            return self.names_left()
+        return min(self.names_left(), self.run.quota - self.issued)
+
+    def target_gap(self):
+        """Renderable items still needed, counting in-flight items as successes."""
+        if self.run.target is None:
+            return None
+        return self.run.target - self.run.successful - self.in_flight
+
+    def stop_reason(self):
+        """Return why this lane is finished, or None if it may still issue items."""
+        if self.run.target is not None and self.run.successful >= self.run.target:
+            return TARGET_REACHED
+        if self.names_left() <= 0:
+            return LIST_DONE
+        if self.quota_left() <= 0:
+            return QUOTA_USED
+        return None
+
+    def eligible(self):
+        if self.stop_reason() is not None:
+            return False
+        gap = self.target_gap()
+        return gap is None or gap > 0
+
+
+class Scheduler:
+    """
+    Weighted, quota- and target-aware item feed shared by several categories.
+
+    Iterating yields (run, item_name) pairs. Items in flight count towards a
+    category's target so it is not overshot; if they fail to render, the
+    category is scheduled again. Call complete() for every item once its
+    result has been recorded, and close() when the run ends early.
+
+    Args:
+        runs (list): CategoryRun objects; their weight, quota and target
+            attributes control scheduling
+    """
+
+    def __init__(self, runs):
+        for run in runs:
+            if run.weight <= 0:
+                raise ValueError(f"{run.category.name}: weight must be positive, got {run.weight}")
+        self._cond = threading.Condition()
+        self._lanes = {id(run): _Lane(run) for run in runs}
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise StopIteration
+                eligible = [lane for lane in self._lanes.values() if lane.eligible()]
+                if eligible:
+                    lane = min(eligible, key=lambda l: l.pass_value)
+                    item_name = lane.run.todo[lane.position]
+                    lane.position += 1
+                    lane.issued += 1
+                    lane.in_flight += 1
+                    lane.pass_value += lane.stride
+                    return lane.run, item_name
+
+                # Nothing to hand out now; wait if in-flight failures could reopen a category
+                if not any(lane.in_flight and lane.stop_reason() is None for lane in self._lanes.values()):
+                    raise StopIteration
+                self._cond.wait()
+
+    def complete(self, run):
+        """
+        Mark one of run's items as recorded.
+
+        Call after the run's counters have been updated for the item.
+
+        Args:
+            run (CategoryRun): The run the item came from
+        """
+        with self._cond:
+            self._lanes[id(run)].in_flight -= 1
+            self._cond.notify_all()
+
+    def close(self):
+        """Stop handing out items and release any waiting worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def remaining(self):
+        """
+        Estimate how many items have yet to complete.
+
+        Returns:
+            int: In-flight items plus those still to be handed out, assuming
+                in-flight items all render
+        """
+        with self._cond:
+            total = 0
+            for lane in self._lanes.values():
+                total += lane.in_flight
+                if lane.stop_reason() is not None:
+                    continue
+                left = lane.quota_left()
+                gap = lane.target_gap()
+                if gap is not None:
+                    left = min(left, max(0, gap))
+                total += left
+            return total
+
+    def status(self):
+        """
+        Get per-category scheduling status.
+
+        Returns:
+            dict: category name -> (items issued, stop reason or None)
+        """
+        with self._cond:
+            return {
+                lane.run.category.name: (lane.issued, lane.stop_reason())
+                for lane in self._lanes.values()
+            }
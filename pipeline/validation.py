@@ -0,0 +1,434 @@
+"""
+Tiered OpenSCAD validation.
+
+Checking that generated code is usable can cost anything from a parse to
+a full render, and callers need different fidelity. This module exposes
+the checks as explicit tiers, cheapest first:
+
+    syntax  in-process parse (pipeline.scad_parser): syntax errors,
+            without starting OpenSCAD
+    ast     parse only (AST export): syntax errors, missing includes
+    csg     CSG tree export: evaluates modules, loops and variables,
+            no geometry
+    stl     full mesh evaluation (STL export): CGAL/Manifold geometry
+    png     PNG render on a virtual display: an OpenCSG preview
+
+stl and png are separate branches above csg, not a ladder: a preview
+needs no manifold mesh, so 2D, empty and non-manifold models pass png
+but fail stl.
+
+validate(code, tier) runs the syntax tier, then only the requested tier.
+The syntax tier is free, so code that cannot parse never costs an
+OpenSCAD process; the OpenSCAD tiers each start a process, and running
+the cheaper ones first only pays off when many items fail there. With
+escalate=True the call climbs the tier's chain instead (syntax, ast,
+csg, then stl or png) and stops at the first failure. OpenSCAD results
+go through the shared render cache. A success
+at a tier implies success at every tier below it in its chain, and a
+failure there implies failure at the tier, so no tier is run twice for
+the same code.
+
+The question asked at the stl and png tiers is usually "does this
+evaluate", not "how does it look", yet their cost is dominated by
+tessellating curved primitives. lowres=True runs them with
+-D '$fn=8' (plus coarse $fa/$fs) and rewrites explicit $fn/$fa/$fs
+assignments in the code to clamp them to the same resolution. Low-res
+results are cached separately from full-resolution ones; final PNGs
+(render/render.py) are always rendered at full resolution.
+
+Timeouts are per item by default: when the render-cost model
+(pipeline.cost_model) has a fit for a tier, the tier gets a timeout
+predicted from the code's static features, and `timeout` only applies
+to tiers without a fit. adaptive=False always uses `timeout`.
+
+With a budget (pipeline.render_budget.Budget), the syntax tier also
+estimates the primitive and polygon count from loop ranges and $fn.
+Code over budget fails with reason BUDGET, or is validated at most at
+the csg tier when the budget downtiers it, before OpenSCAD is started.
+
+Every call records its cost per tier in the process-wide stats(); a
+caller validating on a process pool can fold the returned results into
+its own TierStats instead.
+"""
+
+import os
+import re
+import time
+import tempfile
+import threading
+import subprocess
+
+from pipeline.displays import run_with_display
+from pipeline.render_cache import cached_run, get_render_cache, is_environment_failure
+from pipeline.cost_model import get_cost_model
+from pipeline.render_budget import estimate
+from pipeline.scad_features import extract_features
+from pipeline.scad_parser import ScadSyntaxError, parse
+
+SYNTAX = "syntax"
+PARSE = "ast"
+CSG = "csg"
+MESH = "stl"
+PNG = "png"
+TIERS = (SYNTAX, PARSE, CSG, MESH, PNG)
+# Tiers each tier builds on: its success implies theirs
+_PREREQUISITES = {
+    SYNTAX: (),
+    PARSE: (SYNTAX,),
+    CSG: (SYNTAX, PARSE),
+    MESH: (SYNTAX, PARSE, CSG),
+    PNG: (SYNTAX, PARSE, CSG),
+}
+
+DEFAULT_TIMEOUT = 30
+
+# Failure reasons
+FAILED = "failed"
+TIMEOUT = "timeout"
+UNAVAILABLE = "unavailable"
+BUDGET = "budget"
+
+# Render cache mode per OpenSCAD tier (the syntax tier is not cached); png matches the thumbnails total/combine.py used to render
+TIER_MODES = {PARSE: "ast", CSG: "csg", MESH: "stl", PNG: "png-100"}
+# Full-size renders from render/render.py imply the png tier and everything below it
+_EXTRA_IMPLIED = ("png-800",)
+_PNG_FLAGS = ['--imgsize=100,100']
+
+# Low-resolution overrides: at most 8 fragments per circle
+LOWRES_FN = 8
+LOWRES_FA = 45
+LOWRES_FS = 2
+# Tiers whose cost depends on tessellation
+_TESSELLATED = (MESH, PNG)
+_LOWRES_SUFFIX = "-lowres"
+
+_SCAN = re.compile(r'"|//|/\*|\$(fn|fa|fs)\s*=(?!=)')
+
+
+class TierStats:
+    """
+    Thread-safe per-tier counters: runs, cache hits, failures and seconds spent.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers = {tier: {"runs": 0, "cached": 0, "failed": 0, "seconds": 0.0} for tier in TIERS}
+
+    def add(self, result):
+        """Fold in the per-tier steps of a validate() result."""
+        with self._lock:
+            for tier, seconds, cached, ok in result["steps"]:
+                counters = self._tiers[tier]
+                if cached:
+                    counters["cached"] += 1
+                else:
+                    counters["runs"] += 1
+                    counters["seconds"] += seconds
+                if not ok:
+                    counters["failed"] += 1
+
+    def snapshot(self):
+        """
+        Get a copy of the counters.
+
+        Returns:
+            dict: Tier -> {"runs", "cached", "failed", "seconds"}
+        """
+        with self._lock:
+            return {tier: dict(counters) for tier, counters in self._tiers.items()}
+
+    def report(self):
+        """
+        Format one line per tier that was used.
+
+        Returns:
+            list: Lines like "csg: 120 runs, 0.31s avg, 37.2s total, 4 cached, 9 failed"
+        """
+        lines = []
+        for tier, c in self.snapshot().items():
+            if not c["runs"] and not c["cached"]:
+                continue
+            avg = c["seconds"] / c["runs"] if c["runs"] else 0.0
+            avg = f"{avg * 1000:.2f}ms" if avg < 0.01 else f"{avg:.2f}s"
+            lines.append(f"{tier}: {c['runs']} runs, {avg} avg, {c['seconds']:.1f}s total, "
+                         f"{c['cached']} cached, {c['failed']} failed")
+        return lines
+
+
+_stats = TierStats()
+
+
+def stats():
+    """Process-wide TierStats updated by validate()."""
+    return _stats
+
+
+def _skip_string(code, i):
+    """Return the index after the string literal starting at code[i]."""
+    j = i + 1
+    while j < len(code) and code[j] != '"':
+        j += 2 if code[j] == '\\' else 1
+    return j + 1
+
+
+def _expression_end(code, start):
+    """Return the index where the expression starting at code[start] ends."""
+    depth = 0
+    i = start
+    n = len(code)
+    while i < n:
+        c = code[i]
+        if c == '"':
+            i = _skip_string(code, i)
+            continue
+        if code.startswith("//", i):
+            end = code.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if c in "([{":
+            depth += 1
+        elif c in ")]}":
+            if depth == 0:
+                return i
+            depth -= 1
+        elif c in ",;" and depth == 0:
+            return i
+        i += 1
+    return n
+
+
+def clamp_resolution(code, fn=LOWRES_FN, fa=LOWRES_FA, fs=LOWRES_FS):
+    """
+    Clamp explicit $fn/$fa/$fs assignments to a coarse resolution.
+
+    Every `$fn = expr` (in a call, a let or a statement) becomes
+    `$fn = min(fn, expr)`, and `$fa`/`$fs` get `max(...)`, so explicit
+    per-call settings cannot undo the -D overrides. Comments and strings
+    are left alone.
+
+    Args:
+        code (str): OpenSCAD code
+        fn (int): Maximum $fn
+        fa (float): Minimum $fa in degrees
+        fs (float): Minimum $fs in mm
+
+    Returns:
+        str: Rewritten code
+    """
+    out = []
+    i = 0
+    while True:
+        match = _SCAN.search(code, i)
+        if match is None:
+            out.append(code[i:])
+            return "".join(out)
+        start = match.start()
+        token = match.group(0)
+        if token == '"':
+            end = _skip_string(code, start)
+        elif token == "//":
+            end = code.find("\n", start)
+            end = len(code) if end == -1 else end
+        elif token == "/*":
+            end = code.find("*/", start + 2)
+            end = len(code) if end == -1 else end + 2
+        elif start > 0 and (code[start - 1].isalnum() or code[start - 1] == "_"):
+            # Part of a longer identifier
+            end = match.end()
+        else:
+            variable = match.group(1)
+            end = _expression_end(code, match.end())
+            expr = code[match.end():end].strip()
+            if variable == "fn":
+                token = f"$fn = min({fn}, {expr})"
+            else:
+                token = f"${variable} = max({fa if variable == 'fa' else fs}, {expr})"
+            out.append(code[i:start])
+            out.append(token)
+            i = end
+            continue
+        out.append(code[i:end])
+        i = end
+
+
+def _lowres_flags():
+    return ['-D', f'$fn={LOWRES_FN}', '-D', f'$fa={LOWRES_FA}', '-D', f'$fs={LOWRES_FS}']
+
+
+def _mode(tier, lowres):
+    """Render cache mode of a tier at full or low resolution."""
+    if lowres and tier in _TESSELLATED:
+        return TIER_MODES[tier] + _LOWRES_SUFFIX
+    return TIER_MODES[tier]
+
+
+def _chain(tier):
+    """The tiers escalation runs for `tier`, cheapest first, ending with it."""
+    return _PREREQUISITES[tier] + (tier,)
+
+
+def _implied_by(tier, lowres):
+    """Cache modes whose success implies success of `tier`."""
+    modes = []
+    for stronger in TIERS[1:]:
+        if tier not in _chain(stronger):
+            continue
+        # A full-resolution success implies the low-resolution one, not the reverse
+        for stronger_lowres in ((False, True) if lowres or tier not in _TESSELLATED else (False,)):
+            mode = _mode(stronger, stronger_lowres)
+            if mode != _mode(tier, lowres) and mode not in modes:
+                modes.append(mode)
+    if tier in _chain(PNG):
+        modes.extend(_EXTRA_IMPLIED)
+    return tuple(modes)
+
+
+def _run_tier(code, tier, timeout, lowres=False):
+    """
+    Run one tier's OpenSCAD export.
+
+    Returns:
+        tuple: (success, stderr, artifacts, cacheable) as cached_run expects
+    """
+    temp_scad = None
+    temp_out = None
+    try:
+        if lowres and tier in _TESSELLATED:
+            code = clamp_resolution(code)
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.scad', delete=False) as temp_file:
+            temp_file.write(code)
+            temp_scad = temp_file.name
+        with tempfile.NamedTemporaryFile(suffix=f'.{tier}', delete=False) as temp_file:
+            temp_out = temp_file.name
+
+        flags = _lowres_flags() if lowres and tier in _TESSELLATED else []
+        if tier == PNG:
+            result = run_with_display(['openscad'] + _PNG_FLAGS + flags + ['-o', temp_out, temp_scad],
+                                      capture_output=True, text=True, timeout=timeout)
+        else:
+            result = subprocess.run(['openscad'] + flags + ['-o', temp_out, temp_scad],
+                                    capture_output=True, text=True, timeout=timeout)
+
+        success = result.returncode == 0 and os.path.getsize(temp_out) > 0
+        # A display or allocation failure says nothing about the code
+        return success, result.stderr, [], success or not is_environment_failure(result.stderr)
+    except subprocess.TimeoutExpired:
+        return False, TIMEOUT, [], False
+    except FileNotFoundError:
+        return False, UNAVAILABLE, [], False
+    except Exception as e:
+        return False, str(e), [], False
+    finally:
+        for path in (temp_scad, temp_out):
+            if path and os.path.exists(path):
+                os.unlink(path)
+
+
+def _cached_failure_below(code, tier, lowres):
+    """Return the lowest tier of `tier`'s chain with a cached failure, if any."""
+    cache = get_render_cache()
+    for lower in _PREREQUISITES[tier][1:]:
+        result = cache.get(code, _mode(lower, lowres))
+        if result is not None and not result["success"]:
+            return lower, result
+    return None, None
+
+
+def _parse(code):
+    """
+    Parse code for the syntax tier.
+
+    Returns:
+        tuple: (tree, error); both None for nesting too deep to parse here,
+        which is left for OpenSCAD to judge
+    """
+    try:
+        return parse(code), None
+    except ScadSyntaxError as e:
+        return None, e
+    except RecursionError:
+        return None, None
+
+
+def validate(code, tier=CSG, escalate=False, timeout=DEFAULT_TIMEOUT, lowres=False, adaptive=True,
+             budget=None):
+    """
+    Check OpenSCAD code at a fidelity tier.
+
+    Args:
+        code (str): OpenSCAD code
+        tier (str): Required tier, one of TIERS
+        escalate (bool): Also run the cheaper OpenSCAD tiers of the tier's chain
+            first and stop at the first failure (default: syntax, then the tier)
+        timeout (float): Seconds allowed per tier (per tier without a cost model fit when adaptive)
+        lowres (bool): Evaluate the stl/png tiers at low resolution
+        adaptive (bool): Take per-item timeouts from the fitted cost model
+        budget (Budget): Static workload limits (pipeline.render_budget), checked
+            with the syntax tier; None for no limits
+
+    Returns:
+        dict: {"ok", "tier" (tier reached or failed at, csg if the budget
+        downtiered the code), "reason" (None, FAILED, TIMEOUT, UNAVAILABLE or
+        BUDGET), "stderr", "steps" [(tier, seconds, cached, ok)], "estimate"
+        (render_budget.estimate() when a budget was given)}
+    """
+    if tier not in TIERS:
+        raise ValueError(f"Unknown validation tier '{tier}', expected one of {TIERS}")
+
+    steps = []
+    outcome = {"ok": True, "tier": tier, "reason": None, "stderr": "", "steps": steps, "estimate": None}
+    features = {}
+
+    def code_features():
+        if "value" not in features:
+            features["value"] = extract_features(code, tree) if tree is not None else None
+        return features["value"]
+
+    # Syntax tier and static budget: in-process, before any OpenSCAD run
+    start = time.perf_counter()
+    tree, error = _parse(code)
+    if error is not None:
+        outcome.update(ok=False, tier=SYNTAX, reason=FAILED, stderr=f"Syntax error: {error}")
+    elif budget is not None and code_features() is not None:
+        estimated = outcome["estimate"] = estimate(code, code_features())
+        if budget.rejects(estimated):
+            outcome.update(ok=False, tier=SYNTAX, reason=BUDGET,
+                           stderr="Over budget: " + ", ".join(budget.violations(estimated)))
+        elif budget.downtiers(estimated) and TIERS.index(tier) > TIERS.index(CSG):
+            tier = outcome["tier"] = CSG
+    steps.append((SYNTAX, time.perf_counter() - start, False, outcome["ok"]))
+
+    plan = _chain(tier)[1:] if escalate else (tier,) if tier != SYNTAX else ()
+    if not outcome["ok"]:
+        plan = ()
+    elif not escalate and plan:
+        lower, failure = _cached_failure_below(code, tier, lowres)
+        if lower is not None:
+            steps.append((lower, failure["elapsed"], True, False))
+            outcome.update(ok=False, tier=lower, reason=FAILED, stderr=failure["stderr"])
+            plan = ()
+
+    def tier_timeout(step):
+        model = get_cost_model()
+        mode = _mode(step, lowres)
+        if not adaptive or not model.has_fit(mode) or code_features() is None:
+            return timeout
+        return model.timeout(code_features(), mode, timeout)
+
+    for step in plan:
+        start = time.perf_counter()
+        result = cached_run(code, _mode(step, lowres), lambda: _run_tier(code, step, tier_timeout(step), lowres),
+                            implied_by=_implied_by(step, lowres))
+        seconds = result["elapsed"] if result["cached"] else time.perf_counter() - start
+        steps.append((step, seconds, result["cached"], result["success"]))
+        if not result["success"]:
+            reason = result["stderr"] if result["stderr"] in (TIMEOUT, UNAVAILABLE) else FAILED
+            outcome.update(ok=False, tier=step, reason=reason, stderr=result["stderr"])
+            break
+
+    _stats.add(outcome)
+    return outcome
@@ -6,22 +6,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from inference.kimi import chat_with_kimi
+from pipeline.classify import DEFAULT_BATCH_SIZE
+from pipeline.filtering import run_filter, journal_path, finish_filter, DEFAULT_WORKERS
 
 
-def is_actual_pokemon(name):
-    """
-    Use AI to determine if a name represents an actual Pokemon
-    (not a made-up name or non-Pokemon creature).
-
-    Args:
-        name (str): The name to check
+# Shared by the single-name and batched checks
+FILTER_QUESTION = "the name of an actual Pokemon from the Pokemon franchise"
 
-    Returns:
-        bool: True if it's an actual Pokemon, False otherwise
-    """
-    prompt = f"""Is "{name}" the name of an actual Pokemon from the Pokemon franchise?
-Answer with just "yes" or "no".
-Do NOT count:
+FILTER_CRITERIA = """Do NOT count:
 - Made-up names that sound like Pokemon but aren't real
 - Non-Pokemon creatures or animals
 - Pokemon that don't exist in the official games/anime
@@ -37,21 +29,40 @@ Only count official Pokemon from any generation (1-9) that appear in:
 Examples of actual Pokemon: pikachu, charizard, mewtwo, lugia, rayquaza, arceus
 Examples of NOT Pokemon: dragon, phoenix, unicorn, griffin"""
 
+
+def is_actual_pokemon(name):
+    """
+    Use AI to determine if a name represents an actual Pokemon
+    (not a made-up name or non-Pokemon creature).
+
+    Args:
+        name (str): The name to check
+
+    Returns:
+        bool: True if it's an actual Pokemon, False otherwise, None if
+        the check failed (it is retried on the next run)
+    """
+    prompt = f"""Is "{name}" {FILTER_QUESTION}?
+Answer with just "yes" or "no".
+{FILTER_CRITERIA}"""
+
     try:
-        response = chat_with_kimi(prompt)
+        response = chat_with_kimi(prompt, stream=False)
         return response.strip().lower() == "yes"
     except Exception as e:
         print(f"Error checking if {name} is a Pokemon: {e}")
-        return False
+        return None
 
 
-def filter_pokemon_list(input_file="list.json", output_file="filtered_list.json"):
+def filter_pokemon_list(input_file="list.json", output_file="filtered_list.json", batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS):
     """
     Filter a Pokemon list to remove non-Pokemon names.
 
     Args:
         input_file (str): Input JSON file with Pokemon names
         output_file (str): Output JSON file for filtered names
+        batch_size (int): Names per classification request (1 to check names one at a time)
+        workers (int): Number of classification requests in flight at once
     """
     try:
         # Set default paths if using defaults
@@ -73,10 +84,17 @@ def filter_pokemon_list(input_file="list.json", output_file="filtered_list.json"
         filtered_names = []
         removed_names = []
         
+        # Verdicts are journaled as they arrive so an interrupted run can resume
+        journal_file = journal_path(input_file, output_file)
+        verdicts = dict(run_filter(pokemon_names, FILTER_QUESTION, FILTER_CRITERIA, is_actual_pokemon, journal_file,
+                                   batch_size=batch_size, workers=workers))
+
         for i, name in enumerate(pokemon_names, 1):
             print(f"[{i}/{len(pokemon_names)}] Checking {name}...")
             
-            if is_actual_pokemon(name):
+            if verdicts[name] is None:
+                print(f"  ? {name} could not be checked (retried on the next run)")
+            elif verdicts[name]:
                 filtered_names.append(name)
                 print(f"  ✓ {name} is a Pokemon")
             else:
@@ -92,6 +110,7 @@ def filter_pokemon_list(input_file="list.json", output_file="filtered_list.json"
         print(f"Filtered count: {len(filtered_names)}")
         print(f"Removed: {len(removed_names)}")
         print(f"Filtered list saved to: {output_file}")
+        finish_filter(journal_file, verdicts)
         
         if removed_names:
             print(f"\nRemoved names:")
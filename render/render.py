@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Render all OpenSCAD code from the JSON datasets to PNG images.
+
+Every renderable entry of every *_openscad_dataset.json in the repo root
+becomes one job in a single process pool (one worker per CPU core by
+default), so all cores stay busy across datasets. Each OpenSCAD run gets a
+wall-clock timeout and an address-space limit, renders on the worker's
+persistent virtual display, and progress is streamed as jobs finish.
+The per-dataset "Rendered | Failed | Skipped" summary is kept.
+
+Jobs are scheduled longest-first by their predicted cost
+(pipeline.cost_model), so a few heavy models do not finish alone at the
+end of a run. When the cost model has a fit for full-size renders, each
+job also gets its own predicted timeout and --timeout only applies to
+jobs without a prediction; --fixed-timeout uses --timeout for all.
+
+Jobs whose static render estimate (pipeline.render_budget: the "estimate"
+recorded with generated entries, or computed here for older ones) exceeds
+--expensive-polygons run in a separate lane of --expensive-workers
+processes, so a handful of pathological tessellations cannot occupy every
+worker while the cheap bulk of the corpus queues behind them.
+
+Rendering is incremental: images/manifest.json records a hash of the code,
+OpenSCAD version and render flags for every PNG, so unchanged items are
+not rendered again and PNGs whose item is gone are removed. Pass --full to
+re-render everything. A render that fails because of the code removes the
+item's PNG; one that times out, hits the memory limit or cannot start
+OpenSCAD or its display keeps the previous image, and nothing is rendered when OpenSCAD
+is not installed.
+
+Usage:
+    python render/render.py [--workers N] [--expensive-workers 1] [--expensive-polygons 100000]
+                            [--timeout 10] [--fixed-timeout] [--memory-mb 2048] [--full] [DATASET ...]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import contextlib
+import subprocess
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+RENDER_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(RENDER_DIR)
+
+sys.path.append(REPO_ROOT)
+
+from pipeline.cost_model import get_cost_model
+from pipeline.displays import run_with_display
+from pipeline.render_manifest import RenderManifest, openscad_version, render_hash
+from pipeline.render_budget import EXPENSIVE_POLYGONS, estimate, is_expensive
+from pipeline.render_cache import MEMORY_ERRORS, cached_run, is_environment_failure
+from pipeline.scad_features import extract_features
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_MEMORY_MB = 2048
+IMAGE_SIZE = 800
+# Use smaller image size (800x800) for faster rendering
+RENDER_FLAGS = [f'--imgsize={IMAGE_SIZE},{IMAGE_SIZE}']
+# Render cache mode shared with total/combine.py
+RENDER_MODE = f"png-{IMAGE_SIZE}"
+PROGRESS_EVERY = 25
+DEFAULT_EXPENSIVE_WORKERS = 1
+
+# Failure reasons
+TIMEOUT = "timeout"
+OUT_OF_MEMORY = "memory"
+UNAVAILABLE = "unavailable"
+DISPLAY = "display"
+ERROR = "error"
+# Failures that say nothing about the model: its existing PNG is kept
+TRANSIENT = (TIMEOUT, OUT_OF_MEMORY, UNAVAILABLE, DISPLAY)
+
+
+def find_datasets(root=REPO_ROOT):
+    """
+    Find the dataset files to render.
+
+    Args:
+        root (str): Directory holding *_openscad_dataset.json files
+
+    Returns:
+        list: Sorted dataset paths
+    """
+    return sorted(str(path) for path in Path(root).glob("*_openscad_dataset.json"))
+
+
+def dataset_name(json_path):
+    """e.g. "basic_shape" for basic_shape_openscad_dataset.json."""
+    return Path(json_path).stem.replace('_openscad_dataset', '')
+
+
+def entry_name(item):
+    """Get the item name: the first field that is not the code, the render flag or the estimate."""
+    for key in item.keys():
+        if key not in ('openscad_code', 'renders', 'estimate'):
+            return item[key]
+    return None
+
+
+def safe_filename(name):
+    """Sanitize an item name for use as a PNG file name."""
+    return "".join(c for c in name if c.isalnum() or c in ('-', '_')).rstrip()
+
+
+def plan_dataset(json_path, images_dir, estimates=None):
+    """
+    Turn one dataset into render jobs.
+
+    Args:
+        json_path (str): Dataset file
+        images_dir (str): Root of the image tree; PNGs go to images_dir/<dataset>/
+        estimates (dict): If given, filled with (dataset, name) -> the
+            render estimate recorded with each entry that has one
+
+    Returns:
+        tuple: (jobs, skipped) where jobs is a list of
+            (dataset, name, code, output_path) tuples and skipped counts
+            entries marked as not rendering
+    """
+    name_of_dataset = dataset_name(json_path)
+    output_dir = Path(images_dir) / name_of_dataset
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    jobs = []
+    skipped = 0
+    for item in data:
+        name = entry_name(item)
+        if name is None:
+            continue
+
+        # Check if rendering is disabled
+        if item.get('renders') == False:
+            skipped += 1
+            continue
+
+        code = item.get('openscad_code', '')
+        if not code:
+            continue
+
+        output_path = output_dir / f"{safe_filename(name)}.png"
+        jobs.append((name_of_dataset, name, code, str(output_path)))
+        if estimates is not None and item.get('estimate'):
+            estimates[(name_of_dataset, name)] = item['estimate']
+
+    return jobs, skipped
+
+
+def schedule_jobs(jobs, timeout=DEFAULT_TIMEOUT, adaptive=True, estimates=None,
+                  expensive_polygons=EXPENSIVE_POLYGONS):
+    """
+    Order jobs longest-first, pick a timeout per job and find the expensive ones.
+
+    Args:
+        jobs (list): (dataset, name, code, output_path) tuples
+        timeout (float): Timeout for jobs the cost model has no prediction for
+        adaptive (bool): Use predicted per-job timeouts
+        estimates (dict): (dataset, name) -> recorded render estimate; jobs
+            without one are estimated from their code
+        expensive_polygons (int): Polygon estimate above which a job is expensive
+
+    Returns:
+        tuple: (jobs sorted by predicted cost, most expensive first;
+            dict (dataset, name) -> timeout in seconds;
+            set of (dataset, name) of expensive jobs)
+    """
+    model = get_cost_model()
+    estimates = estimates or {}
+    ranked = []
+    timeouts = {}
+    expensive = set()
+    for job in jobs:
+        key = (job[0], job[1])
+        features = extract_features(job[2])
+        if features is None:
+            # Syntax errors fail as soon as OpenSCAD starts
+            ranked.append((float("-inf"), job))
+            continue
+        ranked.append((model.rank(features, RENDER_MODE), job))
+        if adaptive:
+            timeouts[key] = model.timeout(features, RENDER_MODE, timeout)
+        if is_expensive(estimates.get(key) or estimate(job[2], features), expensive_polygons):
+            expensive.add(key)
+    ranked.sort(key=lambda pair: pair[0], reverse=True)
+    return [job for _, job in ranked], timeouts, expensive
+
+
+def _limit_memory(limit_bytes):
+    """Return a preexec_fn capping the child's address space."""
+    def apply():
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+    return apply
+
+
+def _failure_reason(stderr):
+    stderr = (stderr or "").lower()
+    if stderr == UNAVAILABLE:
+        return UNAVAILABLE
+    if "timed out" in stderr:
+        return TIMEOUT
+    if any(fragment in stderr for fragment in MEMORY_ERRORS):
+        return OUT_OF_MEMORY
+    if is_environment_failure(stderr):
+        return DISPLAY
+    return ERROR
+
+
+def render_openscad_to_png(code, output_path, timeout=DEFAULT_TIMEOUT, memory_mb=DEFAULT_MEMORY_MB):
+    """
+    Render OpenSCAD code to a PNG.
+
+    Results go through the shared render cache: code that already failed
+    is not retried, and code already rendered elsewhere (e.g. the same
+    model in another dataset) is copied instead of rendered again.
+
+    Args:
+        code (str): OpenSCAD code
+        output_path (str): PNG destination
+        timeout (float): Seconds before OpenSCAD is killed
+        memory_mb (int): Address-space limit for OpenSCAD in MB (0 for none)
+
+    Returns:
+        tuple: (success, reason) where reason is None, TIMEOUT, OUT_OF_MEMORY,
+            UNAVAILABLE, DISPLAY or ERROR
+    """
+    output_path = os.path.abspath(output_path)
+    # Render next to the destination and move into place on success, so a
+    # killed render never leaves a partial image over the previous one
+    partial_path = os.path.splitext(output_path)[0] + ".partial.png"
+
+    def run():
+        temp_scad = None
+        try:
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.scad', delete=False) as temp_file:
+                temp_file.write(code)
+                temp_scad = temp_file.name
+
+            kwargs = {}
+            if memory_mb and os.name == "posix":
+                kwargs["preexec_fn"] = _limit_memory(memory_mb * 1024 * 1024)
+
+            result = run_with_display(
+                ['openscad'] + RENDER_FLAGS + ['-o', partial_path, temp_scad],
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                **kwargs
+            )
+            if result.returncode == 0:
+                os.replace(partial_path, output_path)
+                return True, result.stderr, [output_path], True
+            # Memory-limit and display failures depend on this run, so they are not cached
+            return False, result.stderr, [], not is_environment_failure(result.stderr)
+        except subprocess.TimeoutExpired:
+            return False, "timed out", [], False
+        except FileNotFoundError:
+            return False, UNAVAILABLE, [], False
+        except Exception as e:
+            return False, str(e), [], False
+        finally:
+            for path in (temp_scad, partial_path):
+                if path and os.path.exists(path):
+                    os.unlink(path)
+
+    def usable(result):
+        # A cached success is only useful while its PNG still exists
+        return not result["success"] or any(os.path.exists(path) for path in result["artifacts"])
+
+    result = cached_run(code, RENDER_MODE, run, usable=usable)
+    if not result["success"]:
+        return False, _failure_reason(result["stderr"])
+
+    if result["cached"]:
+        artifact = next(path for path in result["artifacts"] if os.path.exists(path))
+        if artifact != output_path:
+            shutil.copyfile(artifact, output_path)
+    return True, None
+
+
+def _init_worker():
+    # One persistent display per worker process
+    os.environ["OPENSCAD_DISPLAYS"] = "1"
+
+
+def _render_job(job, timeout, memory_mb):
+    dataset, name, code, output_path = job
+    start = time.perf_counter()
+    ok, reason = render_openscad_to_png(code, output_path, timeout=timeout, memory_mb=memory_mb)
+    return dataset, name, ok, reason, time.perf_counter() - start
+
+
+def split_workers(workers, expensive_workers, has_expensive):
+    """
+    Divide the worker count between the main and the expensive lane.
+
+    The expensive lane gets up to expensive_workers processes but leaves at
+    least one to the main lane; with a single worker it still gets its own
+    process, so cheap jobs never wait behind an expensive one.
+
+    Returns:
+        tuple: (main workers, expensive workers), the latter 0 without expensive jobs
+    """
+    if not has_expensive:
+        return workers, 0
+    expensive_workers = max(1, min(expensive_workers, workers - 1))
+    return max(1, workers - expensive_workers), expensive_workers
+
+
+def render_jobs(jobs, workers=None, timeout=DEFAULT_TIMEOUT, memory_mb=DEFAULT_MEMORY_MB,
+                progress_every=PROGRESS_EVERY, timeouts=None, expensive=None,
+                expensive_workers=DEFAULT_EXPENSIVE_WORKERS):
+    """
+    Render jobs on process pools, streaming progress as they finish.
+
+    Expensive jobs run in their own pool (see split_workers()), in the same
+    order as they appear in `jobs`. At most 2 * workers jobs per pool are
+    queued at once, so the job list (with all the code) is not copied into
+    the pools up front.
+
+    Args:
+        jobs (list): (dataset, name, code, output_path) tuples
+        workers (int): Worker processes across both lanes (default: one per CPU core)
+        timeout (float): Per-job timeout in seconds
+        memory_mb (int): Per-job memory limit in MB
+        progress_every (int): Print a progress line every N jobs
+        timeouts (dict): (dataset, name) -> timeout overriding `timeout` for that job
+        expensive (set): (dataset, name) of the jobs for the expensive lane
+        expensive_workers (int): Worker processes for the expensive lane
+
+    Yields:
+        tuple: (dataset, name, success, reason, seconds) per finished job
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    expensive = expensive or set()
+    heavy = [job for job in jobs if (job[0], job[1]) in expensive]
+    light = [job for job in jobs if (job[0], job[1]) not in expensive]
+    main_workers, heavy_workers = split_workers(workers, expensive_workers, bool(heavy))
+    lanes = [(lane_jobs, lane_workers) for lane_jobs, lane_workers in ((light, main_workers), (heavy, heavy_workers))
+             if lane_jobs]
+
+    start = time.perf_counter()
+    done = 0
+    with contextlib.ExitStack() as stack:
+        # Per lane: [executor, job iterator, window, jobs in flight]
+        feeds = [[stack.enter_context(ProcessPoolExecutor(max_workers=lane_workers, initializer=_init_worker)),
+                  iter(lane_jobs), lane_workers * 2, 0] for lane_jobs, lane_workers in lanes]
+        pending = {}
+        while True:
+            for feed in feeds:
+                executor, job_iter, window, _ = feed
+                while job_iter is not None and feed[3] < window:
+                    job = next(job_iter, None)
+                    if job is None:
+                        feed[1] = job_iter = None
+                        break
+                    job_timeout = timeouts.get((job[0], job[1]), timeout) if timeouts else timeout
+                    pending[executor.submit(_render_job, job, job_timeout, memory_mb)] = feed
+                    feed[3] += 1
+            if not pending:
+                break
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                pending.pop(future)[3] -= 1
+                dataset, name, ok, reason, seconds = future.result()
+                done += 1
+                if not ok:
+                    print(f"    ✗ {dataset}/{name}: {reason} ({seconds:.1f}s)")
+                if done % progress_every == 0 or done == len(jobs):
+                    elapsed = time.perf_counter() - start
+                    rate = done / elapsed if elapsed > 0 else 0.0
+                    eta = (len(jobs) - done) / rate if rate > 0 else 0.0
+                    print(f"  [{done}/{len(jobs)}] {rate:.1f} renders/s | ETA {eta:.0f}s", flush=True)
+                yield dataset, name, ok, reason, seconds
+
+
+def remove_orphans(json_files, images_dir, jobs, manifest):
+    """
+    Delete PNGs and manifest entries that no current item produces.
+
+    Only the image directories of the datasets being rendered are touched.
+
+    Args:
+        json_files (list): Dataset files being rendered
+        images_dir (str): Root of the image tree
+        jobs (list): Current render jobs of those datasets
+        manifest (RenderManifest): The render manifest
+
+    Returns:
+        int: Number of PNG files removed
+    """
+    datasets = {dataset_name(path) for path in json_files}
+    wanted = {os.path.abspath(job[3]) for job in jobs}
+    stale = set(manifest.prune(datasets, {RenderManifest.key(job[0], job[1]) for job in jobs}))
+    for dataset in datasets:
+        stale.update(str(path) for path in (Path(images_dir) / dataset).glob("*.png"))
+
+    removed = 0
+    for png in stale:
+        if os.path.abspath(png) not in wanted and os.path.exists(png):
+            os.unlink(png)
+            removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render OpenSCAD datasets to PNG images")
+    parser.add_argument("datasets", nargs="*",
+                        help="Dataset names (e.g. basic_shape) or files to render (default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: one per CPU core)")
+    parser.add_argument("--expensive-workers", type=int, default=DEFAULT_EXPENSIVE_WORKERS,
+                        help=f"Processes of the lane for expensive renders (default: {DEFAULT_EXPENSIVE_WORKERS})")
+    parser.add_argument("--expensive-polygons", type=int, default=EXPENSIVE_POLYGONS,
+                        help=f"Estimated polygons above which a render uses the expensive lane "
+                             f"(default: {EXPENSIVE_POLYGONS})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="Seconds per render when the cost model has no prediction")
+    parser.add_argument("--fixed-timeout", action="store_true",
+                        help="Use --timeout for every render instead of per-item predicted timeouts")
+    parser.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB,
+                        help="Memory limit per render in MB (0 for none)")
+    parser.add_argument("--images", default=os.path.join(RENDER_DIR, "images"), help="Output image directory")
+    parser.add_argument("--full", action="store_true", help="Re-render every item, ignoring the manifest")
+    args = parser.parse_args()
+
+    json_files = find_datasets()
+    if args.datasets:
+        wanted = set(args.datasets)
+        json_files = [path for path in json_files
+                      if dataset_name(path) in wanted or os.path.basename(path) in wanted]
+    if not json_files:
+        print("No JSON dataset files found!")
+        return 1
+
+    print("Found JSON files:")
+    for json_file in json_files:
+        print(json_file)
+    print("")
+
+    manifest = RenderManifest(os.path.join(args.images, "manifest.json"), root=args.images).load()
+    version = openscad_version()
+    if version == "unknown":
+        print("OpenSCAD could not be run; not rendering (existing images are kept)")
+        return 1
+
+    all_jobs = []
+    jobs = []
+    digests = {}
+    estimates = {}
+    counts = {}
+    for json_file in json_files:
+        dataset_jobs, skipped = plan_dataset(json_file, args.images, estimates)
+        name = dataset_name(json_file)
+        counts[name] = {"rendered": 0, "failed": 0, "skipped": skipped, "unchanged": 0}
+        all_jobs.extend(dataset_jobs)
+        for job in dataset_jobs:
+            dataset, item_name, code, output_path = job
+            digest = render_hash(code, version, RENDER_FLAGS)
+            if not args.full and manifest.is_current(dataset, item_name, digest, output_path):
+                counts[dataset]["unchanged"] += 1
+                continue
+            digests[(dataset, item_name)] = digest
+            jobs.append(job)
+        print(f"  {name}: {len(dataset_jobs) - counts[name]['unchanged']} to render, "
+              f"{counts[name]['unchanged']} unchanged, {skipped} skipped")
+
+    removed = remove_orphans(json_files, args.images, all_jobs, manifest)
+    if removed:
+        print(f"  Removed {removed} orphaned PNGs")
+    manifest.save()
+
+    workers = max(1, args.workers or os.cpu_count() or 1)
+    jobs, timeouts, expensive = schedule_jobs(jobs, args.timeout, adaptive=not args.fixed_timeout,
+                                              estimates=estimates, expensive_polygons=args.expensive_polygons)
+    if get_cost_model().has_fit(RENDER_MODE) and not args.fixed_timeout:
+        timeout_text = f"predicted timeouts, {args.timeout:g}s without a prediction"
+    else:
+        timeout_text = f"timeout {args.timeout:g}s"
+    print(f"\nRendering {len(jobs)} models longest-first with {workers} workers "
+          f"({timeout_text}, memory {args.memory_mb or 'unlimited'} MB)...")
+    if expensive:
+        main_workers, heavy_workers = split_workers(workers, args.expensive_workers, True)
+        print(f"  {len(expensive)} expensive models on a separate lane of {heavy_workers} workers, "
+              f"the rest on {main_workers}")
+
+    start = time.perf_counter()
+    reasons = {}
+    try:
+        for i, (dataset, name, ok, reason, seconds) in enumerate(
+                render_jobs(jobs, workers, args.timeout, args.memory_mb, timeouts=timeouts,
+                            expensive=expensive, expensive_workers=args.expensive_workers)):
+            if ok:
+                counts[dataset]["rendered"] += 1
+                manifest.record(dataset, name, digests[(dataset, name)],
+                                str(Path(args.images) / dataset / f"{safe_filename(name)}.png"))
+            else:
+                counts[dataset]["failed"] += 1
+                reasons[reason] = reasons.get(reason, 0) + 1
+                if reason not in TRANSIENT:
+                    # The code itself fails: don't leave a stale image behind
+                    manifest.forget(dataset, name)
+                    stale_png = Path(args.images) / dataset / f"{safe_filename(name)}.png"
+                    if stale_png.exists():
+                        stale_png.unlink()
+            # Checkpoint so an interrupted run does not redo finished renders
+            if (i + 1) % 100 == 0:
+                manifest.save()
+    finally:
+        manifest.save()
+    elapsed = time.perf_counter() - start
+
+    print("")
+    for dataset, c in counts.items():
+        print(f"  Dataset: {dataset}")
+        print(f"    Rendered: {c['rendered']} | Failed: {c['failed']} | Skipped: {c['skipped']} "
+              f"| Unchanged: {c['unchanged']}")
+
+    total_ok = sum(c["rendered"] for c in counts.values())
+    total_failed = sum(c["failed"] for c in counts.values())
+    total_unchanged = sum(c["unchanged"] for c in counts.values())
+    print(f"\nTotal: {total_ok} rendered, {total_failed} failed, {total_unchanged} unchanged in {elapsed:.1f}s")
+    if reasons:
+        print("Failures: " + ", ".join(f"{reason} {count}" for reason, count in sorted(reasons.items())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
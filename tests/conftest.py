@@ -0,0 +1,8 @@
+"""
+Test configuration: make the repo root importable (pipeline, inference, ...).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
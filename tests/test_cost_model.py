@@ -0,0 +1,98 @@
+"""
+Tests for the render-cost model (pipeline.cost_model).
+"""
+
+import math
+
+import pytest
+
+from pipeline import cost_model
+from pipeline.cost_model import CostModel
+from pipeline.scad_features import FEATURES
+
+INTERCEPT = -3.0
+COEFFICIENTS = {"primitives": 0.8, "max_fn": 0.5, "minkowski": 2.0}
+
+
+def _seconds(features):
+    return math.exp(INTERCEPT + sum(weight * math.log1p(features.get(name, 0))
+                                    for name, weight in COEFFICIENTS.items()))
+
+
+def _samples(mode="csg"):
+    samples = []
+    for primitives in (1, 3, 10, 40):
+        for max_fn in (0, 8, 32, 128):
+            for minkowski in (0, 1, 2):
+                features = {"primitives": primitives, "max_fn": max_fn, "minkowski": minkowski}
+                samples.append((features, mode, _seconds(features)))
+    return samples
+
+
+def _weight(model, name, mode="csg"):
+    return model.modes[mode]["weights"][1 + FEATURES.index(name)]
+
+
+def test_fit_recovers_coefficients():
+    model = CostModel.fit(_samples(), min_samples=10, ridge=0.0)
+    fit = model.modes["csg"]
+
+    assert fit["samples"] == 48
+    assert fit["weights"][0] == pytest.approx(INTERCEPT, abs=1e-6)
+    for name, weight in COEFFICIENTS.items():
+        assert _weight(model, name) == pytest.approx(weight, abs=1e-6)
+    # Features absent from every sample get no weight
+    assert _weight(model, "hull") == 0.0
+    assert fit["sigma"] == pytest.approx(0.0, abs=1e-6)
+    assert fit["r2"] == pytest.approx(1.0)
+
+    features = {"primitives": 5, "max_fn": 64, "minkowski": 1}
+    assert model.predict(features, "csg") == pytest.approx(_seconds(features), rel=1e-6)
+
+
+def test_ridge_shrinks_coefficients():
+    exact = CostModel.fit(_samples(), min_samples=10, ridge=0.0)
+    shrunk = CostModel.fit(_samples(), min_samples=10, ridge=50.0)
+
+    for name in COEFFICIENTS:
+        assert 0 < _weight(shrunk, name) < _weight(exact, name)
+
+
+def test_modes_below_min_samples_are_not_fitted():
+    model = CostModel.fit(_samples("csg") + _samples("stl")[:5], min_samples=10)
+
+    assert model.has_fit("csg") and not model.has_fit("stl")
+    assert model.predict({"primitives": 1}, "stl") is None
+    assert model.timeout({"primitives": 1}, "stl", 30) == 30
+
+
+def test_timeout_is_clamped():
+    model = CostModel({"csg": {"weights": [0.0] * (len(FEATURES) + 1), "sigma": 0.0, "samples": 50, "r2": 1.0}})
+    model.modes["csg"]["weights"][0] = math.log(10)
+    assert model.timeout({}, "csg", 30) == pytest.approx(10)
+
+    model.modes["csg"]["sigma"] = 1.0
+    assert model.timeout({}, "csg", 30) == pytest.approx(10 * math.exp(cost_model.TIMEOUT_SIGMAS))
+
+    model.modes["csg"]["weights"][0] = math.log(0.01)
+    assert model.timeout({}, "csg", 30) == cost_model.MIN_TIMEOUT
+
+    model.modes["csg"]["weights"][0] = math.log(1000)
+    assert model.timeout({}, "csg", 30) == pytest.approx(cost_model.MAX_TIMEOUT)
+
+
+def test_rank_orders_heavier_models_first():
+    model = CostModel.fit(_samples(), min_samples=10, ridge=0.0)
+    light, heavy = {"primitives": 1}, {"primitives": 40, "minkowski": 1}
+
+    assert model.rank(heavy, "csg") > model.rank(light, "csg")
+    assert CostModel().rank(heavy) > CostModel().rank(light)
+
+
+def test_save_and_load(tmp_path):
+    model = CostModel.fit(_samples(), min_samples=10)
+    path = str(tmp_path / "cost_model.json")
+    model.save(path)
+
+    assert CostModel.load(path).modes == model.modes
+    assert not CostModel.load(str(tmp_path / "missing.json")).modes
@@ -0,0 +1,48 @@
+"""
+Tests for the streaming dataset reader (pipeline.dataset_reader).
+"""
+
+import json
+
+import pytest
+
+from pipeline.dataset_reader import iter_dataset
+from pipeline.dataset_store import DatasetCorruptError
+
+ENTRIES = [
+    {"item": "escapes", "code": "a = \"\\\"\";\n\t\\ é 😀", "renders": True},
+    {"item": "nested", "estimate": {"primitives": 12, "polygons": 1.5e3, "per_tier": [0.25, -3, None]},
+     "tags": [[], {}, [1, [2, [3]]]]},
+    {"item": "numbers", "values": [0, -0.5, 1e-7, 123456789, 2.5E+10], "flag": False},
+]
+
+
+@pytest.mark.parametrize("layout", ["list", "legacy"])
+def test_reader_survives_every_chunk_boundary(tmp_path, layout):
+    data = ENTRIES if layout == "list" else {"meta": {"version": [1, 2]}, "items": ENTRIES, "count": 3}
+    path = tmp_path / "dataset.json"
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    size = len(path.read_text(encoding="utf-8"))
+
+    # Chunk sizes from 1 up place a boundary inside every string, escape and number
+    for chunk_size in list(range(1, 24)) + [size - 1, size, size + 1]:
+        assert list(iter_dataset(str(path), legacy_key="items", chunk_size=chunk_size)) == ENTRIES
+
+
+def test_reader_does_not_split_numbers(tmp_path):
+    path = tmp_path / "dataset.json"
+    path.write_text('[1.5, -12e3, 7]')
+
+    for chunk_size in range(1, 8):
+        assert list(iter_dataset(str(path), chunk_size=chunk_size)) == [1.5, -12e3, 7]
+
+
+def test_reader_yields_entries_before_corruption(tmp_path):
+    path = tmp_path / "dataset.json"
+    path.write_text(json.dumps(ENTRIES, indent=2)[:-40])
+
+    read = []
+    with pytest.raises(DatasetCorruptError):
+        for entry in iter_dataset(str(path), chunk_size=16):
+            read.append(entry)
+    assert read == ENTRIES[:2]
@@ -0,0 +1,90 @@
+"""
+Tests for crash recovery in pipeline.dataset_store.
+"""
+
+import json
+import os
+
+from pipeline.dataset_store import (DatasetStore, atomic_write_json, backup_path, iter_log, log_path,
+                                    recover_log)
+
+
+def _entry(name):
+    return {"item": name, "openscad_code": f"cube({len(name)});", "renders": True}
+
+
+def test_recover_log_truncates_torn_line(tmp_path):
+    log = tmp_path / "items.log.jsonl"
+    complete = json.dumps(_entry("a")) + "\n" + json.dumps(_entry("b")) + "\n"
+    log.write_text(complete + '{"item": "c", "openscad_')
+
+    assert recover_log(str(log)) == len('{"item": "c", "openscad_')
+    assert log.read_text() == complete
+    assert [entry["item"] for entry in iter_log(str(log))] == ["a", "b"]
+    assert recover_log(str(log)) == 0
+
+
+def test_recover_log_single_torn_line(tmp_path):
+    log = tmp_path / "items.log.jsonl"
+    log.write_text('{"item": "a"')
+
+    assert recover_log(str(log)) == len('{"item": "a"')
+    assert log.read_text() == ""
+
+
+def test_load_replays_log_without_duplicates(tmp_path):
+    dataset = tmp_path / "items.json"
+    store = DatasetStore(str(dataset), compact_every=0)
+    store.load()
+    store.append(_entry("a"))
+    store.append(_entry("b"))
+    store.compact([_entry("a"), _entry("b")])
+    # Replaying a record that is already compacted must not duplicate it
+    with open(log_path(str(dataset)), "a", encoding="utf-8") as f:
+        f.write(json.dumps(_entry("b")) + "\n" + json.dumps(_entry("c")) + "\n")
+
+    loaded = DatasetStore(str(dataset)).load()
+    assert [entry["item"] for entry in loaded] == ["a", "b", "c"]
+
+
+def test_corrupt_dataset_is_quarantined_and_rebuilt_from_backup(tmp_path):
+    dataset = tmp_path / "items.json"
+    store = DatasetStore(str(dataset), compact_every=0)
+    store.load()
+    store.append(_entry("a"))
+    store.compact([_entry("a")])
+    store.append(_entry("b"))
+    store.compact([_entry("a"), _entry("b")])
+    store.append(_entry("c"))
+    dataset.write_text('[{"item": "a", "openscad_co')
+
+    loaded = DatasetStore(str(dataset)).load()
+
+    # bak.1 holds [a]; the previous log adds b and the current log adds c
+    assert [entry["item"] for entry in loaded] == ["a", "b", "c"]
+    quarantined = [name for name in os.listdir(tmp_path) if ".corrupt-" in name]
+    assert len(quarantined) == 1
+    assert (tmp_path / quarantined[0]).read_text() == '[{"item": "a", "openscad_co'
+    assert not dataset.exists()
+
+
+def test_rolling_backups_fall_back_past_corrupt_ones(tmp_path):
+    dataset = tmp_path / "items.json"
+    for generation in range(1, 5):
+        atomic_write_json(str(dataset), [_entry(str(i)) for i in range(generation)], backups=3)
+
+    assert [len(json.loads(open(backup_path(str(dataset), i)).read())) for i in (1, 2, 3)] == [3, 2, 1]
+    assert not os.path.exists(backup_path(str(dataset), 4))
+
+    dataset.write_text("not json")
+    open(backup_path(str(dataset), 1), "w").write("{")
+
+    loaded = DatasetStore(str(dataset)).load()
+    assert [entry["item"] for entry in loaded] == ["0", "1"]
+
+
+def test_legacy_dict_layout(tmp_path):
+    dataset = tmp_path / "items.json"
+    dataset.write_text(json.dumps({"animals": [_entry("a")]}))
+
+    assert DatasetStore(str(dataset), legacy_key="animals").load() == [_entry("a")]
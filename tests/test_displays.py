@@ -0,0 +1,64 @@
+"""
+Tests for the persistent Xvfb pool in pipeline.displays, with a stub Xvfb.
+"""
+
+import os
+import stat
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from pipeline import displays
+
+
+def _stub_xvfb(directory, body):
+    path = directory / "Xvfb"
+    # Called as: Xvfb -displayfd FD -screen 0 ... ; records its pid for the test
+    path.write_text(f'#!/bin/sh\necho $$ >> "{directory}/pids"\n{body}\n')
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+
+def _running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def _borrow_display():
+    with displays.get_display_pool().acquire() as display:
+        return display.name
+
+
+@pytest.fixture
+def stub_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    monkeypatch.setenv("OPENSCAD_DISPLAYS", "1")
+    return tmp_path
+
+
+def test_worker_displays_stop_with_the_pool(stub_path):
+    _stub_xvfb(stub_path, 'echo 42 > /proc/$$/fd/$2\nexec sleep 60')
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(_borrow_display).result() == ":42"
+        pid = int((stub_path / "pids").read_text())
+        assert _running(pid)
+
+    deadline = time.monotonic() + 5
+    while _running(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _running(pid)
+
+
+def test_silent_xvfb_times_out(stub_path, monkeypatch):
+    _stub_xvfb(stub_path, "exec sleep 60")
+    monkeypatch.setattr(displays, "START_TIMEOUT", 0.5)
+    display = displays.XvfbDisplay()
+
+    start = time.monotonic()
+    with pytest.raises(displays.DisplayError):
+        display.start()
+    assert time.monotonic() - start < 5
+    assert not _running(int((stub_path / "pids").read_text()))
@@ -0,0 +1,49 @@
+"""
+Tests for the resumable filter engine in pipeline.filtering.
+"""
+
+from pipeline import classify
+from pipeline.filtering import finish_filter, load_journal, run_filter
+
+
+def _flaky(failing):
+    def classify_one(name):
+        if name in failing:
+            return None
+        return name.startswith("a")
+    return classify_one
+
+
+def test_failed_checks_are_not_journaled(tmp_path):
+    journal = str(tmp_path / "list.journal.jsonl")
+    results = run_filter(["apple", "bolt", "acorn"], "a fruit", "", _flaky({"acorn"}), journal, batch_size=1)
+
+    assert results == [("apple", True), ("bolt", False), ("acorn", None)]
+    assert load_journal(journal) == {"apple": True, "bolt": False}
+
+
+def test_failed_checks_are_retried_on_resume(tmp_path):
+    journal = str(tmp_path / "list.journal.jsonl")
+    names = ["apple", "acorn"]
+    verdicts = dict(run_filter(names, "a fruit", "", _flaky({"acorn"}), journal, batch_size=1))
+    finish_filter(journal, verdicts)
+    assert load_journal(journal) == {"apple": True}
+
+    asked = []
+
+    def classify_one(name):
+        asked.append(name)
+        return True
+
+    assert run_filter(names, "a fruit", "", classify_one, journal, batch_size=1) == [("apple", True),
+                                                                                     ("acorn", True)]
+    assert asked == ["acorn"]
+
+
+def test_batch_errors_leave_names_unclassified(monkeypatch):
+    def unavailable(prompt, stream=False):
+        raise RuntimeError("429 Too Many Requests")
+
+    monkeypatch.setattr(classify, "chat_with_kimi", unavailable)
+    verdicts = classify.classify_batch(["apple", "bolt"], "a fruit", "", _flaky({"bolt"}))
+    assert verdicts == {"apple": True}
@@ -0,0 +1,59 @@
+"""
+Tests for the JSON array writer (pipeline.json_writer).
+"""
+
+import json
+
+import pytest
+
+from pipeline.dataset_reader import iter_dataset
+from pipeline.json_writer import JsonArrayWriter
+
+RECORDS = [
+    {"name": "quote \" and backslash \\", "category": "tools", "code": "cube([1, 2, 3]);\n// done\t"},
+    {"name": "control \u0001 and slash /", "category": "toys", "code": ""},
+    {"name": "plain", "category": "food", "code": "sphere(r = 1.5, $fn = 32);", "renders": True,
+     "size": 12345, "ratio": -0.25, "missing": None},
+    {},
+]
+
+UNICODE_RECORDS = [{"name": "front façade Ø", "category": "buildings", "code": "echo(\"é\");"}]
+
+def _write(path, records, **kwargs):
+    with JsonArrayWriter(str(path), **kwargs) as writer:
+        for record in records:
+            writer.write(record)
+    return path.read_bytes()
+
+
+def test_json_codec_matches_json_dump(tmp_path):
+    written = _write(tmp_path / "out.json", RECORDS, codec="json")
+    with open(tmp_path / "expected.json", "w") as f:
+        json.dump(RECORDS, f, indent=2)
+        f.write("\n")
+
+    assert written == (tmp_path / "expected.json").read_bytes()
+    assert json.loads(written) == RECORDS
+
+
+def test_orjson_codec_matches_json_dump(tmp_path):
+    pytest.importorskip("orjson")
+    records = RECORDS + UNICODE_RECORDS
+    written = _write(tmp_path / "out.json", records, codec="orjson")
+
+    assert written == (json.dumps(records, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+    assert json.loads(written) == records
+
+
+def test_compact_round_trip(tmp_path):
+    written = _write(tmp_path / "out.json", RECORDS + UNICODE_RECORDS, codec="json", compact=True)
+
+    assert json.loads(written) == RECORDS + UNICODE_RECORDS
+    assert len(written.splitlines()) == len(RECORDS) + len(UNICODE_RECORDS) + 2
+
+
+def test_reader_round_trips_writer_output(tmp_path):
+    path = tmp_path / "out.json"
+    _write(path, RECORDS + UNICODE_RECORDS, codec="json")
+
+    assert list(iter_dataset(str(path), chunk_size=7)) == RECORDS + UNICODE_RECORDS
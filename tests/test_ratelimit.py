@@ -0,0 +1,141 @@
+"""
+Tests for streamed calls through inference.ratelimit.AdaptiveRateLimiter.
+"""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from inference.ratelimit import AdaptiveRateLimiter
+
+
+class FakeStream:
+    def __init__(self, items, error=None):
+        self.items = items
+        self.error = error
+        self.closed = False
+
+    def __iter__(self):
+        yield from self.items
+        if self.error:
+            raise self.error
+
+    async def __aiter__(self):
+        for item in self.items:
+            yield item
+        if self.error:
+            raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncStream(FakeStream):
+    async def close(self):
+        self.closed = True
+
+
+def _throttled():
+    response = httpx.Response(429, request=httpx.Request("POST", "https://example.invalid/v1"))
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def test_stream_holds_slot_until_exhausted():
+    limiter = AdaptiveRateLimiter(initial_concurrency=4)
+    stream = FakeStream([1, 2])
+    chunks = limiter.stream(lambda: stream)
+
+    assert next(chunks) == 1
+    assert limiter.stats()["in_flight"] == 1
+    assert list(chunks) == [2]
+    assert limiter.stats()["in_flight"] == 0
+    assert stream.closed
+
+
+def test_closed_stream_releases_slot():
+    limiter = AdaptiveRateLimiter(initial_concurrency=4)
+    stream = FakeStream([1, 2, 3])
+    chunks = limiter.stream(lambda: stream)
+
+    next(chunks)
+    chunks.close()
+    assert limiter.stats()["in_flight"] == 0
+    assert stream.closed
+
+
+def test_throttled_mid_stream_shrinks_window():
+    limiter = AdaptiveRateLimiter(initial_concurrency=8)
+    chunks = limiter.stream(lambda: FakeStream([1], error=_throttled()))
+
+    with pytest.raises(openai.RateLimitError):
+        list(chunks)
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0
+    assert stats["throttled"] == 1
+    assert stats["concurrency_limit"] == 4
+
+
+def test_async_stream_holds_slot_until_exhausted():
+    limiter = AdaptiveRateLimiter(initial_concurrency=4)
+    stream = FakeAsyncStream(["a", "b"])
+
+    async def open_stream():
+        return stream
+
+    async def consume():
+        seen = []
+        async for item in limiter.astream(open_stream):
+            seen.append((item, limiter.stats()["in_flight"]))
+        return seen
+
+    assert asyncio.run(consume()) == [("a", 1), ("b", 1)]
+    assert limiter.stats()["in_flight"] == 0
+    assert stream.closed
+
+
+def test_cancelled_call_releases_slot():
+    limiter = AdaptiveRateLimiter(initial_concurrency=4)
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.sleep(60)
+
+    async def cancel():
+        task = asyncio.ensure_future(limiter.acall(hang))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_timed_out_call_releases_slot():
+    limiter = AdaptiveRateLimiter(initial_concurrency=4)
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acall(hang), timeout=0.05)
+
+    asyncio.run(run())
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0
+    assert stats["retries"] == 0
+
+
+def test_interrupted_call_releases_slot():
+    limiter = AdaptiveRateLimiter(initial_concurrency=4)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        limiter.call(interrupted)
+    assert limiter.stats()["in_flight"] == 0
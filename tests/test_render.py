@@ -0,0 +1,77 @@
+"""
+Tests for how render/render.py treats failed renders.
+"""
+
+import os
+import stat
+
+import pytest
+
+from render import render
+
+
+@pytest.fixture
+def uncached(monkeypatch):
+    def run_directly(code, mode, run, implied_by=(), usable=None):
+        success, stderr, artifacts, cacheable = run()
+        return {"success": success, "stderr": stderr, "elapsed": 0.0, "artifacts": artifacts, "cached": False}
+
+    monkeypatch.setattr(render, "cached_run", run_directly)
+    monkeypatch.setenv("OPENSCAD_DISPLAY_BACKEND", "none")
+
+
+def _fake_openscad(directory, script):
+    path = directory / "openscad"
+    path.write_text("#!/bin/sh\n" + script)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+
+def test_missing_openscad_is_transient(tmp_path, monkeypatch, uncached):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    png = tmp_path / "item.png"
+    png.write_bytes(b"previous")
+
+    assert render.render_openscad_to_png("cube(1);", str(png)) == (False, render.UNAVAILABLE)
+    assert render.UNAVAILABLE in render.TRANSIENT
+    assert png.read_bytes() == b"previous"
+
+
+def test_timeout_keeps_previous_image(tmp_path, monkeypatch, uncached):
+    _fake_openscad(tmp_path, 'printf partial > "$3"\nsleep 5\n')
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    png = tmp_path / "item.png"
+    png.write_bytes(b"previous")
+
+    assert render.render_openscad_to_png("cube(1);", str(png), timeout=0.5, memory_mb=0) == (False, render.TIMEOUT)
+    assert render.TIMEOUT in render.TRANSIENT
+    assert png.read_bytes() == b"previous"
+    assert not (tmp_path / "item.partial.png").exists()
+
+
+def test_success_replaces_image(tmp_path, monkeypatch, uncached):
+    _fake_openscad(tmp_path, 'printf new > "$3"\n')
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    png = tmp_path / "item.png"
+    png.write_bytes(b"previous")
+
+    assert render.render_openscad_to_png("cube(1);", str(png), memory_mb=0) == (True, None)
+    assert png.read_bytes() == b"new"
+
+
+def test_display_error_keeps_previous_image(tmp_path, monkeypatch, uncached):
+    _fake_openscad(tmp_path, 'echo "Unable to open display :3" >&2\nexit 1\n')
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    png = tmp_path / "item.png"
+    png.write_bytes(b"previous")
+
+    assert render.render_openscad_to_png("cube(1);", str(png), memory_mb=0) == (False, render.DISPLAY)
+    assert render.DISPLAY in render.TRANSIENT
+    assert png.read_bytes() == b"previous"
+
+
+def test_code_error_is_not_transient(tmp_path, monkeypatch, uncached):
+    _fake_openscad(tmp_path, 'echo "ERROR: Parser error in line 1" >&2\nexit 1\n')
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+    assert render.render_openscad_to_png("cube(;", str(tmp_path / "item.png"), memory_mb=0) == (False, render.ERROR)
+    assert render.ERROR not in render.TRANSIENT
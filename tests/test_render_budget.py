@@ -0,0 +1,48 @@
+"""
+Tests for the accept/reject boundary of pipeline.render_budget.
+"""
+
+import pytest
+
+from pipeline.render_budget import DOWNTIER, REJECT, Budget, is_expensive
+
+
+def _estimate(primitives, polygons):
+    return {"primitives": primitives, "polygons": polygons, "loop_iterations": 0}
+
+
+def test_limits_are_inclusive():
+    for action in (REJECT, DOWNTIER):
+        budget = Budget(max_primitives=100, max_polygons=1000, action=action)
+        at_limit = _estimate(100, 1000)
+
+        assert budget.violations(at_limit) == []
+        assert not budget.rejects(at_limit)
+        assert not budget.downtiers(at_limit)
+
+
+def test_reject_action_rejects_either_limit():
+    budget = Budget(max_primitives=100, max_polygons=1000, action=REJECT)
+
+    assert budget.rejects(_estimate(101, 0))
+    assert budget.rejects(_estimate(0, 1001))
+    assert not budget.downtiers(_estimate(0, 1001))
+    assert budget.violations(_estimate(101, 1001)) == ["101 primitives > 100", "1,001 polygons > 1,000"]
+
+
+def test_downtier_action_only_rejects_primitives():
+    budget = Budget(max_primitives=100, max_polygons=1000, action=DOWNTIER)
+
+    assert budget.downtiers(_estimate(0, 1001)) and not budget.rejects(_estimate(0, 1001))
+    assert budget.rejects(_estimate(101, 0))
+
+
+def test_expensive_lane_boundary():
+    assert not is_expensive(_estimate(1, 100), threshold=100)
+    assert is_expensive(_estimate(1, 101), threshold=100)
+    assert not is_expensive(None)
+
+
+def test_unknown_action():
+    with pytest.raises(ValueError):
+        Budget(action="skip")
@@ -0,0 +1,41 @@
+"""
+Tests for which OpenSCAD outcomes the render cache may store.
+"""
+
+import os
+import stat
+
+from pipeline import validation
+from pipeline.render_cache import is_environment_failure
+
+
+def _fake_openscad(directory, script):
+    path = directory / "openscad"
+    path.write_text("#!/bin/sh\n" + script)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+
+def test_environment_failures():
+    assert is_environment_failure("Unable to open display :3")
+    assert is_environment_failure("terminate called after throwing an instance of 'std::bad_alloc'")
+    assert is_environment_failure("CGAL error: Cannot allocate memory")
+    assert not is_environment_failure("ERROR: Parser error in line 3: syntax error")
+    assert not is_environment_failure("")
+
+
+def test_display_failure_is_not_cacheable(tmp_path, monkeypatch):
+    _fake_openscad(tmp_path, 'echo "Unable to open display :3" >&2\nexit 1\n')
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    monkeypatch.setenv("OPENSCAD_DISPLAY_BACKEND", "none")
+
+    success, stderr, artifacts, cacheable = validation._run_tier("cube(1);", validation.PNG, timeout=5)
+    assert not success and not cacheable
+
+
+def test_code_failure_is_cacheable(tmp_path, monkeypatch):
+    _fake_openscad(tmp_path, 'echo "ERROR: Parser error in line 1" >&2\nexit 1\n')
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    monkeypatch.setenv("OPENSCAD_DISPLAY_BACKEND", "none")
+
+    success, stderr, artifacts, cacheable = validation._run_tier("cube(1);", validation.PNG, timeout=5)
+    assert not success and cacheable
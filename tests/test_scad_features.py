@@ -0,0 +1,33 @@
+"""
+Tests for loop expansion in pipeline.scad_features.
+"""
+
+from pipeline.render_budget import estimate
+from pipeline.scad_features import extract_features
+
+
+def _primitives(code):
+    return extract_features(code)["primitives"]
+
+
+def test_ascending_range():
+    assert _primitives("for (i = [0:1:10]) cube(i);") == 11
+
+
+def test_descending_range_with_negative_step():
+    assert _primitives("for (i = [10:-1:0]) cube(i);") == 11
+    assert _primitives("for (i = [10:-0.5:0]) cube(i);") == 21
+
+
+def test_range_stepping_away_from_its_end_is_empty():
+    assert _primitives("for (i = [0:-1:10]) cube(i);") == 0
+    assert _primitives("for (i = [10:1:0]) cube(i);") == 0
+
+
+def test_reversed_range_without_step_is_swapped():
+    assert _primitives("for (i = [10:0]) cube(i);") == 11
+
+
+def test_budget_counts_descending_loops():
+    estimated = estimate("for (i = [360:-0.1:0]) for (j = [360:-0.1:0]) cube(1);")
+    assert estimated["primitives"] == 3601 * 3601
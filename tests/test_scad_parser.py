@@ -0,0 +1,61 @@
+"""
+Tests for the in-process OpenSCAD parser (pipeline.scad_parser).
+"""
+
+import pytest
+
+from pipeline.scad_parser import ScadSyntaxError, check_syntax, parse, tokenize
+
+VALID = {
+    "list comprehension": "pts = [for (i = [0:10]) if (i % 2 == 0) [i, i*i] else [i, 0]];",
+    "c-style comprehension": "v = [for (i = 0, j = 1; i < 5; i = i + 1, j = j * 2) each [i, j]];",
+    "function literal": "f = function(x, y = 2) x * y; echo(f(3));",
+    "let/assert/echo expressions": 'x = let(a = 1, b = a + 1) assert(b > a, "order") echo("b", b) b * 2;',
+    "use and include": "use <MCAD/gears.scad>\ninclude <lib/parts.scad>\ncube(1);",
+    "number followed by letters": "2d = 5; translate([2d, 0, 0]) square(2d);",
+    "module definition": "$fn = 32; module m(r = 1) { sphere(r); } m();",
+}
+
+# (code, line, column) of the first error
+INVALID = {
+    "non-ASCII module name": ("module front_façade() { cube(1); }", 1, 16),
+    "non-ASCII variable": ("ball_Ø = 3;", 1, 6),
+    "dangling transform at EOF": ("translate([1,0,0])", 1, 19),
+    "unclosed brace": ("cube(1);\nunion() {\n  cube(2);\n", 2, 9),
+    "unclosed vector": ("x = [1, 2;", 1, 10),
+    "missing parenthesis": ("difference() {\n    cube(10);\n    translate([1,1] sphere(3);\n}", 3, 21),
+    "markdown fence": ("```openscad\ncube(1);\n```", 1, 1),
+    "unterminated string": ('a = "open', 1, 5),
+}
+
+
+@pytest.mark.parametrize("code", VALID.values(), ids=VALID.keys())
+def test_accepts_valid_code(code):
+    assert check_syntax(code) is None
+    assert parse(code).kind == "file"
+
+
+@pytest.mark.parametrize("code, line, column", INVALID.values(), ids=INVALID.keys())
+def test_reports_error_position(code, line, column):
+    with pytest.raises(ScadSyntaxError) as error:
+        parse(code)
+    assert (error.value.line, error.value.column) == (line, column)
+    assert str(error.value).startswith(f"line {line}, column {column}: ")
+
+
+def test_number_followed_by_letters_is_one_identifier():
+    kinds = [(kind, value) for kind, value, offset in tokenize("2d 2 d")[:3]]
+    assert kinds == [("id", "2d"), ("number", 2.0), ("id", "d")]
+
+
+def test_use_and_include_paths():
+    tree = parse("use <MCAD/gears.scad>\ninclude <lib/parts.scad>\n")
+    assert [(node.kind, node.path) for node in tree.body] == [("use", "MCAD/gears.scad"),
+                                                             ("include", "lib/parts.scad")]
+
+
+def test_function_literal_node():
+    tree = parse("f = function(x) x + 1;")
+    literal = tree.body[0].expr
+    assert literal.kind == "function_literal"
+    assert [param.name for param in literal.params] == ["x"]
@@ -0,0 +1,76 @@
+"""
+Tests for the multi-category Scheduler (pipeline.scheduler).
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from pipeline.scheduler import LIST_DONE, QUOTA_USED, TARGET_REACHED, Scheduler
+
+
+def _run(name, count, weight=1.0, quota=None, target=None, successful=0):
+    return SimpleNamespace(category=SimpleNamespace(name=name), todo=[f"{name}{i}" for i in range(count)],
+                           weight=weight, quota=quota, target=target, successful=successful)
+
+
+def _drain(scheduler, renders=True):
+    """Hand out and complete items one at a time, like a single worker."""
+    issued = []
+    for run, item_name in scheduler:
+        issued.append(item_name)
+        if renders:
+            run.successful += 1
+        scheduler.complete(run)
+    return issued
+
+
+def test_stride_order_follows_weights():
+    heavy, light = _run("a", 6, weight=2), _run("b", 3, weight=1)
+
+    assert _drain(Scheduler([heavy, light])) == ["a0", "b0", "a1", "a2", "b1", "a3", "a4", "b2", "a5"]
+
+
+def test_lane_stops_at_quota():
+    limited, other = _run("a", 10, quota=2), _run("b", 3)
+    scheduler = Scheduler([limited, other])
+
+    assert _drain(scheduler) == ["a0", "b0", "a1", "b1", "b2"]
+    assert scheduler.status() == {"a": (2, QUOTA_USED), "b": (3, LIST_DONE)}
+    assert scheduler.remaining() == 0
+
+
+def test_lane_stops_at_target():
+    run = _run("a", 10, target=5, successful=3)
+    scheduler = Scheduler([run])
+
+    assert scheduler.remaining() == 2
+    assert _drain(scheduler) == ["a0", "a1"]
+    assert scheduler.status() == {"a": (2, TARGET_REACHED)}
+
+
+def test_in_flight_items_count_towards_target():
+    run = _run("a", 10, target=1)
+    scheduler = Scheduler([run])
+
+    assert next(scheduler)[1] == "a0"
+    # a0 may meet the target on its own, so nothing else is due until it fails
+    assert scheduler.remaining() == 1
+    scheduler.complete(run)
+    assert next(scheduler)[1] == "a1"
+    run.successful += 1
+    scheduler.complete(run)
+    with pytest.raises(StopIteration):
+        next(scheduler)
+
+
+def test_failures_reopen_a_target():
+    run = _run("a", 10, target=2)
+
+    assert _drain(Scheduler([run]), renders=False) == [f"a{i}" for i in range(10)]
+    assert run.successful == 0
+
+
+def test_rejects_non_positive_weight():
+    with pytest.raises(ValueError):
+        Scheduler([_run("a", 1, weight=0)])
@@ -0,0 +1,66 @@
+"""
+Tests for the tier structure of pipeline.validation.
+"""
+
+from pipeline import validation
+
+
+def test_png_does_not_escalate_through_stl():
+    assert validation._chain(validation.PNG) == (validation.SYNTAX, validation.PARSE, validation.CSG,
+                                                 validation.PNG)
+    assert validation.MESH not in validation._chain(validation.PNG)
+
+
+def test_previews_do_not_imply_meshes():
+    for lowres in (False, True):
+        implied = validation._implied_by(validation.MESH, lowres)
+        assert not [mode for mode in implied if mode.startswith("png")]
+
+
+def test_meshes_do_not_imply_previews():
+    for lowres in (False, True):
+        implied = validation._implied_by(validation.PNG, lowres)
+        assert not [mode for mode in implied if mode.startswith("stl")]
+
+
+def test_both_branches_imply_csg():
+    implied = validation._implied_by(validation.CSG, False)
+    assert "stl" in implied and "png-100" in implied and "png-800" in implied
+
+
+def _record_runs(monkeypatch, fail=()):
+    ran = []
+
+    def run(code, mode, run, implied_by=(), usable=None):
+        ran.append(mode)
+        return {"success": mode not in fail, "stderr": "ERROR" if mode in fail else "", "elapsed": 0.0,
+                "artifacts": {}, "cached": False}
+
+    monkeypatch.setattr(validation, "cached_run", run)
+    monkeypatch.setattr(validation, "_cached_failure_below", lambda code, tier, lowres: (None, None))
+    return ran
+
+
+def test_runs_only_the_requested_tier_by_default(monkeypatch):
+    ran = _record_runs(monkeypatch)
+    result = validation.validate("cube(1);", validation.MESH, adaptive=False)
+
+    assert result["ok"]
+    assert ran == ["stl"]
+    assert [step[0] for step in result["steps"]] == [validation.SYNTAX, validation.MESH]
+
+
+def test_escalation_runs_cheaper_tiers_first(monkeypatch):
+    ran = _record_runs(monkeypatch, fail=("csg",))
+    result = validation.validate("cube(1);", validation.MESH, escalate=True, adaptive=False)
+
+    assert not result["ok"] and result["tier"] == validation.CSG
+    assert ran == ["ast", "csg"]
+
+
+def test_syntax_errors_never_start_openscad(monkeypatch):
+    ran = _record_runs(monkeypatch)
+    result = validation.validate("cube(1;", validation.PNG, adaptive=False)
+
+    assert not result["ok"] and result["tier"] == validation.SYNTAX
+    assert ran == []
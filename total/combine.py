@@ -3,145 +3,112 @@
 Combine all dataset JSON files into a single Synthetic-Objects.json
 """
 
-import json
 import os
-import subprocess
-import tempfile
+import sys
+import argparse
+import functools
+import contextlib
 
-# Mapping of category names to their JSON file keys
-CATEGORY_TO_KEY = {
-    "animals": "animal",
-    "fruits": "fruit",
-    "buildings": "building",
-    "household_items": "household_item",
-    "musical_instruments": "musical_instrument",
-    "vehicles": "vehicle",
-    "food": "food_item",
-    "historical_artifacts": "historical_artifact",
-    "mythical_creatures": "mythical_creature",
-    "tech_electronics": "electronic_device",
-    "tools": "tool",
-    "pokemon": "pokemon",
-    "furniture": "furniture",
-    "plants": "plant",
-    "mechanical_components": "mechanical_component",
-    "toys": "toy",
-    "sports_equipment": "sports_equipment",
-    "office_supplies": "office_supply",
-    "kitchen_appliances": "kitchen_appliance",
-    "decorative_art": "decorative_art",
-    "natural_objects": "natural_object",
-    "basic_shapes": "basic_shape",
-    "primitive_shapes": "primitive_shape",
-    "shape_combinations": "shape_combination"
-}
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Dataset file mapping
-DATASET_FILES = {
-    "animals": "animal_openscad_dataset.json",
-    "fruits": "fruit_openscad_dataset.json",
-    "buildings": "building_openscad_dataset.json",
-    "household_items": "household_item_openscad_dataset.json",
-    "musical_instruments": "musical_instrument_openscad_dataset.json",
-    "vehicles": "vehicle_openscad_dataset.json",
-    "food": "food_openscad_dataset.json",
-    "historical_artifacts": "historical_artifact_openscad_dataset.json",
-    "mythical_creatures": "mythical_creature_openscad_dataset.json",
-    "tech_electronics": "electronic_device_openscad_dataset.json",
-    "tools": "tool_openscad_dataset.json",
-    "pokemon": "pokemon_openscad_dataset.json",
-    "furniture": "furniture_openscad_dataset.json",
-    "plants": "plant_openscad_dataset.json",
-    "mechanical_components": "mechanical_component_openscad_dataset.json",
-    "toys": "toy_openscad_dataset.json",
-    "sports_equipment": "sports_equipment_openscad_dataset.json",
-    "office_supplies": "office_supply_openscad_dataset.json",
-    "kitchen_appliances": "kitchen_appliance_openscad_dataset.json",
-    "decorative_art": "decorative_art_openscad_dataset.json",
-    "natural_objects": "natural_object_openscad_dataset.json",
-    "basic_shapes": "basic_shape_openscad_dataset.json",
-    "primitive_shapes": "primitive_shape_openscad_dataset.json",
-    "shape_combinations": "shape_combination_openscad_dataset.json"
-}
+from pipeline.categories import CATEGORIES
+from pipeline.dataset_reader import iter_dataset
+from pipeline.generation import ordered_map
+from pipeline.json_writer import CODECS, JsonArrayWriter
+from pipeline.parquet_export import (DEFAULT_SHARD_ROWS, DEFAULT_ROW_GROUP_ROWS, ParquetShardWriter,
+                                     upload_shards)
+from pipeline.render_budget import add_budget_arguments, budget_from_args
+from pipeline import validation
 
-def load_dataset(filepath):
-    """Load a dataset JSON file"""
-    with open(filepath, 'r') as f:
-        return json.load(f)
+# Category names, entry name keys and dataset files come from the generation registry
+CATEGORY_TO_KEY = {name: category.name_key for name, category in CATEGORIES.items()}
+DATASET_FILES = {name: category.dataset_file for name, category in CATEGORIES.items()}
 
-def can_render_openscad(code, timeout=5):
-    """Test if OpenSCAD code can be rendered successfully"""
-    temp_scad = None
-    temp_png = None
-    try:
-        # Create temporary .scad file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.scad', delete=False) as temp_file:
-            temp_file.write(code)
-            temp_scad = temp_file.name
-        
-        # Create temporary PNG output path
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.png', delete=False) as temp_file:
-            temp_png = temp_file.name
-        
-        # Try to render using OpenSCAD with virtual display
-        result = subprocess.run(
-            ['xvfb-run', '-a', 'openscad', '--imgsize=100,100', 
-             '-o', temp_png, temp_scad],
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
-        
-        # Check if render succeeded and file exists with content
-        success = result.returncode == 0 and os.path.exists(temp_png) and os.path.getsize(temp_png) > 0
+def iter_dataset_items(workspace_root, totals):
+    """
+    Yield (category, name, code) for every entry of every dataset, in category order.
+
+    Datasets are streamed entry by entry, so memory does not grow with
+    their size. After each category's entries a (category, None, None)
+    marker is yielded, by which point totals[category] holds the number of
+    entries read from its dataset.
+    """
+    for category, filename in DATASET_FILES.items():
+        filepath = os.path.join(workspace_root, filename)
         
-        # Clean up temp files
-        if temp_scad and os.path.exists(temp_scad):
-            os.unlink(temp_scad)
-        if temp_png and os.path.exists(temp_png):
-            os.unlink(temp_png)
+        if not os.path.exists(filepath):
+            print(f"Warning: {filename} not found, skipping...")
+            continue
         
-        return success
-    except Exception as e:
-        # Clean up on error
-        if temp_scad and os.path.exists(temp_scad):
-            os.unlink(temp_scad)
-        if temp_png and os.path.exists(temp_png):
-            os.unlink(temp_png)
-        return False
+        name_key = CATEGORY_TO_KEY[category]
+        totals[category] = 0
+        try:
+            for entry in iter_dataset(filepath, legacy_key=CATEGORIES[category].legacy_key):
+                totals[category] += 1
+                if name_key in entry and "openscad_code" in entry:
+                    yield category, entry[name_key], entry["openscad_code"]
+        except Exception as e:
+            # Entries read before the error are kept
+            print(f"Error loading {filename}: {e}")
+        yield category, None, None
 
-def extract_items(dataset_data, name_key, validate=False):
-    """Extract items from dataset with specified name key, optionally validating renders"""
-    items = []
-    total = len(dataset_data)
-    for i, entry in enumerate(dataset_data):
-        if name_key in entry and "openscad_code" in entry:
-            code = entry["openscad_code"]
-            
-            # Skip if validation enabled and code cannot be rendered
-            if validate:
-                if not can_render_openscad(code):
-                    continue
-            
-            items.append({
-                "name": entry[name_key],
-                "code": code
-            })
-            
-            # Print progress every 50 items
-            if (i + 1) % 50 == 0:
-                print(f"    Processed {i + 1}/{total} items ({len(items)} valid)")
-    
-    return items
+def _init_worker():
+    # One persistent display per worker process
+    os.environ["OPENSCAD_DISPLAYS"] = "1"
+
+def _check_item(item, tier=validation.PNG, timeout=5, lowres=False, adaptive=True, budget=None,
+                escalate=False):
+    """Validate one (category, name, code) item; end-of-category markers pass through"""
+    category, name, code = item
+    if code is None:
+        return None
+    return validation.validate(code, tier, escalate=escalate, timeout=timeout, lowres=lowres,
+                               adaptive=adaptive, budget=budget)
+
+def _accept_item(item):
+    """Nothing to check when validation is disabled"""
+    return None
 
 def main():
-    import sys
+    parser = argparse.ArgumentParser(description="Combine all dataset JSON files into Synthetic-Objects.json")
+    parser.add_argument("-n", "--no-validate", action="store_true",
+                        help="Include all code without checking that it renders")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Validation processes (default: one per CPU core)")
+    parser.add_argument("--tier", choices=validation.TIERS, default=validation.PNG,
+                        help="Validation fidelity: syntax (in-process parse), ast (parse), csg (evaluate), stl (mesh) or png (render); "
+                             "default: png")
+    parser.add_argument("--escalate", action="store_true",
+                        help="Run the cheaper OpenSCAD tiers before --tier and stop at the first failure")
+    parser.add_argument("--timeout", type=float, default=5,
+                        help="Seconds per validation tier when the cost model has no prediction for it")
+    parser.add_argument("--fixed-timeout", action="store_true",
+                        help="Use --timeout for every item instead of per-item predicted timeouts")
+    parser.add_argument("--lowres", action="store_true",
+                        help="Validate stl/png tiers at low resolution ($fn clamped to 8)")
+    add_budget_arguments(parser)
+    parser.add_argument("--compact", action="store_true",
+                        help="Write one item per line instead of the indented layout")
+    parser.add_argument("--codec", choices=CODECS, default="auto",
+                        help="JSON encoder (default: orjson if installed, else json)")
+    parser.add_argument("--parquet", metavar="DIR",
+                        help="Also export per-category Parquet shards to DIR (needs pyarrow)")
+    parser.add_argument("--shard-rows", type=int, default=DEFAULT_SHARD_ROWS, help="Rows per Parquet shard")
+    parser.add_argument("--row-group-rows", type=int, default=DEFAULT_ROW_GROUP_ROWS,
+                        help="Rows per Parquet row group")
+    parser.add_argument("--upload", action="store_true",
+                        help="Push the Parquet shards to each category's Hugging Face dataset")
+    args = parser.parse_args()
+    if args.upload and not args.parquet:
+        parser.error("--upload needs --parquet DIR")
     
     # Validation is enabled by default, can be disabled with --no-validate
-    validate = '--no-validate' not in sys.argv and '-n' not in sys.argv
+    validate = not args.no_validate
+    workers = max(1, args.workers or os.cpu_count() or 1)
     
     if validate:
-        print("Validation ENABLED (default): Only including renderable OpenSCAD code...")
+        print(f"Validation ENABLED (default): Only including renderable OpenSCAD code "
+              f"(tier {args.tier}{', low-res' if args.lowres else ''}, {workers} workers)...")
         print("Use --no-validate to skip validation")
     else:
         print("Validation DISABLED: Including all code")
@@ -151,70 +118,88 @@ def main():
     
     total_items = 0
     valid_items = 0
+    over_budget = 0
     
-    # Open output file and write opening bracket
+    # Validation runs on a process pool over a bounded window of items;
+    # results come back in input order, so the output stays deterministic
+    totals = {}
+    tier_stats = validation.TierStats()
+    source = iter_dataset_items(workspace_root, totals)
+    if validate:
+        check = functools.partial(_check_item, tier=args.tier, timeout=args.timeout, lowres=args.lowres,
+                                  adaptive=not args.fixed_timeout, budget=budget_from_args(args),
+                                  escalate=args.escalate)
+        results = ordered_map(check, source, workers=workers, processes=True, initializer=_init_worker)
+    else:
+        results = ordered_map(_accept_item, source)
+    
+    # Stream items straight into the output file
     output_path = os.path.join(workspace_root, "Synthetic-Objects.json")
-    with open(output_path, 'w') as output_file:
-        output_file.write('[\n')
-        first_item = True
+    # Parquet shards hold every item, with a renders column instead of dropping failures
+    parquet = None
+    if args.parquet:
+        parquet = ParquetShardWriter(args.parquet, shard_rows=args.shard_rows, row_group_rows=args.row_group_rows)
+    with JsonArrayWriter(output_path, compact=args.compact, codec=args.codec) as writer, \
+            (parquet or contextlib.nullcontext()):
+        current = None
+        seen = 0
+        added = 0
         
-        # Process each category
-        for category, filename in DATASET_FILES.items():
-            filepath = os.path.join(workspace_root, filename)
-            
-            if not os.path.exists(filepath):
-                print(f"Warning: {filename} not found, skipping...")
-                continue
-            
-            print(f"\nProcessing {category}...")
+        for _, (category, name, code), result in results:
+            if category != current:
+                print(f"\nProcessing {category}...")
+                current = category
+                seen = 0
+                added = 0
             
-            # Load dataset
-            try:
-                dataset_data = load_dataset(filepath)
-            except Exception as e:
-                print(f"Error loading {filename}: {e}")
+            if code is None:
+                # End of this category's dataset
+                total_items += totals[category]
+                print(f"  {added}/{totals[category]} items added from {category} ({valid_items}/{total_items} total valid)")
+                current = None
                 continue
             
-            # Extract items (with optional validation)
-            name_key = CATEGORY_TO_KEY[category]
-            items = extract_items(dataset_data, name_key, validate=validate)
-            
-            # Write items directly to file
-            for item in items:
-                # Add comma before item if not the first
-                if not first_item:
-                    output_file.write(',\n')
-                first_item = False
-                
-                # Write item as JSON
-                item_data = {
-                    "name": item["name"],
+            seen += 1
+            ok = True
+            if validate:
+                tier_stats.add(result)
+                ok = result["ok"]
+                if result["reason"] == validation.BUDGET:
+                    over_budget += 1
+            if parquet is not None:
+                parquet.write(name, category, code, renders=bool(ok) if validate else None)
+            if ok:
+                writer.write({
+                    "name": name,
                     "category": category,
-                    "code": item["code"]
-                }
-                json_str = json.dumps(item_data, indent=2)
-                # Indent the JSON string
-                indented_json = '\n'.join('  ' + line for line in json_str.split('\n'))
-                output_file.write(indented_json)
-                
+                    "code": code
+                })
+                added += 1
                 valid_items += 1
             
-            total_items += len(dataset_data)
-            print(f"  {len(items)}/{len(dataset_data)} items added from {category} ({valid_items}/{total_items} total valid)")
-        
-        # Write closing bracket
-        output_file.write('\n]\n')
+            # Print progress every 50 items
+            if seen % 50 == 0:
+                print(f"    Processed {seen} items ({added} valid)", flush=True)
     
     print(f"\n{'='*60}")
     print(f"Validation: {'ENABLED' if validate else 'DISABLED'}")
+    for line in tier_stats.report():
+        print(f"  {line}")
+    if over_budget:
+        print(f"  {over_budget} items rejected by the static render budget")
     print(f"Total items processed: {total_items}")
     print(f"Valid items included: {valid_items}")
     if total_items > 0:
         success_rate = (valid_items / total_items) * 100
         print(f"Success rate: {success_rate:.1f}%")
     print(f"Combined dataset saved to: {output_path}")
+    if parquet is not None:
+        print(f"Parquet shards ({parquet.rows} rows) saved to: {args.parquet}")
     print(f"{'='*60}")
+    
+    if args.upload:
+        print("\nUploading Parquet shards to Hugging Face...")
+        upload_shards(args.parquet)
 
 if __name__ == "__main__":
     main()
-
@@ -6,22 +6,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from inference.kimi import chat_with_kimi
+from pipeline.classify import DEFAULT_BATCH_SIZE
+from pipeline.filtering import run_filter, journal_path, finish_filter, DEFAULT_WORKERS
 
 
-def is_actual_vehicle(name):
-    """
-    Use AI to determine if a name represents an actual vehicle
-    (not an animal, building, or other non-vehicle).
-
-    Args:
-        name (str): The name to check
+# Shared by the single-name and batched checks
+FILTER_QUESTION = "the name of an actual vehicle"
 
-    Returns:
-        bool: True if it's an actual vehicle, False otherwise
-    """
-    prompt = f"""Is "{name}" the name of an actual vehicle?
-Answer with just "yes" or "no".
-Do NOT count:
+FILTER_CRITERIA = """Do NOT count:
 - Animals (like "horse", "camel", "elephant")
 - Buildings (like "house", "tower", "bridge")
 - Food items (like "apple", "bread", "milk")
@@ -35,7 +27,24 @@ DO count:
 - Boats and watercraft (like "boat", "yacht", "canoe")
 - Aircraft (like "airplane", "helicopter", "drone")
 - Trains and rail vehicles (like "train", "subway", "tram")
-- Construction vehicles (like "bulldozer", "excavator", "crane")
+- Construction vehicles (like "bulldozer", "excavator", "crane")"""
+
+
+def is_actual_vehicle(name):
+    """
+    Use AI to determine if a name represents an actual vehicle
+    (not an animal, building, or other non-vehicle).
+
+    Args:
+        name (str): The name to check
+
+    Returns:
+        bool: True if it's an actual vehicle, False otherwise, None if
+        the check failed (it is retried on the next run)
+    """
+    prompt = f"""Is "{name}" {FILTER_QUESTION}?
+Answer with just "yes" or "no".
+{FILTER_CRITERIA}
 
 Answer:"""
 
@@ -45,16 +54,18 @@ Answer:"""
         return "yes" in answer
     except Exception as e:
         print(f"Error checking '{name}': {e}")
-        return False
+        return None
 
 
-def filter_vehicles_list(input_file, output_file=None):
+def filter_vehicles_list(input_file, output_file=None, batch_size=DEFAULT_BATCH_SIZE, workers=DEFAULT_WORKERS):
     """
     Filter the vehicles list to only include actual vehicles.
 
     Args:
         input_file (str): Path to the input JSON file
         output_file (str): Path to save filtered results (optional)
+        batch_size (int): Names per classification request (1 to check names one at a time)
+        workers (int): Number of classification requests in flight at once
 
     Returns:
         list: List of actual vehicles
@@ -67,10 +78,17 @@ def filter_vehicles_list(input_file, output_file=None):
 
     print(f"Filtering {len(vehicle_names)} entries...")
 
+    # Verdicts are journaled as they arrive so an interrupted run can resume
+    journal_file = journal_path(input_file, output_file)
+    verdicts = dict(run_filter(vehicle_names, FILTER_QUESTION, FILTER_CRITERIA, is_actual_vehicle, journal_file,
+                               batch_size=batch_size, workers=workers))
+
     for i, name in enumerate(vehicle_names):
         print(f"Checking [{i+1}/{len(vehicle_names)}]: {name}...", end=" ")
 
-        if is_actual_vehicle(name):
+        if verdicts[name] is None:
+            print(" Not checked (retried on the next run)")
+        elif verdicts[name]:
             actual_vehicles.append(name)
             print(" Vehicle")
         else:
@@ -84,6 +102,8 @@ def filter_vehicles_list(input_file, output_file=None):
             json.dump(actual_vehicles, f, indent=4, ensure_ascii=False)
         print(f"Saved to {output_file}")
 
+    finish_filter(journal_file, verdicts)
+
     return actual_vehicles
 
 